@@ -3,27 +3,74 @@ Agent Extractor - Módulo para extraer información del INE
 Fase 1: Solo descarga y detección de actualizaciones
 """
 
-from .ine_scraper import INEScraper
-from .downloader import Downloader
-from .updater import UpdateManager
-from .metadata_manager import MetadataManager
+from functools import cached_property
+from importlib import import_module
+
+# Los componentes se importan al primer uso: `import agent_extractor` no carga
+# requests, asyncio ni sqlite3 (arranque rápido de la CLI)
+_COMPONENTES = {
+    'INEScraper': '.ine_scraper',
+    'Downloader': '.downloader',
+    'UpdateManager': '.updater',
+    'MetadataManager': '.metadata_manager',
+    'BackupStore': '.backup_store',
+    'PollScheduler': '.poll_scheduler',
+}
+
+
+def __getattr__(nombre):
+    if nombre in _COMPONENTES:
+        valor = getattr(import_module(_COMPONENTES[nombre], __name__), nombre)
+        globals()[nombre] = valor
+        return valor
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
 
 class INEExtractor:
-    """Agente principal para extracción de datos del INE"""
+    """
+    Agente principal para extracción de datos del INE.
+    
+    Cada componente se construye la primera vez que se usa y comparte con el
+    resto una única configuración, sesión HTTP y MetadataManager.
+    """
+    
+    @cached_property
+    def config(self):
+        from .http_client import load_config
+        return load_config()
+    
+    @cached_property
+    def session(self):
+        from .http_client import create_session
+        return create_session(self.config)
     
-    def __init__(self):
-        self.scraper = INEScraper()
-        self.downloader = Downloader()
-        self.updater = UpdateManager()
-        self.metadata_manager = MetadataManager()
+    @cached_property
+    def metadata_manager(self):
+        from .metadata_manager import MetadataManager
+        return MetadataManager(self.config)
+    
+    @cached_property
+    def scraper(self):
+        from .ine_scraper import INEScraper
+        return INEScraper(self.config, self.session)
+    
+    @cached_property
+    def downloader(self):
+        from .downloader import Downloader
+        return Downloader(self.config, self.session, self.metadata_manager)
+    
+    @cached_property
+    def updater(self):
+        from .updater import UpdateManager
+        return UpdateManager(self.config, self.session, self.metadata_manager, self.downloader)
     
     def check_for_updates(self):
         """Verifica si hay actualizaciones en las páginas del INE"""
         return self.scraper.check_updates()
     
-    def download_all(self, verbose=True):
+    def download_all(self, verbose=True, concurrencia=None):
         """Descarga todas las tablas configuradas"""
-        return self.downloader.download_all_tables(verbose=verbose)
+        return self.downloader.download_all_tables(verbose=verbose, concurrencia=concurrencia)
     
     def download_table(self, codigo_tabla):
         """Descarga una tabla específica"""
@@ -33,9 +80,21 @@ class INEExtractor:
         """Obtiene información básica de una tabla desde el INE"""
         return self.scraper.get_table_info(codigo_tabla)
     
-    def check_updates_smart(self):
+    def check_updates_smart(self, concurrency=None):
         """Verifica actualizaciones usando metadata local"""
-        return self.updater.check_all_updates()
+        return self.updater.check_all_updates(concurrency=concurrency)
+    
+    def check_updates_scheduled(self, concurrency=None):
+        """Verifica solo las tablas que tocan según el calendario de publicación"""
+        return self.updater.check_scheduled_updates(concurrency=concurrency)
+    
+    def get_check_plan(self):
+        """Próxima verificación planificada y ventana de publicación por tabla"""
+        return self.updater.get_check_plan()
+    
+    def run_scheduler(self, actualizar=False, concurrency=None):
+        """Modo demonio: verifica (y opcionalmente actualiza) según el calendario"""
+        return self.updater.run_scheduler(actualizar=actualizar, concurrency=concurrency)
     
     def update_table(self, codigo_tabla):
         """Actualiza una tabla específica si hay nuevos datos"""
@@ -44,5 +103,9 @@ class INEExtractor:
     def update_all(self):
         """Actualiza todas las tablas con nuevos datos disponibles"""
         return self.updater.update_all()
+    
+    def restore_table(self, codigo_tabla, version=None):
+        """Restaura una tabla desde el almacén de backups"""
+        return self.metadata_manager.restore(codigo_tabla, version=version)
 
-__all__ = ['INEExtractor', 'INEScraper', 'Downloader', 'UpdateManager', 'MetadataManager']
\ No newline at end of file
+__all__ = ['INEExtractor', 'INEScraper', 'Downloader', 'UpdateManager', 'MetadataManager', 'BackupStore', 'PollScheduler']
\ No newline at end of file
@@ -0,0 +1,219 @@
+"""
+Almacén de backups direccionado por contenido
+Cada versión de un CSV se guarda una sola vez, comprimida y nombrada por su SHA-256
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import logging
+from datetime import datetime
+from pathlib import Path
+
+from .raw_storage import SUFIJOS, resolve_compression, compression_of, open_raw, compressor
+
+
+class BackupStore:
+    """
+    Backups deduplicados en `root`:
+
+        objects/ab/abcdef....csv.gz   contenido comprimido, clave = SHA-256 del CSV
+        index.json                    versiones por tabla -> objeto
+
+    Dos versiones con el mismo contenido comparten objeto. La clave es el hash
+    del CSV descomprimido, aunque el archivo respaldado esté comprimido. La
+    retención se aplica por tabla y los objetos sin referencias se eliminan.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    EXTENSIONES = {compresion: SUFIJOS[compresion] for compresion in ('gzip', 'zstd')}
+
+    def __init__(self, root, compresion='gzip', versiones_por_tabla=10):
+        """
+        Args:
+            root: Directorio del almacén
+            compresion: 'gzip' o 'zstd' (requiere zstandard; si falta se usa gzip)
+            versiones_por_tabla: Versiones que se conservan por tabla (0 = sin límite)
+        """
+        self.root = Path(root)
+        self.objects_dir = self.root / 'objects'
+        self.index_path = self.root / 'index.json'
+        self.logger = logging.getLogger(__name__)
+        self.versiones_por_tabla = versiones_por_tabla
+        self.lock = threading.Lock()
+        self.compresion = resolve_compression(compresion) or 'gzip'
+
+    def store(self, csv_path, codigo_tabla, version=None, hash_archivo=None):
+        """
+        Guarda una versión del CSV
+
+        Args:
+            csv_path: Archivo a respaldar
+            codigo_tabla: Código de la tabla
+            version: Versión de la metadata a la que corresponde el archivo
+            hash_archivo: SHA-256 ya conocido; si el objeto existe no se lee el archivo
+
+        Returns:
+            Path del objeto que contiene la versión
+        """
+        csv_path = Path(csv_path)
+        tmp_name = None
+        if not (hash_archivo and self._find_object(hash_archivo)):
+            # La compresión (lo costoso) se hace fuera del lock, a un temporal
+            hash_archivo, tmp_name = self._compress_to_temp(csv_path)
+
+        try:
+            # Publicar el objeto y referenciarlo en el índice en la misma sección
+            # crítica: la retención de otro hilo no puede borrarlo entre medias
+            with self.lock:
+                objeto = self._find_object(hash_archivo)
+                if objeto is None:
+                    if tmp_name is None:
+                        # El objeto conocido desapareció (retención) desde la comprobación
+                        hash_archivo, tmp_name = self._compress_to_temp(csv_path)
+                    objeto = self._object_path(hash_archivo)
+                    objeto.parent.mkdir(parents=True, exist_ok=True)
+                    os.replace(tmp_name, objeto)
+                    tmp_name = None
+
+                index = self._load_index()
+                versiones = index.setdefault(codigo_tabla, [])
+                if self._needs_entry(versiones, version, hash_archivo):
+                    # Cada versión tiene su entrada, aunque comparta objeto con la anterior
+                    versiones.append({
+                        'version': version if version is not None else len(versiones) + 1,
+                        'hash': hash_archivo,
+                        'objeto': objeto.relative_to(self.root).as_posix(),
+                        'archivo_original': str(csv_path),
+                        'tamaño_bytes': csv_path.stat().st_size,
+                        'fecha': datetime.now().isoformat()
+                    })
+                self._apply_retention(index)
+                self._save_index(index)
+        finally:
+            if tmp_name is not None:
+                # Contenido ya respaldado: sobra el temporal
+                Path(tmp_name).unlink(missing_ok=True)
+
+        self.logger.info(f"Backup de {codigo_tabla} en {objeto.name}")
+        return objeto
+
+    def list_versions(self, codigo_tabla):
+        """Versiones respaldadas de una tabla (más antigua primero)"""
+        with self.lock:
+            return list(self._load_index().get(codigo_tabla, []))
+
+    def restore(self, codigo_tabla, version=None, destino=None):
+        """
+        Restaura una versión respaldada
+
+        Args:
+            codigo_tabla: Código de la tabla
+            version: Versión a restaurar (None = la más reciente)
+            destino: Ruta de salida (None = ruta original del archivo)
+
+        Returns:
+            Tupla (Path restaurado, entrada del índice)
+
+        Raises:
+            KeyError si la versión no existe en el almacén
+        """
+        versiones = self.list_versions(codigo_tabla)
+        if version is not None:
+            versiones = [v for v in versiones if v['version'] == version]
+        if not versiones:
+            raise KeyError(f"No hay backup de la tabla {codigo_tabla} (versión {version})")
+        entrada = versiones[-1]
+
+        destino = Path(destino or entrada['archivo_original'])
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=destino.parent, suffix='.tmp')
+        try:
+            # Se escribe con la compresión que indique el sufijo del destino
+            with os.fdopen(fd, 'wb') as raw, compressor(raw, compression_of(destino)) as salida, \
+                    open_raw(self.root / entrada['objeto']) as entrada_obj:
+                shutil.copyfileobj(entrada_obj, salida, self.CHUNK_SIZE)
+            os.replace(tmp_name, destino)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+        self.logger.info(f"Tabla {codigo_tabla} restaurada a versión {entrada['version']} en {destino}")
+        return destino, entrada
+
+    def _object_path(self, hash_archivo, compresion=None):
+        extension = self.EXTENSIONES[compresion or self.compresion]
+        return self.objects_dir / hash_archivo[:2] / f"{hash_archivo}{extension}"
+
+    def _find_object(self, hash_archivo):
+        """Objeto existente para un hash, con cualquier compresión"""
+        for compresion in self.EXTENSIONES:
+            objeto = self._object_path(hash_archivo, compresion)
+            if objeto.exists():
+                return objeto
+        return None
+
+    @staticmethod
+    def _needs_entry(versiones, version, hash_archivo):
+        """
+        False si la versión ya está registrada con ese contenido; sin número de
+        versión solo se añade entrada si el contenido cambia respecto a la última
+        """
+        if version is None:
+            return not versiones or versiones[-1]['hash'] != hash_archivo
+        return not any(v['version'] == version and v['hash'] == hash_archivo for v in versiones)
+
+    def _compress_to_temp(self, csv_path):
+        """
+        Comprime el archivo a un temporal en objects/ calculando su hash
+
+        Returns:
+            Tupla (hash, ruta del temporal); el llamador lo publica o lo borra
+        """
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        sha256 = hashlib.sha256()
+        fd, tmp_name = tempfile.mkstemp(dir=self.objects_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw, compressor(raw, self.compresion) as salida, open_raw(csv_path) as f:
+                for bloque in iter(lambda: f.read(self.CHUNK_SIZE), b''):
+                    sha256.update(bloque)
+                    salida.write(bloque)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        return sha256.hexdigest(), tmp_name
+
+    def _apply_retention(self, index):
+        """Recorta versiones antiguas y borra objetos sin referencias"""
+        if self.versiones_por_tabla:
+            for codigo, versiones in index.items():
+                if len(versiones) > self.versiones_por_tabla:
+                    index[codigo] = versiones[-self.versiones_por_tabla:]
+
+        referenciados = {v['objeto'] for versiones in index.values() for v in versiones}
+        if not self.objects_dir.exists():
+            return
+        for objeto in self.objects_dir.glob('*/*.csv.*'):
+            if objeto.relative_to(self.root).as_posix() not in referenciados:
+                try:
+                    objeto.unlink()
+                    self.logger.info(f"Backup eliminado por retención: {objeto.name}")
+                except OSError as e:
+                    self.logger.warning(f"No se pudo eliminar {objeto.name}: {e}")
+
+    def _load_index(self):
+        if self.index_path.exists():
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def _save_index(self, index):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
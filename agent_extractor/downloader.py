@@ -3,54 +3,60 @@ Módulo de descarga robusta de CSVs del INE
 Migrado y simplificado del proyecto original
 """
 
-import requests
 import json
 import time
 import csv
+import os
+import codecs
+import hashlib
+import tempfile
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
 from .metadata_manager import MetadataManager
+from .rate_limiter import HostRateLimiter
+from .http_client import CONFIG_PATH, load_config, create_session
+from .raw_storage import SUFIJOS, resolve_compression, raw_base_name, compressor, open_raw_text
+from .partial_download import PartialDownload
+
+class CSVInvalidoError(ValueError):
+    """El contenido descargado no es un CSV válido"""
+
 
 class Downloader:
     """Descarga robusta de tablas del INE con reintentos y validación"""
     
-    def __init__(self):
-        self.config_path = Path(__file__).parent.parent / 'config' / 'tables.json'
+    # Tamaño de bloque para la descarga en streaming
+    CHUNK_SIZE = 64 * 1024
+    
+    # Líneas que se validan al inicio del CSV
+    LINEAS_VALIDACION = 5
+    
+    def __init__(self, config=None, session=None, metadata_manager=None):
+        """
+        Args:
+            config: Configuración de tables.json ya cargada (None = leerla)
+            session: Sesión HTTP compartida (None = crear una propia)
+            metadata_manager: MetadataManager compartido (None = crear uno)
+        """
+        self.config_path = CONFIG_PATH
         self.data_path = Path(__file__).parent.parent / 'data' / 'raw'
         self.data_path.mkdir(parents=True, exist_ok=True)
-        self.config = self._load_config()
-        self.session = self._create_session()
+        self.config = config if config is not None else load_config(self.config_path)
+        self.session = session if session is not None else create_session(self.config)
         self.logger = self._setup_logger()
-        self.metadata_manager = MetadataManager()
-    
-    def _load_config(self):
-        """Carga la configuración"""
-        with open(self.config_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        self.metadata_manager = metadata_manager if metadata_manager is not None else MetadataManager(self.config)
+        self.rate_limiter = self._create_rate_limiter()
+        self.compresion = resolve_compression(self.config['configuracion_descarga'].get('compresion_raw'))
     
-    def _create_session(self):
-        """Crea sesión HTTP con configuración robusta"""
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'text/csv,application/csv,text/plain,*/*',
-            'Accept-Language': 'es-ES,es;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive',
-            'Cache-Control': 'no-cache'
-        })
-        # Configurar reintentos automáticos
-        adapter = requests.adapters.HTTPAdapter(
-            max_retries=requests.adapters.Retry(
-                total=3,
-                backoff_factor=1,
-                status_forcelist=[500, 502, 503, 504]
-            )
+    def _create_rate_limiter(self):
+        """Crea el limitador de peticiones por host"""
+        config_descarga = self.config['configuracion_descarga']
+        return HostRateLimiter(
+            peticiones_por_segundo=config_descarga.get('peticiones_por_segundo', 2),
+            rafaga_maxima=config_descarga.get('rafaga_maxima', 4)
         )
-        session.mount('http://', adapter)
-        session.mount('https://', adapter)
-        return session
     
     def _setup_logger(self):
         """Configura el logger"""
@@ -67,8 +73,15 @@ class Downloader:
         
         return logger
     
-    def download_all_tables(self, verbose=True):
-        """Descarga todas las tablas configuradas"""
+    def download_all_tables(self, verbose=True, concurrencia=None):
+        """
+        Descarga todas las tablas configuradas
+        
+        Args:
+            verbose: Si True, muestra progreso por consola
+            concurrencia: Número de descargas simultáneas. Por defecto usa
+                `descargas_concurrentes` de `configuracion_descarga` (1 = secuencial)
+        """
         resultados = {
             'fecha_inicio': datetime.now().isoformat(),
             'total_tablas': 0,
@@ -79,43 +92,43 @@ class Downloader:
         
         inicio = time.time()
         
-        # Contar total de tablas
-        for categoria_info in self.config['categorias'].values():
-            resultados['total_tablas'] += len(categoria_info['tablas'])
+        if concurrencia is None:
+            concurrencia = self.config['configuracion_descarga'].get('descargas_concurrentes', 1)
+        concurrencia = max(1, int(concurrencia))
+        
+        # Descargas parciales abandonadas hace tiempo
+        horas = self.config['configuracion_descarga'].get('antiguedad_maxima_parciales_horas', 24)
+        eliminadas = PartialDownload.cleanup_stale(self.data_path / 'csv', horas * 3600)
+        if eliminadas:
+            self.logger.info(f"Eliminadas {eliminadas} descargas parciales antiguas")
+        
+        # Lista ordenada de tablas (categoría, código, info)
+        tablas = [
+            (categoria, codigo, tabla_info)
+            for categoria, categoria_info in self.config['categorias'].items()
+            for codigo, tabla_info in categoria_info['tablas'].items()
+        ]
+        resultados['total_tablas'] = len(tablas)
         
         if verbose:
             print(f"\n{'='*60}")
             print(f"DESCARGA DE TABLAS INE - ABSENTISMO")
             print(f"{'='*60}")
             print(f"Total de tablas a descargar: {resultados['total_tablas']}")
+            if concurrencia > 1:
+                print(f"Descargas simultáneas: {concurrencia}")
             print(f"{'='*60}\n")
         
-        contador = 0
+        if concurrencia > 1:
+            descargas = self._download_concurrent(tablas, concurrencia, verbose)
+        else:
+            descargas = self._download_sequential(tablas, verbose)
         
-        for categoria, categoria_info in self.config['categorias'].items():
-            if verbose:
-                print(f"\n[{categoria.upper()}] - {categoria_info['descripcion']}")
-                print(f"{'-'*50}")
-            
-            for codigo, tabla_info in categoria_info['tablas'].items():
-                contador += 1
-                
-                if verbose:
-                    print(f"[{contador}/{resultados['total_tablas']}] Descargando tabla {codigo}: {tabla_info['nombre'][:40]}...", end='')
-                
-                resultado = self._download_table(codigo, tabla_info)
-                
-                if resultado['exitoso']:
-                    resultados['exitosas'].append(resultado)
-                    if verbose:
-                        print(f" ✓ ({resultado['tamaño_kb']:.1f} KB)")
-                else:
-                    resultados['fallidas'].append(resultado)
-                    if verbose:
-                        print(f" ✗ ({resultado['error']})")
-                
-                # Pequeña pausa entre descargas
-                time.sleep(0.5)
+        for resultado in descargas:
+            if resultado['exitoso']:
+                resultados['exitosas'].append(resultado)
+            else:
+                resultados['fallidas'].append(resultado)
         
         resultados['tiempo_total'] = time.time() - inicio
         resultados['fecha_fin'] = datetime.now().isoformat()
@@ -128,6 +141,74 @@ class Downloader:
         
         return resultados
     
+    def _download_sequential(self, tablas, verbose):
+        """Descarga las tablas una a una, en el orden de la configuración"""
+        descargas = []
+        categoria_actual = None
+        
+        for contador, (categoria, codigo, tabla_info) in enumerate(tablas, start=1):
+            if verbose and categoria != categoria_actual:
+                categoria_actual = categoria
+                print(f"\n[{categoria.upper()}] - {self.config['categorias'][categoria]['descripcion']}")
+                print(f"{'-'*50}")
+            
+            if verbose:
+                print(f"[{contador}/{len(tablas)}] Descargando tabla {codigo}: {tabla_info['nombre'][:40]}...", end='')
+            
+            resultado = self._download_table(codigo, tabla_info)
+            descargas.append(resultado)
+            
+            if verbose:
+                self._print_result(resultado)
+        
+        return descargas
+    
+    def _download_concurrent(self, tablas, concurrencia, verbose):
+        """
+        Descarga las tablas con un pool de hilos acotado.
+        El ritmo contra cada host lo marca `self.rate_limiter`; los resultados
+        se devuelven en el orden de la configuración.
+        """
+        descargas = [None] * len(tablas)
+        completadas = 0
+        
+        with ThreadPoolExecutor(max_workers=concurrencia) as executor:
+            futuros = {
+                executor.submit(self._download_table, codigo, tabla_info): indice
+                for indice, (_, codigo, tabla_info) in enumerate(tablas)
+            }
+            
+            for futuro in as_completed(futuros):
+                indice = futuros[futuro]
+                _, codigo, tabla_info = tablas[indice]
+                try:
+                    resultado = futuro.result()
+                except Exception as e:
+                    resultado = {
+                        'codigo': codigo,
+                        'nombre': tabla_info['nombre'],
+                        'exitoso': False,
+                        'error': str(e),
+                        'timestamp': datetime.now().isoformat()
+                    }
+                descargas[indice] = resultado
+                completadas += 1
+                
+                if verbose:
+                    print(f"[{completadas}/{len(tablas)}] Tabla {codigo}: {tabla_info['nombre'][:40]}...", end='')
+                    self._print_result(resultado)
+        
+        return descargas
+    
+    def _print_result(self, resultado):
+        """Completa la línea de progreso con el resultado de una descarga"""
+        if resultado.get('sin_cambios'):
+            print(" = (sin cambios)")
+        elif resultado['exitoso']:
+            print(f" ✓ ({resultado['tamaño_kb']:.1f} KB)")
+        else:
+            print(f" ✗ ({resultado['error']})")
+    
     def download_single_table(self, codigo_tabla):
         """Descarga una tabla específica"""
         for categoria_info in self.config['categorias'].values():
@@ -143,6 +224,8 @@ class Downloader:
     
     def _download_table(self, codigo, tabla_info):
         """Descarga una tabla con reintentos y validación"""
+        import requests  # Diferido: solo se paga al descargar
+        
         resultado = {
             'codigo': codigo,
             'nombre': tabla_info['nombre'],
@@ -158,66 +241,122 @@ class Downloader:
         timeout = self.config['configuracion_descarga']['timeout_segundos']
         delay = self.config['configuracion_descarga']['delay_entre_reintentos']
         
+        encodings = self.config['configuracion_descarga']['encodings_posibles']
+        indice_encoding = 0
+        
+        csv_path = self._get_csv_path(codigo, tabla_info)
+        headers_condicionales = self._conditional_headers(codigo, csv_path, tabla_info['url_csv'])
+        
+        # Checkpoint .part para continuar con Range si la transferencia se corta
+        parcial = None
+        if self.config['configuracion_descarga'].get('reanudar_descargas', True):
+            csv_path.parent.mkdir(parents=True, exist_ok=True)
+            parcial = PartialDownload(csv_path, tabla_info['url_csv'])
+        
         for intento in range(max_reintentos):
             resultado['intentos'] = intento + 1
             
             try:
-                # Descargar el archivo
+                # Respetar el límite de peticiones contra el host
+                self.rate_limiter.acquire(tabla_info['url_csv'])
+                
+                # Descargar el archivo (continuando el .part si lo hay)
+                headers = dict(headers_condicionales)
+                if parcial:
+                    headers.update(parcial.resume_headers())
                 response = self.session.get(
                     tabla_info['url_csv'],
+                    headers=headers,
                     timeout=timeout,
                     stream=True
                 )
                 
-                if response.status_code == 200:
-                    # Guardar el archivo
-                    file_path = self.data_path / f"{codigo}.csv"
-                    content = response.content
+                if response.status_code == 304:
+                    # Sin cambios en el INE: no se reescribe, ni backup, ni metadata
+                    response.close()
+                    if parcial:
+                        parcial.discard()
+                    resultado['exitoso'] = True
+                    resultado['sin_cambios'] = True
+                    resultado['archivo'] = str(csv_path)
+                    self.logger.info(f"Tabla {codigo} sin cambios (HTTP 304)")
+                    return resultado
+                
+                if response.status_code in (200, 206):
+                    csv_path.parent.mkdir(parents=True, exist_ok=True)
+                    if parcial:
+                        parcial.start(response)
+                    elif response.status_code == 206:
+                        raise ValueError('Respuesta parcial inesperada (HTTP 206)')
+                    
+                    # Descarga en streaming: decodifica, valida, hashea y escribe en una pasada
+                    descarga = self._stream_to_file(response, csv_path, encodings[indice_encoding:], parcial)
+                    resultado['encoding_usado'] = descarga['encoding']
+                    resultado['tamaño_kb'] = descarga['bytes_recibidos'] / 1024
+                    resultado['bytes_reanudados'] = descarga['bytes_reanudados']
+                    
+                    # Contenido idéntico al local: sin backup, sin reescritura, sin nueva versión
+                    if self._is_unchanged(codigo, csv_path, descarga['hash']):
+                        descarga['tmp_path'].unlink(missing_ok=True)
+                        self.metadata_manager.update_validators(
+                            codigo,
+                            etag=response.headers.get('ETag'),
+                            last_modified=response.headers.get('Last-Modified')
+                        )
+                        resultado['exitoso'] = True
+                        resultado['sin_cambios'] = True
+                        resultado['archivo'] = str(csv_path)
+                        self.logger.info(f"Tabla {codigo} sin cambios (hash idéntico)")
+                        return resultado
                     
-                    # Intentar decodificar con diferentes encodings
-                    texto_decodificado = None
-                    for encoding in self.config['configuracion_descarga']['encodings_posibles']:
-                        try:
-                            texto_decodificado = content.decode(encoding)
-                            resultado['encoding_usado'] = encoding
-                            break
-                        except UnicodeDecodeError:
-                            continue
+                    # Crear backup del archivo actual (en cualquier formato)
+                    anteriores = self._raw_variants(csv_path)
+                    if anteriores:
+                        self.metadata_manager.create_backup(anteriores[0], codigo)
                     
-                    if texto_decodificado:
-                        # Verificar si necesita actualización antes de guardar
-                        csv_path = self.data_path / 'csv' / f"{codigo}_{tabla_info['nombre'].replace(' ', '_').replace('/', '-')}.csv"
-                        csv_path.parent.mkdir(parents=True, exist_ok=True)
-                        
-                        # Crear backup si el archivo existe
-                        if csv_path.exists():
-                            self.metadata_manager.create_backup(csv_path)
-                        
-                        # Guardar con encoding UTF-8
-                        with open(csv_path, 'w', encoding='utf-8', newline='') as f:
-                            f.write(texto_decodificado)
-                        
-                        # Validar el CSV
-                        if self._validate_csv(csv_path):
-                            # Guardar metadata
-                            self.metadata_manager.save_table_metadata(
-                                codigo_tabla=codigo,
-                                csv_path=csv_path,
-                                url_origen=tabla_info['url_csv']
-                            )
-                            resultado['exitoso'] = True
-                            resultado['tamaño_kb'] = len(content) / 1024
-                            resultado['archivo'] = str(csv_path)
-                            self.logger.info(f"Tabla {codigo} descargada y metadata actualizada")
-                            return resultado
-                        else:
-                            resultado['error'] = 'CSV no válido'
-                    else:
-                        resultado['error'] = 'No se pudo decodificar el archivo'
+                    # Publicación atómica; se retiran las copias en otro formato
+                    os.replace(descarga['tmp_path'], csv_path)
+                    for anterior in anteriores:
+                        if anterior != csv_path:
+                            anterior.unlink(missing_ok=True)
+                    
+                    # Guardar metadata
+                    self.metadata_manager.save_table_metadata(
+                        codigo_tabla=codigo,
+                        csv_path=csv_path,
+                        url_origen=tabla_info['url_csv'],
+                        etag=response.headers.get('ETag'),
+                        last_modified=response.headers.get('Last-Modified'),
+                        hash_archivo=descarga['hash'],
+                        tamaño_bytes=csv_path.stat().st_size,
+                        encoding=descarga['encoding']
+                    )
+                    resultado['exitoso'] = True
+                    resultado['archivo'] = str(csv_path)
+                    self.logger.info(f"Tabla {codigo} descargada y metadata actualizada")
+                    return resultado
+                
+                elif response.status_code == 416 and parcial:
+                    # El .part ya estaba completo o no corresponde: se empieza de cero
+                    response.close()
+                    parcial.discard()
+                    resultado['error'] = 'Rango no satisfacible'
                 
                 else:
+                    response.close()
                     resultado['error'] = f'HTTP {response.status_code}'
                     
+            except CSVInvalidoError:
+                resultado['error'] = 'CSV no válido'
+                if parcial:
+                    parcial.discard()
+            except UnicodeDecodeError:
+                # Se reintenta forzando el siguiente encoding candidato
+                if indice_encoding < len(encodings) - 1:
+                    indice_encoding += 1
+                    resultado['error'] = 'Encoding inconsistente, reintentando'
+                else:
+                    resultado['error'] = 'No se pudo decodificar el archivo'
             except requests.exceptions.Timeout:
                 resultado['error'] = 'Timeout'
             except requests.exceptions.ConnectionError:
@@ -232,18 +371,164 @@ class Downloader:
         self.logger.error(f"Error descargando tabla {codigo}: {resultado['error']}")
         return resultado
     
+    def _get_csv_path(self, codigo, tabla_info):
+        """Ruta del CSV normalizado de una tabla (.csv, .csv.gz o .csv.zst según `compresion_raw`)"""
+        nombre = f"{codigo}_{tabla_info['nombre'].replace(' ', '_').replace('/', '-')}"
+        return self.data_path / 'csv' / f"{nombre}{SUFIJOS[self.compresion]}"
+    
+    def _raw_variants(self, csv_path):
+        """Archivos existentes de la misma tabla en cualquier formato (primero `csv_path`)"""
+        base = raw_base_name(csv_path)
+        variantes = [csv_path] + [csv_path.with_name(base + sufijo) for sufijo in SUFIJOS.values()]
+        return [v for i, v in enumerate(variantes) if v.exists() and v not in variantes[:i]]
+    
+    def _is_unchanged(self, codigo, csv_path, hash_descarga):
+        """Indica si el contenido descargado coincide con el CSV local registrado"""
+        if not csv_path.exists():
+            return False
+        metadata = self.metadata_manager.get_table_metadata(codigo)
+        return bool(metadata) and metadata.get('hash_archivo') == hash_descarga
+    
+    def _conditional_headers(self, codigo, csv_path, url_csv):
+        """
+        Cabeceras If-None-Match / If-Modified-Since a partir de los validadores
+        guardados en la metadata. Solo se envían si el CSV local sigue existiendo
+        y procede de la misma URL.
+        """
+        if not csv_path.exists():
+            return {}
+        
+        metadata = self.metadata_manager.get_table_metadata(codigo)
+        if not metadata or metadata.get('url_origen') != url_csv:
+            return {}
+        
+        headers = {}
+        if metadata.get('etag'):
+            headers['If-None-Match'] = metadata['etag']
+        if metadata.get('last_modified'):
+            headers['If-Modified-Since'] = metadata['last_modified']
+        return headers
+    
+    def _stream_to_file(self, response, csv_path, encodings, parcial=None):
+        """
+        Vuelca la respuesta a un temporal junto a `csv_path` en una sola pasada.
+        
+        Cada bloque se decodifica de forma incremental, se re-codifica a UTF-8,
+        se añade al SHA-256 y se escribe (comprimido si `compresion_raw` lo pide;
+        el hash es siempre el del CSV sin comprimir). Las primeras líneas se
+        validan como CSV en cuanto llegan. La memoria usada no depende del
+        tamaño de la tabla.
+        
+        Args:
+            response: Respuesta HTTP abierta con stream=True
+            csv_path: Ruta final del CSV (el temporal se crea en su directorio)
+            encodings: Encodings candidatos en orden de preferencia
+            parcial: PartialDownload ya iniciado; si reanuda, el cuerpo empieza
+                por lo guardado en el `.part` y sigue con lo que llega por red
+            
+        Returns:
+            Diccionario con tmp_path, encoding, hash, bytes_recibidos (por red),
+            bytes_reanudados (leídos del `.part`) y bytes_escritos
+            
+        Raises:
+            CSVInvalidoError si las primeras líneas no son un CSV válido
+            UnicodeDecodeError si el encoding cambia a mitad del archivo
+            DescargaIncompletaError si el cuerpo no llega completo
+        """
+        encoding = encodings[0]
+        decoder = codecs.getincrementaldecoder(encoding)()
+        solo_ascii = True
+        sha256 = hashlib.sha256()
+        bytes_cuerpo = 0
+        bytes_escritos = 0
+        cabecera = ''
+        validado = False
+        
+        fd, tmp_name = tempfile.mkstemp(dir=csv_path.parent, prefix=f".{csv_path.stem}_", suffix='.tmp')
+        tmp_path = Path(tmp_name)
+        try:
+            with os.fdopen(fd, 'wb') as raw, compressor(raw, self.compresion) as f:
+                if parcial:
+                    bloques = parcial.chunks(response, self.CHUNK_SIZE)
+                else:
+                    bloques = response.iter_content(chunk_size=self.CHUNK_SIZE)
+                for chunk in bloques:
+                    if not chunk:
+                        continue
+                    bytes_cuerpo += len(chunk)
+                    
+                    try:
+                        texto = decoder.decode(chunk)
+                    except UnicodeDecodeError:
+                        # Si todo lo anterior era ASCII, cambiar de encoding es
+                        # equivalente a haber empezado con el siguiente candidato
+                        if not solo_ascii or len(encodings) == 1:
+                            raise
+                        encodings = encodings[1:]
+                        encoding = encodings[0]
+                        decoder = codecs.getincrementaldecoder(encoding)()
+                        texto = decoder.decode(chunk)
+                    solo_ascii = solo_ascii and chunk.isascii()
+                    
+                    if not validado:
+                        cabecera += texto
+                        if cabecera.count('\n') >= self.LINEAS_VALIDACION:
+                            if not self._validate_csv_text(cabecera):
+                                raise CSVInvalidoError()
+                            validado = True
+                            cabecera = ''
+                    
+                    datos = chunk if encoding.lower().replace('_', '-') == 'utf-8' else texto.encode('utf-8')
+                    sha256.update(datos)
+                    f.write(datos)
+                    bytes_escritos += len(datos)
+                
+                texto = decoder.decode(b'', final=True)
+                if texto:
+                    datos = texto.encode('utf-8')
+                    sha256.update(datos)
+                    f.write(datos)
+                    bytes_escritos += len(datos)
+            
+            if not validado and not self._validate_csv_text(cabecera + texto):
+                raise CSVInvalidoError()
+            if parcial:
+                parcial.complete(bytes_cuerpo)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        finally:
+            response.close()
+        
+        bytes_reanudados = parcial.bytes_reanudados if parcial else 0
+        return {
+            'tmp_path': tmp_path,
+            'encoding': encoding,
+            'hash': sha256.hexdigest(),
+            'bytes_recibidos': bytes_cuerpo - bytes_reanudados,
+            'bytes_reanudados': bytes_reanudados,
+            'bytes_escritos': bytes_escritos
+        }
+    
+    def _validate_csv_text(self, texto):
+        """Valida que las primeras líneas de un texto sean un CSV legible"""
+        try:
+            reader = csv.reader(texto.splitlines(keepends=True), delimiter=';')
+            for i, row in enumerate(reader):
+                if i >= self.LINEAS_VALIDACION:
+                    break
+                if not row or len(row) == 0:
+                    return False
+            return True
+        except Exception:
+            return False
+    
     def _validate_csv(self, file_path):
         """Valida que el archivo CSV sea legible"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                reader = csv.reader(f, delimiter=';')
-                # Intentar leer las primeras líneas
-                for i, row in enumerate(reader):
-                    if i >= 5:  # Verificar solo las primeras 5 líneas
-                        break
-                    if not row or len(row) == 0:
-                        return False
-            return True
+            with open_raw_text(file_path, encoding='utf-8') as f:
+                lineas = [f.readline() for _ in range(self.LINEAS_VALIDACION)]
+            return self._validate_csv_text(''.join(lineas))
         except:
             return False
     
@@ -262,6 +547,9 @@ class Downloader:
         print(f"{'='*60}")
         print(f"Total de tablas: {resultados['total_tablas']}")
         print(f"Exitosas: {len(resultados['exitosas'])}")
+        sin_cambios = sum(1 for r in resultados['exitosas'] if r.get('sin_cambios'))
+        if sin_cambios:
+            print(f"  Sin cambios: {sin_cambios}")
         print(f"Fallidas: {len(resultados['fallidas'])}")
         print(f"Tiempo total: {resultados['tiempo_total']:.1f} segundos")
         
@@ -0,0 +1,84 @@
+"""
+Configuración y cliente HTTP compartidos por los componentes del extractor
+INEExtractor carga tables.json y crea la sesión una sola vez y las inyecta en
+INEScraper, Downloader y UpdateManager (mismo pool keep-alive para todos)
+"""
+
+import json
+from pathlib import Path
+
+CONFIG_PATH = Path(__file__).parent.parent / 'config' / 'tables.json'
+
+# Sin Accept-Encoding: requests anuncia solo las codificaciones que sabe descomprimir
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': 'text/csv,application/csv,application/json,text/plain,*/*',
+    'Accept-Language': 'es-ES,es;q=0.9',
+    'Connection': 'keep-alive',
+    'Cache-Control': 'no-cache'
+}
+
+
+def load_config(config_path=CONFIG_PATH):
+    """Carga tables.json"""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def create_session(config):
+    """
+    Sesión HTTP con reintentos ante 5xx y un pool dimensionado para la mayor
+    concurrencia configurada (descargas o verificaciones)
+
+    Las URLs de descarga de CSV (`url_csv` de las tablas) van por un adaptador
+    sin reintentos: el Downloader reintenta por su cuenta y cada intento pasa
+    por el HostRateLimiter, así que ninguna petición al INE se salta el límite.
+    """
+    import requests  # Diferido: solo se paga al crear la sesión
+
+    config_descarga = config.get('configuracion_descarga', {})
+    pool = max(
+        10,
+        config_descarga.get('descargas_concurrentes', 1),
+        config_descarga.get('verificaciones_concurrentes', 1)
+    )
+
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=pool,
+        max_retries=requests.adapters.Retry(
+            total=3,
+            backoff_factor=1,
+            status_forcelist=[500, 502, 503, 504]
+        )
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    adapter_descargas = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=pool, max_retries=0)
+    for prefijo in download_prefixes(config):
+        session.mount(prefijo, adapter_descargas)
+    return session
+
+
+def download_prefixes(config):
+    """Prefijos (hasta la última '/') de las `url_csv` configuradas"""
+    return sorted({
+        tabla_info['url_csv'].rsplit('/', 1)[0] + '/'
+        for categoria_info in config.get('categorias', {}).values()
+        for tabla_info in categoria_info.get('tablas', {}).values()
+        if tabla_info.get('url_csv')
+    })
+
+
+def http2_enabled(config):
+    """True si se pidió HTTP/2 en la configuración y h2 está instalado (solo cliente httpx)"""
+    if not config.get('configuracion_descarga', {}).get('http2', False):
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
@@ -3,35 +3,38 @@ Scraper para páginas del INE
 Detecta actualizaciones y cambios en las tablas de absentismo
 """
 
-import requests
 import json
 from pathlib import Path
 from datetime import datetime
 import logging
+from .period_probe import PeriodProbe
+from .http_client import CONFIG_PATH, load_config, create_session
 
 class INEScraper:
     """Extrae información de las páginas del INE"""
     
-    def __init__(self):
-        self.config_path = Path(__file__).parent.parent / 'config' / 'tables.json'
+    def __init__(self, config=None, session=None):
+        """
+        Args:
+            config: Configuración de tables.json ya cargada (None = leerla)
+            session: Sesión HTTP compartida (None = crear una propia)
+        """
+        self.config_path = CONFIG_PATH
         self.metadata_path = Path(__file__).parent.parent / 'data' / 'metadata'
         self.metadata_path.mkdir(parents=True, exist_ok=True)
-        self.config = self._load_config()
-        self.session = self._create_session()
+        self.config = config if config is not None else load_config(self.config_path)
+        self.session = session if session is not None else create_session(self.config)
         self.logger = self._setup_logger()
+        self.period_probe = self._create_period_probe()
     
-    def _load_config(self):
-        """Carga la configuración de tablas"""
-        with open(self.config_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    
-    def _create_session(self):
-        """Crea una sesión HTTP reutilizable"""
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-        return session
+    def _create_period_probe(self):
+        """Crea la capa de sondeo de períodos (nult=1 + cache con TTL)"""
+        config_descarga = self.config.get('configuracion_descarga', {})
+        return PeriodProbe(
+            self.session,
+            cache_path=self.metadata_path / 'cache_sondeo_periodos.json',
+            ttl_segundos=config_descarga.get('ttl_cache_sondeo_segundos', 3600)
+        )
     
     def _setup_logger(self):
         """Configura el logger"""
@@ -39,8 +42,13 @@ class INEScraper:
         logger.setLevel(logging.INFO)
         return logger
     
-    def check_updates(self):
-        """Verifica actualizaciones en todas las tablas"""
+    def check_updates(self, usar_cache=True):
+        """
+        Verifica actualizaciones en todas las tablas
+        
+        Args:
+            usar_cache: Si False, ignora la cache de sondeo y consulta el INE
+        """
         updates = {
             'fecha_verificacion': datetime.now().isoformat(),
             'tablas_verificadas': 0,
@@ -53,36 +61,27 @@ class INEScraper:
             
             for codigo, tabla_info in info['tablas'].items():
                 try:
-                    # Verificar disponibilidad vía JSON API
-                    response = self.session.get(
-                        tabla_info['url_json'],
-                        timeout=10
-                    )
+                    # Verificar vía JSON API pidiendo solo la última observación
+                    periodo_info = self.period_probe.probe(codigo, tabla_info['url_json'], usar_cache=usar_cache)
                     
-                    if response.status_code == 200:
-                        data = response.json()
-                        
-                        # Extraer información temporal
-                        periodo_info = self._extract_periodo_info(data)
-                        
-                        updates['tablas_verificadas'] += 1
-                        
-                        # Guardar metadata de la tabla
-                        tabla_metadata = {
-                            'codigo': codigo,
-                            'nombre': tabla_info['nombre'],
-                            'categoria': categoria,
-                            'ultimo_periodo': periodo_info.get('ultimo_periodo'),
-                            'total_periodos': periodo_info.get('total_periodos'),
-                            'fecha_verificacion': datetime.now().isoformat()
-                        }
-                        
-                        # Comparar con metadata anterior si existe
-                        if self._check_if_updated(codigo, tabla_metadata):
-                            updates['actualizaciones_detectadas'].append(tabla_metadata)
-                        
-                        # Guardar metadata actual
-                        self._save_table_metadata(codigo, tabla_metadata)
+                    updates['tablas_verificadas'] += 1
+                    
+                    # Guardar metadata de la tabla
+                    tabla_metadata = {
+                        'codigo': codigo,
+                        'nombre': tabla_info['nombre'],
+                        'categoria': categoria,
+                        'ultimo_periodo': periodo_info.get('ultimo_periodo'),
+                        'total_periodos': periodo_info.get('total_periodos'),
+                        'fecha_verificacion': datetime.now().isoformat()
+                    }
+                    
+                    # Comparar con metadata anterior si existe
+                    if self._check_if_updated(codigo, tabla_metadata):
+                        updates['actualizaciones_detectadas'].append(tabla_metadata)
+                    
+                    # Guardar metadata actual
+                    self._save_table_metadata(codigo, tabla_metadata)
                         
                 except Exception as e:
                     error_info = {
@@ -92,35 +91,12 @@ class INEScraper:
                     updates['errores'].append(error_info)
                     self.logger.error(f"Error verificando tabla {codigo}: {e}")
         
-        # Guardar resumen de verificación
+        # Guardar resumen de verificación y cache de sondeo
         self._save_verification_summary(updates)
+        self.period_probe.save_cache()
         
         return updates
     
-    def _extract_periodo_info(self, json_data):
-        """Extrae información de periodos del JSON"""
-        periodo_info = {
-            'ultimo_periodo': None,
-            'total_periodos': 0,
-            'periodos_disponibles': []
-        }
-        
-        try:
-            # El formato del JSON del INE varía, intentar diferentes estructuras
-            if isinstance(json_data, list) and len(json_data) > 0:
-                # Buscar campos de periodo
-                for item in json_data:
-                    if 'Periodo' in item:
-                        periodo_info['periodos_disponibles'].append(item['Periodo'])
-                
-                if periodo_info['periodos_disponibles']:
-                    periodo_info['ultimo_periodo'] = max(periodo_info['periodos_disponibles'])
-                    periodo_info['total_periodos'] = len(set(periodo_info['periodos_disponibles']))
-        except:
-            pass
-        
-        return periodo_info
-    
     def _check_if_updated(self, codigo, nueva_metadata):
         """Verifica si hay actualizaciones comparando con metadata anterior"""
         metadata_file = self.metadata_path / f"tabla_{codigo}_metadata.json"
@@ -136,8 +112,10 @@ class INEScraper:
             if metadata_anterior.get('ultimo_periodo') != nueva_metadata.get('ultimo_periodo'):
                 return True
             
-            # Comparar total de periodos
-            if metadata_anterior.get('total_periodos') != nueva_metadata.get('total_periodos'):
+            # Comparar total de periodos (no disponible si solo se sondeó la última observación)
+            total_anterior = metadata_anterior.get('total_periodos')
+            total_nuevo = nueva_metadata.get('total_periodos')
+            if total_anterior is not None and total_nuevo is not None and total_anterior != total_nuevo:
                 return True
                 
         except:
@@ -164,18 +142,17 @@ class INEScraper:
                 tabla_info = info['tablas'][codigo_tabla]
                 
                 try:
-                    response = self.session.get(tabla_info['url_json'], timeout=10)
-                    if response.status_code == 200:
-                        data = response.json()
-                        return {
-                            'codigo': codigo_tabla,
-                            'nombre': tabla_info['nombre'],
-                            'categoria': categoria,
-                            'url_csv': tabla_info['url_csv'],
-                            'url_json': tabla_info['url_json'],
-                            'datos_disponibles': len(data) if isinstance(data, list) else 0,
-                            'periodo_info': self._extract_periodo_info(data)
-                        }
+                    periodo_info = self.period_probe.probe(codigo_tabla, tabla_info['url_json'])
+                    self.period_probe.save_cache()
+                    return {
+                        'codigo': codigo_tabla,
+                        'nombre': tabla_info['nombre'],
+                        'categoria': categoria,
+                        'url_csv': tabla_info['url_csv'],
+                        'url_json': tabla_info['url_json'],
+                        'datos_disponibles': periodo_info.get('series', 0),
+                        'periodo_info': periodo_info
+                    }
                 except Exception as e:
                     self.logger.error(f"Error obteniendo info de tabla {codigo_tabla}: {e}")
         
@@ -0,0 +1,232 @@
+"""
+Catálogo de metadata de tablas en SQLite
+Sustituye a los ficheros {codigo}_metadata.json: una fila por tabla con índice por
+código y el historial de versiones en una tabla aparte
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import logging
+from datetime import datetime
+from pathlib import Path
+
+# Columnas de la tabla `tablas`, en el orden en que se devuelve la metadata
+CAMPOS = (
+    'codigo_tabla', 'fecha_descarga', 'archivo', 'ultimo_periodo', 'hash_archivo',
+    'tamaño_bytes', 'encoding', 'url_origen', 'etag', 'last_modified', 'version',
+    'restaurado_de_version'
+)
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS tablas (
+    codigo_tabla TEXT PRIMARY KEY,
+    fecha_descarga TEXT,
+    archivo TEXT,
+    ultimo_periodo TEXT,
+    hash_archivo TEXT,
+    tamaño_bytes INTEGER,
+    encoding TEXT,
+    url_origen TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    version INTEGER NOT NULL,
+    restaurado_de_version INTEGER
+);
+CREATE TABLE IF NOT EXISTS versiones (
+    codigo_tabla TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    fecha TEXT,
+    periodo TEXT,
+    hash TEXT,
+    tamaño_bytes INTEGER,
+    PRIMARY KEY (codigo_tabla, version)
+);
+"""
+
+# Solo ficheros del MetadataManager (los del scraper son tabla_{codigo}_metadata.json)
+PATRON_JSON_LEGADO = re.compile(r'^\d+_metadata\.json$')
+
+
+class MetadataCatalog:
+    """
+    Catálogo transaccional de metadata (una conexión compartida entre hilos).
+
+    Las lecturas por código son búsquedas por clave primaria y cada nueva versión
+    se registra en una única transacción (fila actual + historial).
+    """
+
+    def __init__(self, db_path, json_legado_dir=None):
+        """
+        Args:
+            db_path: Fichero SQLite del catálogo
+            json_legado_dir: Directorio con {codigo}_metadata.json a importar si el catálogo está vacío
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.logger = logging.getLogger(__name__)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(ESQUEMA)
+
+        if json_legado_dir is not None:
+            self.import_json_dir(json_legado_dir)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def get(self, codigo_tabla):
+        """Metadata actual de una tabla (None si no existe)"""
+        with self.lock:
+            fila = self.conn.execute(
+                'SELECT * FROM tablas WHERE codigo_tabla = ?', (codigo_tabla,)
+            ).fetchone()
+            if fila is None:
+                return None
+            return self._to_dict(fila, self._previous_version(codigo_tabla, fila['version']))
+
+    def all(self):
+        """Metadata actual de todas las tablas, ordenada por código"""
+        with self.lock:
+            filas = self.conn.execute('SELECT * FROM tablas ORDER BY codigo_tabla').fetchall()
+            return [self._to_dict(fila) for fila in filas]
+
+    def history(self, codigo_tabla):
+        """Historial de versiones de una tabla (más antigua primero)"""
+        with self.lock:
+            filas = self.conn.execute(
+                'SELECT version, fecha, periodo, hash, "tamaño_bytes" FROM versiones '
+                'WHERE codigo_tabla = ? ORDER BY version', (codigo_tabla,)
+            ).fetchall()
+            return [dict(fila) for fila in filas]
+
+    def save_version(self, metadata):
+        """
+        Registra una nueva versión de una tabla: incrementa la versión respecto a
+        la actual y la añade al historial, todo en la misma transacción
+
+        Returns:
+            Metadata guardada (con `version` y `version_anterior`)
+        """
+        codigo = metadata['codigo_tabla']
+        with self.lock, self._transaction():
+            fila = self.conn.execute(
+                'SELECT version FROM tablas WHERE codigo_tabla = ?', (codigo,)
+            ).fetchone()
+            version = (fila['version'] if fila else 0) + 1
+            valores = {campo: metadata.get(campo) for campo in CAMPOS}
+            valores['version'] = version
+            self._upsert(valores)
+            self._insert_version(valores)
+            return self._to_dict(valores, self._previous_version(codigo, version))
+
+    def update_fields(self, codigo_tabla, **campos):
+        """Actualiza campos de la versión actual sin crear versión nueva"""
+        desconocidos = set(campos) - set(CAMPOS[1:])
+        if desconocidos:
+            raise ValueError(f"Campos no válidos: {sorted(desconocidos)}")
+        asignaciones = ', '.join(f'"{campo}" = ?' for campo in campos)
+        with self.lock, self._transaction():
+            self.conn.execute(
+                f'UPDATE tablas SET {asignaciones} WHERE codigo_tabla = ?',
+                (*campos.values(), codigo_tabla)
+            )
+            fila = self.conn.execute(
+                'SELECT * FROM tablas WHERE codigo_tabla = ?', (codigo_tabla,)
+            ).fetchone()
+            if fila is None:
+                return None
+            return self._to_dict(fila, self._previous_version(codigo_tabla, fila['version']))
+
+    def import_json_dir(self, directorio):
+        """Importa los {codigo}_metadata.json antiguos si el catálogo aún está vacío"""
+        directorio = Path(directorio)
+        if not directorio.exists():
+            return 0
+        with self.lock:
+            if self.conn.execute('SELECT 1 FROM tablas LIMIT 1').fetchone():
+                return 0
+            ficheros = [f for f in directorio.glob('*_metadata.json') if PATRON_JSON_LEGADO.match(f.name)]
+            if not ficheros:
+                return 0
+
+            importadas = 0
+            with self._transaction():
+                for fichero in ficheros:
+                    try:
+                        with open(fichero, 'r', encoding='utf-8') as f:
+                            metadata = json.load(f)
+                    except Exception as e:
+                        self.logger.error(f"Error leyendo {fichero}: {e}")
+                        continue
+
+                    valores = {campo: metadata.get(campo) for campo in CAMPOS}
+                    valores['codigo_tabla'] = valores['codigo_tabla'] or fichero.name.split('_')[0]
+                    valores['version'] = metadata.get('version') or 1
+                    anterior = metadata.get('version_anterior')
+                    if anterior and valores['version'] > 1:
+                        self.conn.execute(
+                            'INSERT OR IGNORE INTO versiones VALUES (?, ?, ?, ?, ?, ?)',
+                            (valores['codigo_tabla'], valores['version'] - 1, anterior.get('fecha'),
+                             anterior.get('periodo'), anterior.get('hash'), None)
+                        )
+                    self._upsert(valores)
+                    self._insert_version(valores)
+                    importadas += 1
+
+        self.logger.info(f"Importadas {importadas} tablas al catálogo desde {directorio}")
+        return importadas
+
+    def _transaction(self):
+        """Context manager de transacción (BEGIN IMMEDIATE ... COMMIT/ROLLBACK)"""
+        return _Transaction(self.conn)
+
+    def _upsert(self, valores):
+        columnas = ', '.join(f'"{campo}"' for campo in CAMPOS)
+        marcadores = ', '.join('?' for _ in CAMPOS)
+        self.conn.execute(
+            f'INSERT OR REPLACE INTO tablas ({columnas}) VALUES ({marcadores})',
+            tuple(valores.get(campo) for campo in CAMPOS)
+        )
+
+    def _insert_version(self, valores):
+        self.conn.execute(
+            'INSERT OR REPLACE INTO versiones VALUES (?, ?, ?, ?, ?, ?)',
+            (valores['codigo_tabla'], valores['version'], valores.get('fecha_descarga') or datetime.now().isoformat(),
+             valores.get('ultimo_periodo'), valores.get('hash_archivo'), valores.get('tamaño_bytes'))
+        )
+
+    def _previous_version(self, codigo_tabla, version):
+        return self.conn.execute(
+            'SELECT fecha, periodo, hash FROM versiones WHERE codigo_tabla = ? AND version < ? '
+            'ORDER BY version DESC LIMIT 1', (codigo_tabla, version)
+        ).fetchone()
+
+    @staticmethod
+    def _to_dict(fila, anterior=None):
+        metadata = {campo: fila[campo] for campo in CAMPOS}
+        if metadata['restaurado_de_version'] is None:
+            del metadata['restaurado_de_version']
+        if anterior is not None:
+            metadata['version_anterior'] = dict(anterior)
+        return metadata
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE al entrar; COMMIT si no hay excepción, ROLLBACK si la hay"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return False
@@ -8,22 +8,62 @@ import hashlib
 from pathlib import Path
 from datetime import datetime
 import logging
+from .backup_store import BackupStore
+from .metadata_catalog import MetadataCatalog
+from .raw_storage import open_raw, open_raw_text
 
 class MetadataManager:
     """Gestiona metadata de las tablas descargadas"""
     
-    def __init__(self):
+    def __init__(self, config=None):
+        """
+        Args:
+            config: Configuración de tables.json ya cargada (None = leerla al crear el almacén de backups)
+        """
+        self.config = config
         self.base_path = Path(__file__).parent.parent
         self.metadata_dir = self.base_path / 'data' / 'metadata'
         self.metadata_dir.mkdir(parents=True, exist_ok=True)
         self.logger = logging.getLogger(__name__)
+        self._backup_store = None
+        self._catalog = None
+    
+    @property
+    def catalog(self):
+        """
+        Catálogo SQLite en metadata_dir/catalogo.db (se abre en el primer uso y
+        se reabre si cambia metadata_dir). Al crearlo importa los JSON antiguos.
+        """
+        db_path = self.metadata_dir / 'catalogo.db'
+        if self._catalog is None or self._catalog.db_path != db_path:
+            self._catalog = MetadataCatalog(db_path, json_legado_dir=self.metadata_dir)
+        return self._catalog
+    
+    @property
+    def backup_store(self):
+        """Almacén de backups (se crea en el primer uso bajo data/backups)"""
+        if self._backup_store is None:
+            if self.config is not None:
+                config = self.config.get('configuracion_backups', {})
+            else:
+                config = {}
+                config_path = self.base_path / 'config' / 'tables.json'
+                if config_path.exists():
+                    with open(config_path, 'r', encoding='utf-8') as f:
+                        config = json.load(f).get('configuracion_backups', {})
+            self._backup_store = BackupStore(
+                self.base_path / 'data' / 'backups',
+                compresion=config.get('compresion', 'gzip'),
+                versiones_por_tabla=config.get('versiones_por_tabla', 10)
+            )
+        return self._backup_store
         
     def calculate_file_hash(self, file_path):
-        """Calcula el hash SHA256 de un archivo"""
+        """Calcula el hash SHA256 del contenido (descomprimido) de un CSV"""
         sha256_hash = hashlib.sha256()
         try:
-            with open(file_path, "rb") as f:
-                for byte_block in iter(lambda: f.read(4096), b""):
+            with open_raw(file_path) as f:
+                for byte_block in iter(lambda: f.read(64 * 1024), b""):
                     sha256_hash.update(byte_block)
             return sha256_hash.hexdigest()
         except Exception as e:
@@ -33,65 +73,82 @@ class MetadataManager:
     def extract_last_period(self, csv_path):
         """Extrae el último período disponible del CSV"""
         try:
-            with open(csv_path, 'r', encoding='utf-8-sig') as f:
-                lines = f.readlines()
-                if len(lines) > 1:
-                    # Buscar columna de periodo en la primera línea de datos
-                    header = lines[0].strip().split(';')
-                    if 'Periodo' in header:
-                        periodo_idx = header.index('Periodo')
-                        # Segunda línea tiene los datos más recientes
-                        data_line = lines[1].strip().split(';')
-                        if len(data_line) > periodo_idx:
-                            return data_line[periodo_idx]
+            # Solo hacen falta la cabecera y la primera fila (la más reciente)
+            with open_raw_text(csv_path) as f:
+                header = f.readline().strip().split(';')
+                data_line = f.readline().strip().split(';')
+            if 'Periodo' in header:
+                periodo_idx = header.index('Periodo')
+                if len(data_line) > periodo_idx:
+                    return data_line[periodo_idx]
         except Exception as e:
             self.logger.error(f"Error extrayendo período: {e}")
         return None
     
     def get_table_metadata(self, codigo_tabla):
         """Obtiene metadata de una tabla específica"""
-        metadata_file = self.metadata_dir / f"{codigo_tabla}_metadata.json"
-        if metadata_file.exists():
-            try:
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                self.logger.error(f"Error leyendo metadata de {codigo_tabla}: {e}")
+        try:
+            return self.catalog.get(codigo_tabla)
+        except Exception as e:
+            self.logger.error(f"Error leyendo metadata de {codigo_tabla}: {e}")
         return None
     
-    def save_table_metadata(self, codigo_tabla, csv_path, url_origen=None):
-        """Guarda metadata de una tabla"""
+    def get_version_history(self, codigo_tabla):
+        """Historial de versiones de una tabla (más antigua primero)"""
+        return self.catalog.history(codigo_tabla)
+    
+    def save_table_metadata(self, codigo_tabla, csv_path, url_origen=None, etag=None, last_modified=None,
+                            hash_archivo=None, tamaño_bytes=None, encoding=None):
+        """
+        Guarda metadata de una tabla (incluye validadores HTTP ETag/Last-Modified).
+        Si el llamador ya conoce el hash y el tamaño (descarga en streaming),
+        no se vuelve a leer el archivo para calcularlos. `encoding` es el
+        detectado en origen; el CSV local se guarda siempre en UTF-8.
+        """
+        if hash_archivo is None:
+            hash_archivo = self.calculate_file_hash(csv_path)
+        if tamaño_bytes is None:
+            tamaño_bytes = csv_path.stat().st_size if csv_path.exists() else 0
+        
         metadata = {
             'codigo_tabla': codigo_tabla,
             'fecha_descarga': datetime.now().isoformat(),
             'archivo': str(csv_path),
             'ultimo_periodo': self.extract_last_period(csv_path),
-            'hash_archivo': self.calculate_file_hash(csv_path),
-            'tamaño_bytes': csv_path.stat().st_size if csv_path.exists() else 0,
+            'hash_archivo': hash_archivo,
+            'tamaño_bytes': tamaño_bytes,
+            'encoding': encoding,
             'url_origen': url_origen,
-            'version': 1  # Para futuro control de versiones
+            'etag': etag,
+            'last_modified': last_modified
         }
         
-        # Si existe metadata anterior, incrementar versión
-        old_metadata = self.get_table_metadata(codigo_tabla)
-        if old_metadata:
-            metadata['version'] = old_metadata.get('version', 0) + 1
-            metadata['version_anterior'] = {
-                'fecha': old_metadata.get('fecha_descarga'),
-                'periodo': old_metadata.get('ultimo_periodo'),
-                'hash': old_metadata.get('hash_archivo')
-            }
-        
-        metadata_file = self.metadata_dir / f"{codigo_tabla}_metadata.json"
+        # La versión se incrementa dentro de la transacción del catálogo
         try:
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
+            metadata = self.catalog.save_version(metadata)
             self.logger.info(f"Metadata guardada para tabla {codigo_tabla}")
             return metadata
         except Exception as e:
             self.logger.error(f"Error guardando metadata: {e}")
             return None
     
+    def update_validators(self, codigo_tabla, etag=None, last_modified=None):
+        """
+        Actualiza los validadores HTTP de una tabla sin crear nueva versión
+        (el contenido local no ha cambiado)
+        """
+        metadata = self.get_table_metadata(codigo_tabla)
+        if not metadata:
+            return None
+        if metadata.get('etag') == etag and metadata.get('last_modified') == last_modified:
+            return metadata
+        
+        try:
+            return self.catalog.update_fields(codigo_tabla, etag=etag, last_modified=last_modified)
+        except Exception as e:
+            self.logger.error(f"Error actualizando validadores de {codigo_tabla}: {e}")
+            return None
+    
     def check_table_needs_update(self, codigo_tabla, remote_periodo):
         """Verifica si una tabla necesita actualización"""
         metadata = self.get_table_metadata(codigo_tabla)
@@ -127,25 +184,65 @@ class MetadataManager:
         except:
             return 0
     
-    def create_backup(self, csv_path):
-        """Crea backup del archivo anterior antes de actualizar"""
+    def create_backup(self, csv_path, codigo_tabla=None):
+        """
+        Crea backup del archivo anterior antes de actualizar.
+        
+        El contenido se guarda comprimido y deduplicado en el BackupStore;
+        si la metadata ya registra el hash del archivo y ese contenido está
+        respaldado, no se vuelve a leer el CSV.
+        """
         if csv_path.exists():
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_dir = self.base_path / 'data' / 'backups'
-            backup_dir.mkdir(parents=True, exist_ok=True)
+            codigo_tabla = codigo_tabla or csv_path.name.split('_')[0]
+            metadata = self.get_table_metadata(codigo_tabla) or {}
             
-            backup_name = f"{csv_path.stem}_{timestamp}{csv_path.suffix}"
-            backup_path = backup_dir / backup_name
+            # El hash de la metadata solo es fiable si el archivo no ha cambiado de tamaño
+            hash_conocido = None
+            if metadata.get('hash_archivo') and metadata.get('tamaño_bytes') == csv_path.stat().st_size:
+                hash_conocido = metadata['hash_archivo']
             
             try:
-                import shutil
-                shutil.copy2(csv_path, backup_path)
+                backup_path = self.backup_store.store(
+                    csv_path,
+                    codigo_tabla,
+                    version=metadata.get('version'),
+                    hash_archivo=hash_conocido
+                )
                 self.logger.info(f"Backup creado: {backup_path}")
                 return backup_path
             except Exception as e:
                 self.logger.error(f"Error creando backup: {e}")
                 return None
     
+    def restore(self, codigo_tabla, version=None):
+        """
+        Restaura una versión respaldada de una tabla en su ruta original
+        
+        Args:
+            codigo_tabla: Código de la tabla
+            version: Versión de metadata a restaurar (None = último backup)
+            
+        Returns:
+            Metadata actualizada de la tabla
+            
+        Raises:
+            KeyError si no existe backup para esa versión
+        """
+        metadata_actual = self.get_table_metadata(codigo_tabla) or {}
+        destino = metadata_actual.get('archivo')
+        csv_path, entrada = self.backup_store.restore(codigo_tabla, version=version, destino=destino)
+        
+        # Sin validadores HTTP: la próxima descarga debe comparar contenido completo
+        metadata = self.save_table_metadata(
+            codigo_tabla=codigo_tabla,
+            csv_path=csv_path,
+            url_origen=metadata_actual.get('url_origen'),
+            hash_archivo=entrada['hash']
+        )
+        if metadata:
+            metadata = self.catalog.update_fields(codigo_tabla, restaurado_de_version=entrada['version'])
+        return metadata
+    
     def get_all_metadata_summary(self):
         """Obtiene resumen de metadata de todas las tablas"""
         summary = {
@@ -153,17 +250,15 @@ class MetadataManager:
             'tablas': []
         }
         
-        for metadata_file in self.metadata_dir.glob("*_metadata.json"):
-            try:
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-                    summary['tablas'].append({
-                        'codigo': metadata.get('codigo_tabla'),
-                        'ultimo_periodo': metadata.get('ultimo_periodo'),
-                        'fecha_descarga': metadata.get('fecha_descarga'),
-                        'version': metadata.get('version', 1)
-                    })
-            except Exception as e:
-                self.logger.error(f"Error leyendo {metadata_file}: {e}")
+        try:
+            for metadata in self.catalog.all():
+                summary['tablas'].append({
+                    'codigo': metadata.get('codigo_tabla'),
+                    'ultimo_periodo': metadata.get('ultimo_periodo'),
+                    'fecha_descarga': metadata.get('fecha_descarga'),
+                    'version': metadata.get('version', 1)
+                })
+        except Exception as e:
+            self.logger.error(f"Error leyendo el catálogo de metadata: {e}")
         
         return summary
\ No newline at end of file
@@ -0,0 +1,166 @@
+"""
+Descargas reanudables: los bytes recibidos se guardan en un `.part` junto al CSV
+y, si la transferencia se corta, el siguiente intento pide solo el resto con Range
+"""
+
+import json
+import re
+import time
+import logging
+from pathlib import Path
+
+from .raw_storage import raw_base_name
+
+RE_CONTENT_RANGE = re.compile(r'bytes (\d+)-(\d+)/(\d+|\*)')
+
+
+class DescargaIncompletaError(IOError):
+    """La transferencia terminó antes de recibir el cuerpo completo"""
+
+
+class PartialDownload:
+    """
+    Checkpoint de una descarga en `.{nombre}.part` + `.{nombre}.part.json`.
+
+    El `.part` guarda el cuerpo tal como llega (antes de decodificar), y el JSON
+    la URL y los validadores de la respuesta. Solo se reanuda si el servidor
+    anunció `Accept-Ranges: bytes` y el cuerpo no venía con Content-Encoding
+    (los rangos se refieren entonces a los mismos bytes que se guardaron).
+    """
+
+    def __init__(self, csv_path, url):
+        base = raw_base_name(csv_path)
+        self.url = url
+        self.part_path = csv_path.with_name(f".{base}.part")
+        self.meta_path = csv_path.with_name(f".{base}.part.json")
+        self.logger = logging.getLogger(__name__)
+        self.offset = 0
+        self.total = None
+        self.resumible = False
+        self.bytes_reanudados = 0
+
+    def resume_headers(self):
+        """Cabeceras Range/If-Range para continuar el `.part` (vacío si no es reanudable)"""
+        meta = self._load_meta()
+        if not meta or not self.part_path.exists():
+            self.discard()
+            return {}
+        validador = meta.get('etag') or meta.get('last_modified')
+        if meta.get('url') != self.url or not meta.get('resumible') or not validador:
+            self.discard()
+            return {}
+        tamaño = self.part_path.stat().st_size
+        if tamaño == 0:
+            return {}
+        return {'Range': f'bytes={tamaño}-', 'If-Range': validador, 'Accept-Encoding': 'identity'}
+
+    def start(self, response):
+        """
+        Prepara el `.part` según la respuesta: con 206 coherente se continúa donde
+        se quedó; con 200 se empieza de cero.
+        """
+        self.offset = 0
+        self.total = None
+        if response.status_code == 206:
+            match = RE_CONTENT_RANGE.fullmatch(response.headers.get('Content-Range', '').strip())
+            tamaño = self.part_path.stat().st_size if self.part_path.exists() else 0
+            if not match or int(match.group(1)) != tamaño:
+                self.discard()
+                raise DescargaIncompletaError("Content-Range no coincide con el archivo parcial")
+            self.offset = tamaño
+            if match.group(3) != '*':
+                self.total = int(match.group(3))
+        else:
+            self.part_path.unlink(missing_ok=True)
+            longitud = response.headers.get('Content-Length')
+            if longitud and not response.headers.get('Content-Encoding'):
+                self.total = int(longitud)
+
+        self.resumible = bool(
+            (response.status_code == 206 or response.headers.get('Accept-Ranges') == 'bytes')
+            and not response.headers.get('Content-Encoding')
+        )
+        if not self.resumible:
+            # Sin rangos no hay checkpoint que guardar
+            self.discard()
+            return
+        self._save_meta({
+            'url': self.url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'total': self.total,
+            'resumible': True,
+            'fecha': time.time()
+        })
+
+    def chunks(self, response, chunk_size):
+        """
+        Bloques del cuerpo completo: primero lo ya guardado en el `.part` (si se
+        reanuda) y después lo que llega de la red, que se va añadiendo al `.part`
+        """
+        self.bytes_reanudados = 0
+        if self.offset:
+            with open(self.part_path, 'rb') as f:
+                for bloque in iter(lambda: f.read(chunk_size), b''):
+                    self.bytes_reanudados += len(bloque)
+                    yield bloque
+
+        if not self.resumible:
+            yield from response.iter_content(chunk_size=chunk_size)
+            return
+
+        with open(self.part_path, 'ab' if self.offset else 'wb') as part:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    part.write(chunk)
+                    yield chunk
+
+    def complete(self, bytes_totales):
+        """Comprueba que se recibió el cuerpo completo y elimina el checkpoint"""
+        if self.total is not None and bytes_totales != self.total:
+            raise DescargaIncompletaError(f"Recibidos {bytes_totales} de {self.total} bytes")
+        self.discard()
+
+    def discard(self):
+        """Elimina el `.part` y sus metadatos"""
+        self.part_path.unlink(missing_ok=True)
+        self.meta_path.unlink(missing_ok=True)
+
+    def _load_meta(self):
+        if not self.meta_path.exists():
+            return None
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.warning(f"Metadatos de descarga parcial ilegibles ({self.meta_path.name}): {e}")
+            return None
+
+    def _save_meta(self, meta):
+        with open(self.meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    @staticmethod
+    def cleanup_stale(directorio, antiguedad_maxima):
+        """
+        Elimina los `.part` (y sus metadatos) con más de `antiguedad_maxima`
+        segundos sin modificarse
+
+        Returns:
+            Número de descargas parciales eliminadas
+        """
+        directorio = Path(directorio)
+        if not directorio.exists():
+            return 0
+        limite = time.time() - antiguedad_maxima
+        eliminadas = 0
+        for part in directorio.glob('.*.part'):
+            if part.stat().st_mtime < limite:
+                part.unlink(missing_ok=True)
+                part.with_name(part.name + '.json').unlink(missing_ok=True)
+                eliminadas += 1
+        # Metadatos huérfanos
+        for meta in directorio.glob('.*.part.json'):
+            if not meta.with_name(meta.name[:-len('.json')]).exists() and meta.stat().st_mtime < limite:
+                meta.unlink(missing_ok=True)
+        return eliminadas
@@ -0,0 +1,152 @@
+"""
+Sondeo ligero del último período publicado en la API Tempus del INE
+Pide solo la última observación de cada serie (nult=1) y cachea el resultado con TTL
+"""
+
+import json
+import time
+import logging
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+
+try:
+    import ijson
+except ImportError:  # Parseo incremental opcional
+    ijson = None
+
+# FK_Periodo de Tempus para trimestres (tip=AM)
+FK_PERIODO_TRIMESTRE = {19: 'T1', 20: 'T2', 21: 'T3', 22: 'T4'}
+
+
+class PeriodProbe:
+    """Obtiene el último período de una tabla DATOS_TABLA sin descargar toda la serie"""
+
+    def __init__(self, session, cache_path=None, ttl_segundos=3600, timeout=10, solo_ultimo=True):
+        """
+        Args:
+            session: Sesión HTTP (requests.Session)
+            cache_path: Fichero JSON donde persistir la cache (None = sin cache)
+            ttl_segundos: Validez de una entrada de cache
+            timeout: Timeout de las peticiones
+            solo_ultimo: Si True añade nult=1 a la URL (solo última observación)
+        """
+        self.session = session
+        self.cache_path = cache_path
+        self.ttl_segundos = ttl_segundos
+        self.timeout = timeout
+        self.solo_ultimo = solo_ultimo
+        self.logger = logging.getLogger(__name__)
+        self._cache = None
+
+    def probe(self, codigo, url_json, usar_cache=True):
+        """
+        Devuelve la información de períodos de una tabla
+
+        Returns:
+            Diccionario con ultimo_periodo, total_periodos (None si solo se pidió
+            la última observación), periodos_disponibles y series
+        """
+        if usar_cache:
+            entrada = self._load_cache().get(codigo)
+            if entrada and time.time() - entrada['timestamp'] < self.ttl_segundos:
+                return entrada['periodo_info']
+
+        url = self.latest_url(url_json) if self.solo_ultimo else url_json
+        response = self.session.get(url, timeout=self.timeout, stream=True)
+        try:
+            if response.status_code != 200:
+                raise ValueError(f"HTTP {response.status_code}")
+            periodo_info = self._parse_response(response)
+        finally:
+            response.close()
+
+        if self.solo_ultimo:
+            periodo_info['total_periodos'] = None
+            periodo_info['periodos_disponibles'] = []
+
+        self._store_cache(codigo, periodo_info)
+        return periodo_info
+
+    def latest_url(self, url_json):
+        """URL DATOS_TABLA con nult=1 (solo la última observación de cada serie)"""
+        partes = urlparse(url_json)
+        query = [(k, v) for k, v in parse_qsl(partes.query) if k != 'nult']
+        query.append(('nult', '1'))
+        return urlunparse(partes._replace(query=urlencode(query)))
+
+    def _parse_response(self, response):
+        """Parsea la respuesta serie a serie (ijson) o completa (json) si ijson no está instalado"""
+        if ijson is not None:
+            response.raw.decode_content = True
+            return self.extract_periodo_info(ijson.items(response.raw, 'item'))
+        return self.extract_periodo_info(response.json())
+
+    def extract_periodo_info(self, series):
+        """
+        Calcula la información de períodos a partir de un iterable de series
+        (o de observaciones con campo 'Periodo')
+        """
+        periodos = set()
+        num_series = 0
+
+        if isinstance(series, dict):
+            series = [series]
+
+        for item in series:
+            if not isinstance(item, dict):
+                continue
+            num_series += 1
+            periodo = self.period_of(item)
+            if periodo:
+                periodos.add(periodo)
+            for observacion in item.get('Data') or []:
+                periodo = self.period_of(observacion)
+                if periodo:
+                    periodos.add(periodo)
+
+        return {
+            'ultimo_periodo': max(periodos) if periodos else None,
+            'total_periodos': len(periodos),
+            'periodos_disponibles': sorted(periodos),
+            'series': num_series
+        }
+
+    @staticmethod
+    def period_of(observacion):
+        """Período YYYYTQ de una observación en cualquiera de los formatos de Tempus"""
+        if observacion.get('Periodo'):
+            return str(observacion['Periodo'])
+        anyo = observacion.get('Anyo')
+        if anyo is None:
+            return None
+        if observacion.get('T3_Periodo'):
+            return f"{anyo}{observacion['T3_Periodo']}"
+        trimestre = FK_PERIODO_TRIMESTRE.get(observacion.get('FK_Periodo'))
+        if trimestre:
+            return f"{anyo}{trimestre}"
+        return None
+
+    def _load_cache(self):
+        """Carga la cache desde disco (una vez por instancia)"""
+        if self._cache is None:
+            self._cache = {}
+            if self.cache_path and self.cache_path.exists():
+                try:
+                    with open(self.cache_path, 'r', encoding='utf-8') as f:
+                        self._cache = json.load(f)
+                except Exception as e:
+                    self.logger.warning(f"Cache de sondeo ilegible, se ignora: {e}")
+        return self._cache
+
+    def _store_cache(self, codigo, periodo_info):
+        """Guarda una entrada en la cache en memoria (persistir con save_cache)"""
+        self._load_cache()[codigo] = {'timestamp': time.time(), 'periodo_info': periodo_info}
+
+    def save_cache(self):
+        """Persiste la cache en disco"""
+        if not self.cache_path or self._cache is None:
+            return
+        try:
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump(self._cache, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            self.logger.warning(f"No se pudo guardar la cache de sondeo: {e}")
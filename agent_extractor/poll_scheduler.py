@@ -0,0 +1,292 @@
+"""
+Planificador de verificaciones según el calendario de publicación del INE
+Aprende de la metadata cuándo suele publicarse cada período y solo consulta al INE
+con frecuencia dentro de la ventana esperada; fuera de ella espacia las consultas
+"""
+
+import json
+import os
+import re
+import logging
+from datetime import datetime, timedelta, date
+from pathlib import Path
+from statistics import median
+
+# 2024T3 (trimestral), 2024M07 (mensual) o 2024 (anual)
+PATRON_PERIODO = re.compile(r'^\s*(\d{4})(?:([TM])(\d{1,2}))?\s*$')
+
+
+def parse_period(periodo):
+    """(año, frecuencia, índice) de un período del INE, o None si no se reconoce"""
+    if not periodo:
+        return None
+    m = PATRON_PERIODO.match(str(periodo))
+    if not m:
+        return None
+    año, frecuencia, indice = m.groups()
+    if frecuencia is None:
+        return int(año), 'A', 1
+    indice = int(indice)
+    if not 1 <= indice <= (4 if frecuencia == 'T' else 12):
+        return None
+    return int(año), frecuencia, indice
+
+
+def period_end(periodo):
+    """Último día del período (None si no se reconoce el formato)"""
+    partes = parse_period(periodo)
+    if partes is None:
+        return None
+    año, frecuencia, indice = partes
+    mes = {'A': 12, 'T': indice * 3, 'M': indice}[frecuencia]
+    if mes == 12:
+        return date(año, 12, 31)
+    return date(año, mes + 1, 1) - timedelta(days=1)
+
+
+def next_period(periodo):
+    """Período siguiente con el mismo formato (None si no se reconoce)"""
+    partes = parse_period(periodo)
+    if partes is None:
+        return None
+    año, frecuencia, indice = partes
+    if frecuencia == 'A':
+        return str(año + 1)
+    limite = 4 if frecuencia == 'T' else 12
+    if indice >= limite:
+        año, indice = año + 1, 1
+    else:
+        indice += 1
+    return f"{año}T{indice}" if frecuencia == 'T' else f"{año}M{indice:02d}"
+
+
+def period_key(periodo):
+    """Clave de orden de un período (los no reconocidos van primero)"""
+    partes = parse_period(periodo)
+    return (partes[0], partes[2]) if partes else (0, 0)
+
+
+class PollScheduler:
+    """
+    Decide qué tablas conviene verificar en cada ejecución.
+
+    Para cada tabla se estima la fecha de publicación del período siguiente al
+    local como fin de ese período + retraso habitual. El retraso se aprende de
+    la primera vez que se vio cada período (historial del catálogo y
+    detecciones previas del propio planificador); sin historial se usa
+    `retraso_publicacion_dias`. Dentro de la ventana se verifica cada
+    `intervalo_ventana_horas`; antes de ella el intervalo se duplica con cada
+    verificación sin novedad, sin pasarse del inicio de la ventana, y tras ella
+    las consultas se espacian en proporción al retraso acumulado. Los errores
+    de red se reintentan con backoff exponencial desde el intervalo de ventana.
+
+    El estado se guarda en `state_path` (JSON).
+    """
+
+    def __init__(self, state_path, metadata_manager, config=None):
+        """
+        Args:
+            state_path: Fichero JSON con el estado del planificador
+            metadata_manager: MetadataManager del que se lee el historial de períodos
+            config: Bloque `configuracion_planificador` de tables.json (None = valores por defecto)
+        """
+        config = config or {}
+        self.state_path = Path(state_path)
+        self.metadata_manager = metadata_manager
+        self.logger = logging.getLogger(__name__)
+        self.retraso_publicacion = timedelta(days=config.get('retraso_publicacion_dias', 75))
+        self.margen_ventana = timedelta(days=config.get('margen_ventana_dias', 10))
+        self.intervalo_ventana = timedelta(hours=config.get('intervalo_ventana_horas', 6))
+        self.intervalo_base = timedelta(hours=config.get('intervalo_base_horas', 24))
+        self.intervalo_maximo = timedelta(hours=config.get('intervalo_maximo_horas', 24 * 14))
+        self.state = self._load_state()
+
+    def _load_state(self):
+        if self.state_path.exists():
+            try:
+                with open(self.state_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"Estado del planificador ilegible, se reinicia: {e}")
+        return {'tablas': {}}
+
+    def save(self):
+        """Guarda el estado de forma atómica"""
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    def _table_state(self, codigo_tabla):
+        return self.state['tablas'].setdefault(codigo_tabla, {
+            'ultima_verificacion': None,
+            'proxima_verificacion': None,
+            'verificaciones_sin_novedad': 0,
+            'fallos_consecutivos': 0,
+            'ultimo_periodo_remoto': None,
+            'publicaciones': {}
+        })
+
+    def publication_dates(self, codigo_tabla):
+        """Primera fecha en que se vio cada período de la tabla: {periodo: datetime}"""
+        vistas = []
+        for entrada in self.metadata_manager.get_version_history(codigo_tabla):
+            vistas.append((entrada.get('periodo'), entrada.get('fecha')))
+        metadata = self.metadata_manager.get_table_metadata(codigo_tabla) or {}
+        vistas.append((metadata.get('ultimo_periodo'), metadata.get('fecha_descarga')))
+        estado = self.state['tablas'].get(codigo_tabla, {})
+        vistas.extend(estado.get('publicaciones', {}).items())
+
+        fechas = {}
+        for periodo, fecha in vistas:
+            if not periodo or not fecha or parse_period(periodo) is None:
+                continue
+            try:
+                fecha = datetime.fromisoformat(fecha)
+            except ValueError:
+                continue
+            if periodo not in fechas or fecha < fechas[periodo]:
+                fechas[periodo] = fecha
+        return fechas
+
+    def publication_lag(self, codigo_tabla):
+        """
+        Retraso habitual entre el fin de un período y su publicación (mediana de
+        los observados) y su dispersión, para ensanchar la ventana
+        """
+        retrasos = []
+        for periodo, fecha in self.publication_dates(codigo_tabla).items():
+            retraso = fecha.date() - period_end(periodo)
+            # Descargas muy tardías (primera descarga de un histórico) no informan de la cadencia
+            if timedelta(0) < retraso <= 2 * self.retraso_publicacion:
+                retrasos.append(retraso)
+        if not retrasos:
+            return self.retraso_publicacion, timedelta(0)
+        retraso = timedelta(days=median(r.days for r in retrasos))
+        dispersion = (max(retrasos) - min(retrasos)) / 2
+        return retraso, dispersion
+
+    def _known_period(self, codigo_tabla):
+        """Último período conocido: el local o el remoto ya detectado si es posterior"""
+        metadata = self.metadata_manager.get_table_metadata(codigo_tabla) or {}
+        periodo_local = metadata.get('ultimo_periodo')
+        remoto = self.state['tablas'].get(codigo_tabla, {}).get('ultimo_periodo_remoto')
+        if remoto and period_key(remoto) > period_key(periodo_local):
+            return remoto
+        return periodo_local
+
+    def release_window(self, codigo_tabla):
+        """
+        Ventana esperada de publicación del próximo período
+
+        Returns:
+            (periodo_esperado, inicio, fin) o None si no hay período local reconocible
+        """
+        siguiente = next_period(self._known_period(codigo_tabla))
+        if siguiente is None:
+            return None
+        retraso, dispersion = self.publication_lag(codigo_tabla)
+        esperada = datetime.combine(period_end(siguiente), datetime.min.time()) + retraso
+        margen = self.margen_ventana + dispersion
+        return siguiente, esperada - margen, esperada + margen
+
+    def pending_update(self, codigo_tabla):
+        """Indica si ya se detectó un período remoto posterior al local (sin descargar)"""
+        metadata = self.metadata_manager.get_table_metadata(codigo_tabla) or {}
+        remoto = self.state['tablas'].get(codigo_tabla, {}).get('ultimo_periodo_remoto')
+        return bool(remoto) and period_key(remoto) > period_key(metadata.get('ultimo_periodo'))
+
+    def is_due(self, codigo_tabla, ahora=None):
+        """Indica si la tabla debe verificarse ya"""
+        ahora = ahora or datetime.now()
+        if self.release_window(codigo_tabla) is None:
+            return True
+        proxima = self.state['tablas'].get(codigo_tabla, {}).get('proxima_verificacion')
+        return proxima is None or datetime.fromisoformat(proxima) <= ahora
+
+    def due_tables(self, codigos, ahora=None):
+        """Subconjunto de `codigos` que toca verificar ahora"""
+        return [codigo for codigo in codigos if self.is_due(codigo, ahora)]
+
+    def record_check(self, codigo_tabla, resultado, ahora=None):
+        """Registra el resultado de una verificación y planifica la siguiente"""
+        ahora = ahora or datetime.now()
+        estado = self._table_state(codigo_tabla)
+        estado['ultima_verificacion'] = ahora.isoformat()
+
+        periodo_remoto = resultado.get('periodo_remoto')
+        if not periodo_remoto:
+            estado['fallos_consecutivos'] += 1
+        else:
+            estado['fallos_consecutivos'] = 0
+            anterior = estado.get('ultimo_periodo_remoto')
+            if period_key(periodo_remoto) > period_key(anterior):
+                estado['ultimo_periodo_remoto'] = periodo_remoto
+                estado['verificaciones_sin_novedad'] = 0
+                if resultado.get('necesita_actualizacion'):
+                    estado['publicaciones'].setdefault(periodo_remoto, ahora.isoformat())
+            else:
+                estado['verificaciones_sin_novedad'] += 1
+
+        estado['proxima_verificacion'] = self._plan_next(codigo_tabla, estado, ahora).isoformat()
+        return estado
+
+    def _plan_next(self, codigo_tabla, estado, ahora):
+        """Fecha de la siguiente verificación según la ventana y el backoff"""
+        if estado['fallos_consecutivos']:
+            return ahora + self._backoff(self.intervalo_ventana, estado['fallos_consecutivos'] - 1)
+
+        ventana = self.release_window(codigo_tabla)
+        if ventana is None:
+            return ahora + self.intervalo_base
+        _, inicio, fin = ventana
+
+        if ahora < inicio:
+            intervalo = self._backoff(self.intervalo_base, estado['verificaciones_sin_novedad'])
+            return min(ahora + intervalo, inicio)
+        if ahora <= fin:
+            return min(ahora + self.intervalo_ventana, fin)
+        # Ventana superada sin publicación (retraso o cambio de calendario): el
+        # intervalo crece con el tiempo transcurrido, así se duplica en cada consulta
+        return ahora + min(max(self.intervalo_ventana, ahora - fin), self.intervalo_maximo)
+
+    def _backoff(self, base, exponente):
+        """base * 2**exponente, acotado por intervalo_maximo"""
+        if exponente >= 32:
+            return self.intervalo_maximo
+        return min(base * (2 ** exponente), self.intervalo_maximo)
+
+    def plan(self, codigos, ahora=None):
+        """
+        Plan de verificaciones por tabla
+
+        Returns:
+            Lista de diccionarios con codigo, proxima_verificacion, periodo_esperado,
+            ventana_inicio, ventana_fin y pendiente (ordenada por próxima verificación)
+        """
+        ahora = ahora or datetime.now()
+        plan = []
+        for codigo in codigos:
+            estado = self.state['tablas'].get(codigo, {})
+            ventana = self.release_window(codigo)
+            proxima = estado.get('proxima_verificacion')
+            if ventana is None or proxima is None:
+                proxima = ahora.isoformat()
+            plan.append({
+                'codigo': codigo,
+                'proxima_verificacion': proxima,
+                'periodo_esperado': ventana[0] if ventana else None,
+                'ventana_inicio': ventana[1].isoformat() if ventana else None,
+                'ventana_fin': ventana[2].isoformat() if ventana else None,
+                'pendiente': self.pending_update(codigo)
+            })
+        plan.sort(key=lambda entrada: entrada['proxima_verificacion'])
+        return plan
+
+    def next_check(self, codigos, ahora=None):
+        """Momento de la próxima verificación planificada (datetime)"""
+        plan = self.plan(codigos, ahora)
+        if not plan:
+            return None
+        return datetime.fromisoformat(plan[0]['proxima_verificacion'])
@@ -0,0 +1,58 @@
+"""
+Limitador de peticiones por host (token bucket)
+Evita saturar los servidores del INE cuando se descarga en paralelo
+"""
+
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """Token bucket thread-safe: `tasa` tokens por segundo, hasta `capacidad`"""
+
+    def __init__(self, tasa, capacidad):
+        self.tasa = float(tasa)
+        self.capacidad = float(capacidad)
+        self.tokens = float(capacidad)
+        self.ultimo = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _reponer(self):
+        """Repone tokens según el tiempo transcurrido"""
+        ahora = time.monotonic()
+        self.tokens = min(self.capacidad, self.tokens + (ahora - self.ultimo) * self.tasa)
+        self.ultimo = ahora
+
+    def acquire(self):
+        """Bloquea hasta disponer de un token y lo consume"""
+        while True:
+            with self.lock:
+                self._reponer()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                espera = (1 - self.tokens) / self.tasa
+            time.sleep(espera)
+
+
+class HostRateLimiter:
+    """Mantiene un token bucket independiente por host"""
+
+    def __init__(self, peticiones_por_segundo=2, rafaga_maxima=4):
+        self.peticiones_por_segundo = peticiones_por_segundo
+        self.rafaga_maxima = rafaga_maxima
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, url):
+        """Espera turno para lanzar una petición contra el host de `url`"""
+        if not self.peticiones_por_segundo or self.peticiones_por_segundo <= 0:
+            return
+        host = urlparse(url).netloc
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.peticiones_por_segundo, max(1, self.rafaga_maxima))
+                self.buckets[host] = bucket
+        bucket.acquire()
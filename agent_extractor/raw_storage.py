@@ -0,0 +1,88 @@
+"""
+Almacenamiento de CSVs crudos, opcionalmente comprimidos (.csv.gz / .csv.zst)
+El hash y el período de una tabla se calculan siempre sobre el CSV descomprimido
+"""
+
+import contextlib
+import gzip
+import io
+import logging
+
+try:
+    import zstandard
+except ImportError:  # Compresión zstd opcional
+    zstandard = None
+
+# Sufijo de archivo por compresión (None = CSV plano)
+SUFIJOS = {None: '.csv', 'gzip': '.csv.gz', 'zstd': '.csv.zst'}
+
+NIVELES = {'gzip': 6, 'zstd': 10}
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_compression(compresion):
+    """Compresión efectiva: zstd solo si zstandard está instalado (si no, gzip)"""
+    if compresion not in SUFIJOS:
+        raise ValueError(f"Compresión no soportada: {compresion}")
+    if compresion == 'zstd' and zstandard is None:
+        logger.warning("zstandard no está instalado; se usa gzip")
+        return 'gzip'
+    return compresion
+
+
+def compression_of(path):
+    """Compresión de un archivo según su sufijo"""
+    nombre = path.name
+    if nombre.endswith('.gz'):
+        return 'gzip'
+    if nombre.endswith('.zst'):
+        return 'zstd'
+    return None
+
+
+def raw_base_name(path):
+    """Nombre del archivo sin la extensión .csv[.gz|.zst]"""
+    nombre = path.name
+    for sufijo in sorted(SUFIJOS.values(), key=len, reverse=True):
+        if nombre.endswith(sufijo):
+            return nombre[:-len(sufijo)]
+    return path.stem
+
+
+def find_raw_files(directorio, codigo):
+    """CSVs crudos de una tabla en cualquier formato ({codigo}_*.csv[.gz|.zst])"""
+    return [
+        archivo
+        for sufijo in SUFIJOS.values()
+        for archivo in directorio.glob(f"{codigo}_*{sufijo}")
+    ]
+
+
+def open_raw(path):
+    """Abre un CSV crudo en binario, descomprimiendo en streaming si hace falta"""
+    compresion = compression_of(path)
+    if compresion == 'gzip':
+        return gzip.open(path, 'rb')
+    if compresion == 'zstd':
+        if zstandard is None:
+            raise RuntimeError(f"Se necesita zstandard para leer {path.name}")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    return open(path, 'rb')
+
+
+def open_raw_text(path, encoding='utf-8-sig'):
+    """Abre un CSV crudo en modo texto (descompresión transparente)"""
+    return io.TextIOWrapper(open_raw(path), encoding=encoding, newline='')
+
+
+def compressor(raw, compresion):
+    """
+    Envuelve un archivo binario abierto para escribir comprimido. Al cerrar el
+    compresor se vuelca el final del stream, pero `raw` sigue abierto.
+    """
+    if compresion == 'gzip':
+        return gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=NIVELES['gzip'], mtime=0)
+    if compresion == 'zstd':
+        return zstandard.ZstdCompressor(level=NIVELES['zstd']).stream_writer(raw, closefd=False)
+    return contextlib.nullcontext(raw)
@@ -4,32 +4,61 @@ Verifica y descarga solo las tablas con nuevos datos disponibles
 """
 
 import json
-import requests
+import time
+import asyncio
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 from .metadata_manager import MetadataManager
 from .downloader import Downloader
+from .http_client import CONFIG_PATH, load_config, create_session, http2_enabled
+from .raw_storage import find_raw_files
+from .poll_scheduler import PollScheduler
 
 class UpdateManager:
     """Gestiona actualizaciones inteligentes de tablas INE"""
     
-    def __init__(self):
+    # Bytes solicitados por defecto al sondear el inicio de un CSV
+    BYTES_SONDEO = 4096
+    
+    # Margen sobre la cabecera cacheada para incluir la primera fila de datos
+    MARGEN_FILA_DATOS = 1024
+    
+    def __init__(self, config=None, session=None, metadata_manager=None, downloader=None):
+        """
+        Args:
+            config: Configuración de tables.json ya cargada (None = leerla)
+            session: Sesión HTTP compartida (None = crear una propia)
+            metadata_manager: MetadataManager compartido (None = crear uno)
+            downloader: Downloader compartido (None = crear uno con la misma sesión)
+        """
         self.base_path = Path(__file__).parent.parent
-        self.config_path = self.base_path / 'config' / 'tables.json'
-        self.metadata_manager = MetadataManager()
-        self.downloader = Downloader()
+        self.config_path = CONFIG_PATH
+        self.config = config if config is not None else load_config(self.config_path)
+        self.session = session if session is not None else create_session(self.config)
+        self.metadata_manager = metadata_manager if metadata_manager is not None else MetadataManager(self.config)
+        self.downloader = downloader if downloader is not None else Downloader(
+            self.config, self.session, self.metadata_manager
+        )
         self.logger = logging.getLogger(__name__)
         
-        # Cargar configuración
-        with open(self.config_path, 'r', encoding='utf-8') as f:
-            self.config = json.load(f)
-        
-        # Configurar sesión HTTP
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        # Layout de cabecera por CSV (columnas, índice de Periodo, bytes de cabecera)
+        self.csv_layouts = {}
+        self._scheduler = None
+    
+    @property
+    def scheduler(self):
+        """Planificador de verificaciones (estado en metadata_dir/planificador.json)"""
+        state_path = self.metadata_manager.metadata_dir / 'planificador.json'
+        if self._scheduler is None or self._scheduler.state_path != state_path:
+            self._scheduler = PollScheduler(
+                state_path, self.metadata_manager, self.config.get('configuracion_planificador')
+            )
+        return self._scheduler
+    
+    def _all_table_codes(self):
+        """Códigos de todas las tablas configuradas, en orden de configuración"""
+        return [codigo for info in self.config['categorias'].values() for codigo in info['tablas']]
     
     def check_remote_period(self, tabla_info):
         """Obtiene el último período disponible en el INE para una tabla"""
@@ -38,33 +67,7 @@ class UpdateManager:
             response = self.session.get(tabla_info['url_json'], timeout=10)
             
             if response.status_code == 200:
-                data = response.json()
-                
-                # Buscar el período más reciente en los datos
-                # La estructura exacta puede variar, intentamos varios caminos
-                periodo = None
-                
-                # Intento 1: Buscar en estructura de datos
-                if isinstance(data, list) and len(data) > 0:
-                    # Buscar campo que contenga período
-                    for item in data[:5]:  # Revisar primeros elementos
-                        for key, value in item.items():
-                            if 'periodo' in key.lower() or 'period' in key.lower():
-                                periodo = value
-                                break
-                        if periodo:
-                            break
-                
-                # Intento 2: Si es estructura diferente
-                if not periodo and isinstance(data, dict):
-                    # Buscar en valores del diccionario
-                    for key, value in data.items():
-                        if 'data' in key.lower() and isinstance(value, list):
-                            if len(value) > 0 and isinstance(value[0], dict):
-                                for k, v in value[0].items():
-                                    if 'periodo' in k.lower():
-                                        periodo = v
-                                        break
+                periodo = self._extract_period_from_json(response.json())
                 
                 # Si no encontramos período, intentar descargar CSV y extraerlo
                 if not periodo:
@@ -76,56 +79,166 @@ class UpdateManager:
             self.logger.error(f"Error obteniendo período remoto: {e}")
             return None
     
+    def _extract_period_from_json(self, data):
+        """Busca el período más reciente en la respuesta DATOS_TABLA"""
+        # La estructura exacta puede variar, intentamos varios caminos
+        periodo = None
+        
+        # Intento 1: Buscar en estructura de datos
+        if isinstance(data, list) and len(data) > 0:
+            # Buscar campo que contenga período
+            for item in data[:5]:  # Revisar primeros elementos
+                for key, value in item.items():
+                    if 'periodo' in key.lower() or 'period' in key.lower():
+                        periodo = value
+                        break
+                if periodo:
+                    break
+        
+        # Intento 2: Si es estructura diferente
+        if not periodo and isinstance(data, dict):
+            # Buscar en valores del diccionario
+            for key, value in data.items():
+                if 'data' in key.lower() and isinstance(value, list):
+                    if len(value) > 0 and isinstance(value[0], dict):
+                        for k, v in value[0].items():
+                            if 'periodo' in k.lower():
+                                periodo = v
+                                break
+        
+        return periodo
+    
     def _extract_period_from_csv(self, url_csv):
-        """Extrae el período del CSV descargando solo las primeras líneas"""
+        """
+        Extrae el período del CSV leyendo solo sus primeros bytes.
+        
+        Se pide `Range: bytes=0-N`; si el servidor no respeta rangos (200) se
+        corta la lectura al llegar a N bytes. Si el sondeo no trae cabecera y
+        primera fila completas, se repite sin rango leyendo las primeras líneas.
+        """
         try:
-            # Descargar solo parte del archivo
-            response = self.session.get(url_csv, stream=True, timeout=10)
+            limite = self._probe_size(url_csv)
+            with self.session.get(url_csv, headers=self._range_headers(limite), stream=True, timeout=10) as response:
+                if response.status_code in (200, 206):
+                    datos = b''
+                    for chunk in response.iter_content(chunk_size=1024):
+                        datos += chunk
+                        if len(datos) >= limite:
+                            break
+                    periodo = self._period_from_probe(url_csv, datos[:limite], self._probe_is_complete(response, datos, limite))
+                    if periodo:
+                        return periodo
             
-            if response.status_code == 200:
-                # Leer solo las primeras líneas
-                lines = []
-                for line in response.iter_lines(decode_unicode=True):
-                    lines.append(line)
-                    if len(lines) > 5:  # Solo necesitamos las primeras líneas
-                        break
-                
-                # Buscar columna de período
-                if len(lines) > 1:
-                    header = lines[0].split(';')
-                    if 'Periodo' in header:
-                        periodo_idx = header.index('Periodo')
-                        data_line = lines[1].split(';')
-                        if len(data_line) > periodo_idx:
-                            return data_line[periodo_idx]
+            # Fallback: GET sin rango, solo primeras líneas
+            with self.session.get(url_csv, stream=True, timeout=10) as response:
+                if response.status_code == 200:
+                    # Leer solo las primeras líneas
+                    lines = []
+                    for line in response.iter_lines(decode_unicode=True):
+                        lines.append(line)
+                        if len(lines) > 5:  # Solo necesitamos las primeras líneas
+                            break
+                    
+                    return self._extract_period_from_lines(lines)
         except Exception as e:
             self.logger.error(f"Error extrayendo período del CSV: {e}")
         
         return None
     
+    def _probe_size(self, url_csv):
+        """Bytes a pedir: cabecera cacheada + margen, o el sondeo por defecto"""
+        limite = self.config['configuracion_descarga'].get('bytes_sondeo_periodo', self.BYTES_SONDEO)
+        layout = self.csv_layouts.get(url_csv)
+        if layout:
+            limite = min(limite, layout['bytes_cabecera'] + self.MARGEN_FILA_DATOS)
+        return limite
+    
+    def _range_headers(self, limite):
+        """Cabeceras para pedir los primeros `limite` bytes sin compresión"""
+        return {'Range': f'bytes=0-{limite - 1}', 'Accept-Encoding': 'identity'}
+    
+    def _probe_is_complete(self, response, datos, limite):
+        """Indica si el sondeo contiene el archivo entero (la última línea no está cortada)"""
+        if len(datos) >= limite:
+            return False
+        if response.status_code == 206:
+            total = response.headers.get('Content-Range', '').rpartition('/')[2]
+            return total.isdigit() and len(datos) >= int(total)
+        return True
+    
+    def _period_from_probe(self, url_csv, datos, completo):
+        """Obtiene el período de los primeros bytes del CSV y cachea el layout de cabecera"""
+        lineas = datos.split(b'\n')
+        if not completo:
+            lineas = lineas[:-1]  # La última línea puede estar cortada
+        lineas = [linea.rstrip(b'\r') for linea in lineas]
+        if len(lineas) < 2:
+            return None
+        
+        cabecera = lineas[0].decode('utf-8', errors='replace').lstrip('\ufeff')
+        columnas = cabecera.split(';')
+        layout = self.csv_layouts.get(url_csv)
+        if not layout or layout['columnas'] != columnas:
+            if 'Periodo' not in columnas:
+                return None
+            layout = {
+                'columnas': columnas,
+                'periodo_idx': columnas.index('Periodo'),
+                'bytes_cabecera': len(lineas[0]) + 1
+            }
+            self.csv_layouts[url_csv] = layout
+        
+        data_line = lineas[1].decode('utf-8', errors='replace').split(';')
+        if len(data_line) > layout['periodo_idx']:
+            return data_line[layout['periodo_idx']]
+        return None
+    
+    def _extract_period_from_lines(self, lines):
+        """Obtiene el período de la primera fila de datos (cabecera + datos)"""
+        # Buscar columna de período
+        if len(lines) > 1:
+            header = lines[0].split(';')
+            if 'Periodo' in header:
+                periodo_idx = header.index('Periodo')
+                data_line = lines[1].split(';')
+                if len(data_line) > periodo_idx:
+                    return data_line[periodo_idx]
+        return None
+    
+    def _find_tabla_info(self, codigo_tabla):
+        """Busca la información de una tabla en la configuración"""
+        for categoria, info in self.config['categorias'].items():
+            if codigo_tabla in info['tablas']:
+                return info['tablas'][codigo_tabla]
+        return None
+    
     def check_table_updates(self, codigo_tabla):
         """Verifica si una tabla específica tiene actualizaciones"""
         # Buscar información de la tabla en la configuración
-        tabla_info = None
-        for categoria, info in self.config['categorias'].items():
-            if codigo_tabla in info['tablas']:
-                tabla_info = info['tablas'][codigo_tabla]
-                break
+        tabla_info = self._find_tabla_info(codigo_tabla)
         
         if not tabla_info:
-            return {
-                'codigo': codigo_tabla,
-                'error': 'Tabla no encontrada en configuración',
-                'necesita_actualizacion': False
-            }
+            return self._table_not_found(codigo_tabla)
+        
+        # Obtener período remoto
+        periodo_remoto = self.check_remote_period(tabla_info)
         
+        return self._build_check_result(codigo_tabla, tabla_info, periodo_remoto)
+    
+    def _table_not_found(self, codigo_tabla):
+        """Resultado de verificación para una tabla que no está en la configuración"""
+        return {
+            'codigo': codigo_tabla,
+            'error': 'Tabla no encontrada en configuración',
+            'necesita_actualizacion': False
+        }
+    
+    def _build_check_result(self, codigo_tabla, tabla_info, periodo_remoto):
+        """Compara el período remoto con la metadata local y construye el resultado"""
         # Obtener metadata local
         metadata_local = self.metadata_manager.get_table_metadata(codigo_tabla)
         periodo_local = metadata_local.get('ultimo_periodo') if metadata_local else None
         
-        # Obtener período remoto
-        periodo_remoto = self.check_remote_period(tabla_info)
-        
         # Comparar períodos
         necesita_actualizacion = False
         mensaje = ""
@@ -155,8 +268,17 @@ class UpdateManager:
             'mensaje': mensaje
         }
     
-    def check_all_updates(self, verbose=True):
-        """Verifica actualizaciones para todas las tablas"""
+    def check_all_updates(self, verbose=True, concurrency=None, codigos=None):
+        """
+        Verifica actualizaciones para todas las tablas
+        
+        Args:
+            verbose: Si True, muestra progreso por consola
+            concurrency: Verificaciones simultáneas. Por defecto usa
+                `verificaciones_concurrentes` de `configuracion_descarga`.
+                Con 1 (o sin httpx instalado) se verifica de forma secuencial.
+            codigos: Tablas a verificar (None = todas las configuradas)
+        """
         resultados = {
             'fecha_verificacion': datetime.now().isoformat(),
             'total_tablas': 0,
@@ -164,15 +286,41 @@ class UpdateManager:
             'tablas': []
         }
         
+        if concurrency is None:
+            concurrency = self.config['configuracion_descarga'].get('verificaciones_concurrentes', 1)
+        
+        if concurrency > 1:
+            try:
+                import httpx  # noqa: F401
+            except ImportError:
+                self.logger.warning("httpx no está instalado; verificación secuencial")
+                concurrency = 1
+        
+        seleccion = set(codigos) if codigos is not None else None
+        
+        if concurrency > 1:
+            tablas = asyncio.run(self._check_all_updates_async(concurrency, seleccion))
+        else:
+            tablas = None
+        
+        indice = 0
         for categoria, info in self.config['categorias'].items():
+            codigos_categoria = [c for c in info['tablas'] if seleccion is None or c in seleccion]
+            if not codigos_categoria:
+                continue
             if verbose:
                 print(f"\n[INFO] Verificando categoría: {categoria}")
             
-            for codigo_tabla in info['tablas'].keys():
+            for codigo_tabla in codigos_categoria:
                 if verbose:
                     print(f"  Verificando tabla {codigo_tabla}...", end=" ")
                 
-                resultado = self.check_table_updates(codigo_tabla)
+                if tablas is not None:
+                    resultado = tablas[indice]
+                else:
+                    resultado = self.check_table_updates(codigo_tabla)
+                indice += 1
+                
                 resultados['tablas'].append(resultado)
                 resultados['total_tablas'] += 1
                 
@@ -186,6 +334,200 @@ class UpdateManager:
         
         return resultados
     
+    async def _check_all_updates_async(self, concurrency, seleccion=None):
+        """Verifica las tablas (todas o `seleccion`) con httpx.AsyncClient y concurrencia acotada"""
+        import httpx
+        
+        config_descarga = self.config['configuracion_descarga']
+        semaforo = asyncio.Semaphore(concurrency)
+        limites = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        timeout = httpx.Timeout(config_descarga.get('timeout_verificacion_segundos', 10))
+        
+        async with httpx.AsyncClient(
+            headers=dict(self.session.headers),
+            limits=limites,
+            timeout=timeout,
+            follow_redirects=True,
+            http2=http2_enabled(self.config)
+        ) as client:
+            async def verificar(codigo_tabla, tabla_info):
+                async with semaforo:
+                    periodo_remoto = await self._check_remote_period_async(client, tabla_info)
+                return self._build_check_result(codigo_tabla, tabla_info, periodo_remoto)
+            
+            tareas = [
+                verificar(codigo_tabla, tabla_info)
+                for info in self.config['categorias'].values()
+                for codigo_tabla, tabla_info in info['tablas'].items()
+                if seleccion is None or codigo_tabla in seleccion
+            ]
+            return await asyncio.gather(*tareas)
+    
+    async def _check_remote_period_async(self, client, tabla_info):
+        """Versión asíncrona de check_remote_period"""
+        try:
+            response = await self._get_with_retry(client, tabla_info['url_json'])
+            if response.status_code != 200:
+                return None
+            
+            periodo = self._extract_period_from_json(response.json())
+            if not periodo:
+                periodo = await self._extract_period_from_csv_async(client, tabla_info['url_csv'])
+            return periodo
+        except Exception as e:
+            self.logger.error(f"Error obteniendo período remoto: {e}")
+            return None
+    
+    async def _extract_period_from_csv_async(self, client, url_csv):
+        """Versión asíncrona de _extract_period_from_csv (sondeo por rango de bytes)"""
+        try:
+            limite = self._probe_size(url_csv)
+            async with client.stream('GET', url_csv, headers=self._range_headers(limite)) as response:
+                if response.status_code in (200, 206):
+                    datos = b''
+                    async for chunk in response.aiter_bytes():
+                        datos += chunk
+                        if len(datos) >= limite:
+                            break
+                    periodo = self._period_from_probe(url_csv, datos[:limite], self._probe_is_complete(response, datos, limite))
+                    if periodo:
+                        return periodo
+            
+            # Fallback: GET sin rango, solo primeras líneas
+            async with client.stream('GET', url_csv) as response:
+                if response.status_code == 200:
+                    lines = []
+                    async for line in response.aiter_lines():
+                        lines.append(line)
+                        if len(lines) > 5:
+                            break
+                    return self._extract_period_from_lines(lines)
+        except Exception as e:
+            self.logger.error(f"Error extrayendo período del CSV: {e}")
+        return None
+    
+    async def _get_with_retry(self, client, url):
+        """GET con reintentos y backoff exponencial ante timeouts, errores de red y 5xx"""
+        import httpx
+        
+        config_descarga = self.config['configuracion_descarga']
+        max_reintentos = config_descarga.get('reintentos_maximos', 3)
+        delay = config_descarga.get('delay_entre_reintentos', 2)
+        
+        for intento in range(max_reintentos):
+            try:
+                response = await client.get(url)
+                if response.status_code < 500 or intento == max_reintentos - 1:
+                    return response
+            except (httpx.TimeoutException, httpx.TransportError):
+                if intento == max_reintentos - 1:
+                    raise
+            await asyncio.sleep(delay * (2 ** intento))
+    
+    def check_scheduled_updates(self, verbose=True, concurrency=None, ahora=None):
+        """
+        Verifica solo las tablas que el planificador marca como pendientes de consulta
+        
+        Las tablas fuera de su ventana de publicación no generan peticiones; las
+        que ya tienen un período nuevo detectado se informan sin volver a consultar.
+        
+        Args:
+            verbose: Si True, muestra progreso por consola
+            concurrency: Verificaciones simultáneas (ver check_all_updates)
+            ahora: Momento de referencia (None = ahora)
+        """
+        ahora = ahora or datetime.now()
+        scheduler = self.scheduler
+        codigos = self._all_table_codes()
+        a_verificar = scheduler.due_tables(codigos, ahora)
+        
+        tablas = []
+        if a_verificar:
+            verificacion = self.check_all_updates(verbose=verbose, concurrency=concurrency, codigos=a_verificar)
+            for resultado in verificacion['tablas']:
+                if 'error' not in resultado:
+                    scheduler.record_check(resultado['codigo'], resultado, ahora)
+                tablas.append(resultado)
+        
+        verificadas = set(a_verificar)
+        for codigo in codigos:
+            if codigo not in verificadas and scheduler.pending_update(codigo):
+                tablas.append(self._pending_result(codigo))
+        scheduler.save()
+        
+        proxima = scheduler.next_check(codigos, ahora)
+        return {
+            'fecha_verificacion': ahora.isoformat(),
+            'total_tablas': len(codigos),
+            'tablas_verificadas': len(a_verificar),
+            'actualizaciones_disponibles': sum(1 for t in tablas if t['necesita_actualizacion']),
+            'proxima_verificacion': proxima.isoformat() if proxima else None,
+            'tablas': tablas
+        }
+    
+    def _pending_result(self, codigo_tabla):
+        """Resultado de verificación, sin consultar al INE, de un período ya detectado"""
+        tabla_info = self._find_tabla_info(codigo_tabla) or {}
+        metadata_local = self.metadata_manager.get_table_metadata(codigo_tabla) or {}
+        periodo_remoto = self.scheduler.state['tablas'][codigo_tabla]['ultimo_periodo_remoto']
+        return {
+            'codigo': codigo_tabla,
+            'nombre': tabla_info.get('nombre', ''),
+            'periodo_local': metadata_local.get('ultimo_periodo'),
+            'periodo_remoto': periodo_remoto,
+            'necesita_actualizacion': True,
+            'mensaje': f"Nuevo período ya detectado: {periodo_remoto} (local: {metadata_local.get('ultimo_periodo')})"
+        }
+    
+    def get_check_plan(self, ahora=None):
+        """Plan de verificaciones por tabla (próxima consulta y ventana de publicación esperada)"""
+        return self.scheduler.plan(self._all_table_codes(), ahora)
+    
+    def run_scheduler(self, actualizar=False, verbose=True, concurrency=None, max_ciclos=None, espera_minima=60):
+        """
+        Modo demonio: verifica según el plan y duerme hasta la próxima verificación
+        
+        Args:
+            actualizar: Si True, descarga las tablas con nuevos períodos
+            verbose: Si True, muestra un resumen por ciclo
+            concurrency: Verificaciones simultáneas (ver check_all_updates)
+            max_ciclos: Ciclos a ejecutar (None = indefinidamente)
+            espera_minima: Segundos mínimos entre ciclos
+            
+        Returns:
+            Resultado del último ciclo
+        """
+        ciclos = 0
+        resultado = None
+        while max_ciclos is None or ciclos < max_ciclos:
+            resultado = self.check_scheduled_updates(verbose=False, concurrency=concurrency)
+            ciclos += 1
+            
+            if verbose:
+                print(f"[{resultado['fecha_verificacion'][:19]}] Verificadas {resultado['tablas_verificadas']}"
+                      f"/{resultado['total_tablas']}, actualizaciones: {resultado['actualizaciones_disponibles']}")
+            
+            if actualizar:
+                for tabla in resultado['tablas']:
+                    if tabla['necesita_actualizacion']:
+                        actualizacion = self.update_table(tabla['codigo'])
+                        if verbose:
+                            print(f"  {tabla['codigo']}: {actualizacion['mensaje']}")
+            
+            if max_ciclos is not None and ciclos >= max_ciclos:
+                break
+            
+            proxima = self.scheduler.next_check(self._all_table_codes())
+            espera = espera_minima
+            if proxima is not None:
+                espera = max(espera_minima, (proxima - datetime.now()).total_seconds())
+            if verbose:
+                despertar = datetime.now() + timedelta(seconds=espera)
+                print(f"  Próxima verificación: {despertar.isoformat(timespec='seconds')}")
+            time.sleep(espera)
+        
+        return resultado
+    
     def update_table(self, codigo_tabla):
         """Actualiza una tabla específica si hay nuevos datos"""
         # Verificar si necesita actualización
@@ -203,12 +545,15 @@ class UpdateManager:
         
         # Buscar TODOS los archivos existentes para esta tabla (por patrón)
         csv_dir = self.base_path / 'data' / 'raw' / 'csv'
-        archivos_existentes = list(csv_dir.glob(f"{codigo_tabla}_*.csv"))
+        archivos_existentes = find_raw_files(csv_dir, codigo_tabla)
         
         # Crear backup y eliminar archivos antiguos
         for archivo_actual in archivos_existentes:
             if archivo_actual.exists():
-                backup_path = self.metadata_manager.create_backup(archivo_actual)
+                backup_path = self.metadata_manager.create_backup(archivo_actual, codigo_tabla)
+                if backup_path is None:
+                    self.logger.warning(f"Sin backup de {archivo_actual.name}; se conserva el archivo")
+                    continue
                 print(f"  Backup creado: {backup_path.name}")
                 
                 # IMPORTANTE: Eliminar el archivo original después del backup
@@ -223,7 +568,7 @@ class UpdateManager:
         
         if resultado_descarga['exitoso']:
             # Verificar que solo quede UN archivo para esta tabla
-            archivos_finales = list(csv_dir.glob(f"{codigo_tabla}_*.csv"))
+            archivos_finales = find_raw_files(csv_dir, codigo_tabla)
             if len(archivos_finales) > 1:
                 self.logger.warning(f"ADVERTENCIA: Múltiples archivos para tabla {codigo_tabla}: {[f.name for f in archivos_finales]}")
                 # Intentar limpieza automática manteniendo el más reciente
@@ -306,7 +651,7 @@ class UpdateManager:
         for detalle in resultados['detalles']:
             if detalle['actualizado']:
                 codigo = detalle['codigo']
-                archivos = list(csv_dir.glob(f"{codigo}_*.csv"))
+                archivos = find_raw_files(csv_dir, codigo)
                 if len(archivos) > 1:
                     duplicados.append(f"{codigo} ({len(archivos)} archivos)")
         
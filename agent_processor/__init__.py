@@ -6,6 +6,13 @@ Transforma datos crudos del INE en tabla unificada para análisis de absentismo
 __version__ = "1.0.0"
 __author__ = "AbsentismoEspana"
 
-from .processor import ProcessorETCL
+__all__ = ['ProcessorETCL']
 
-__all__ = ['ProcessorETCL']
\ No newline at end of file
+
+def __getattr__(nombre):
+    # Importación diferida: pandas y duckdb solo se cargan al usar el procesador
+    if nombre == 'ProcessorETCL':
+        from .processor import ProcessorETCL
+        globals()['ProcessorETCL'] = ProcessorETCL
+        return ProcessorETCL
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
\ No newline at end of file
@@ -5,5 +5,6 @@ Módulos ETL para el procesamiento de datos ETCL
 from .extractor import Extractor
 from .transformer import Transformer
 from .loader import Loader
+from .schema_profile import SchemaProfiles
 
-__all__ = ['Extractor', 'Transformer', 'Loader']
\ No newline at end of file
+__all__ = ['Extractor', 'Transformer', 'Loader', 'SchemaProfiles']
\ No newline at end of file
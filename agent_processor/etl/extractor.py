@@ -3,12 +3,40 @@ Extractor de datos desde archivos CSV del INE
 Maneja diferentes encodings y estructuras de tabla
 """
 
+import numpy as np
 import pandas as pd
+import gzip
+import hashlib
+import io
+import json
 import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
 import chardet
 
+from .ine_numbers import NA_MARKERS, decode_ine_numbers
+from .schema_profile import SchemaProfiles
+
+try:
+    import zstandard
+except ImportError:  # Solo necesario para CSVs .csv.zst
+    zstandard = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:  # Solo necesario para el motor 'pyarrow' y la caché Parquet
+    pa = None
+
+try:
+    import duckdb
+except ImportError:  # Solo necesario para el motor 'duckdb'
+    duckdb = None
+
 logger = logging.getLogger(__name__)
 
 class Extractor:
@@ -22,30 +50,113 @@ class Extractor:
     # Separadores posibles
     SEPARATORS = [';', ',', '\t']
     
-    def __init__(self, raw_dir: Path, config: Dict):
+    # Formatos de CSV crudo que deja el extractor (plano o comprimido)
+    RAW_SUFFIXES = ('.csv', '.csv.gz', '.csv.zst')
+    
+    # Marcadores de dato no disponible en los CSVs del INE
+    NA_VALUES = sorted(NA_MARKERS)
+    
+    # Motores de parseo: 'c' (pandas), 'pyarrow' (multihilo, con esquema declarado)
+    # o 'duckdb' (read_csv de DuckDB; extract_table acaba igualmente en pandas y no
+    # es más rápido que 'c': la ganancia está en stage_table, que carga sin pandas)
+    ENGINES = ('c', 'pyarrow', 'duckdb')
+    
+    # Encodings que lee el read_csv de DuckDB (el resto se lee con pandas)
+    DUCKDB_ENCODINGS = {
+        'utf-8': 'utf-8', 'utf8': 'utf-8', 'utf-8-sig': 'utf-8', 'ascii': 'utf-8',
+        'latin-1': 'latin-1', 'iso-8859-1': 'latin-1'
+    }
+    
+    # Columnas de valores si la tabla no declara `value_columns` en tables_config
+    DEFAULT_VALUE_COLUMNS = SchemaProfiles.DEFAULT_VALUE_COLUMNS
+    
+    # Sufijo del manifiesto de formato junto a cada CSV ({archivo}.manifest.json)
+    MANIFEST_SUFFIX = '.manifest.json'
+    
+    # Versión del formato del manifiesto (al cambiarla se ignoran los anteriores)
+    MANIFEST_VERSION = 1
+    
+    # Versión del parseo, la limpieza y el formato de la caché: incrementarla invalida la caché Parquet
+    EXTRACTOR_VERSION = 3
+    
+    # Clave de los metadatos del esquema Parquet con la clave de la caché
+    CACHE_METADATA_KEY = b'absentismo.extractor'
+    
+    # Filas por row group de la caché (las estadísticas por grupo permiten saltar períodos)
+    CACHE_ROW_GROUP_SIZE = 50_000
+    
+    # Columna de la caché con la posición de cada fila en el CSV (la caché se
+    # guarda ordenada por período y al leerla se recupera el orden original)
+    CACHE_ROW_COLUMN = '__fila_csv'
+    
+    # Filas por bloque al leer el CSV filtrando períodos con el motor 'c'
+    CSV_CHUNKSIZE = 100_000
+    
+    def __init__(self, raw_dir: Path, config: Dict, use_manifest: bool = True, engine: str = 'c',
+                 use_cache: bool = True, cache_dir: Optional[Path] = None,
+                 profiles: Optional[SchemaProfiles] = None):
         """
         Inicializa el extractor
         
         Args:
             raw_dir: Directorio con los CSVs crudos
             config: Configuración con mappings
+            use_manifest: Si True, reutiliza el formato detectado en ejecuciones
+                anteriores mientras el contenido del CSV no cambie
+            engine: Motor de parseo ('c', 'pyarrow' o 'duckdb'; si falta la
+                dependencia se usa 'c')
+            use_cache: Si True, guarda cada tabla parseada en Parquet y la
+                reutiliza mientras el CSV y la versión del extractor no cambien
+                (requiere pyarrow)
+            cache_dir: Directorio de la caché (por defecto data/cache/extractor)
+            profiles: Perfiles de esquema compartidos con el transformador
+                (None = compilarlos en memoria desde mappings)
         """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Motor de parseo no soportado: {engine}")
+        if engine == 'pyarrow' and pa is None:
+            logger.warning("pyarrow no está instalado; se usa el motor 'c'")
+            engine = 'c'
+        if engine == 'duckdb' and duckdb is None:
+            logger.warning("duckdb no está instalado; se usa el motor 'c'")
+            engine = 'c'
+        if use_cache and pa is None:
+            logger.info("pyarrow no está instalado; caché Parquet desactivada")
+            use_cache = False
+        
         self.raw_dir = raw_dir
         self.config = config
         self.mappings = config.get('mappings', {})
         self.tables_config = self.mappings.get('tables_config', {})
+        self.use_manifest = use_manifest
+        self.engine = engine
+        self.use_cache = use_cache
+        self.cache_dir = Path(cache_dir) if cache_dir else Path(raw_dir).parent.parent / 'cache' / 'extractor'
+        self.profiles = profiles or SchemaProfiles(self.mappings)
+        self._duckdb_conn = None
         
-    def extract_table(self, table_id: str, test_mode: bool = False) -> pd.DataFrame:
+    def extract_table(self, table_id: str, test_mode: bool = False, periods: Optional[List[str]] = None,
+                      since: Optional[str] = None) -> pd.DataFrame:
         """
         Extrae datos de una tabla específica
         
+        Sobre la caché Parquet (ordenada por período) los filtros de período se
+        aplican en la lectura, saltando los row groups que sus estadísticas
+        descartan. Sin caché, el CSV se parsea entero por bloques y cada bloque
+        se filtra al leerlo: no se ahorra parseo, pero solo se retienen y
+        limpian las filas pedidas
+        
         Args:
             table_id: ID de la tabla (ej: '6042')
             test_mode: Si True, extrae solo datos recientes para testing
+            periods: Si se indica, solo estos períodos (ej: ['2024T3', '2024T4'])
+            since: Si se indica, solo este período y los posteriores (ej: '2024T1')
             
         Returns:
             DataFrame con los datos extraídos
         """
+        period_filter = self._period_filter(periods, since)
+        
         # Buscar archivo CSV
         csv_file = self._find_csv_file(table_id)
         if not csv_file:
@@ -53,50 +164,605 @@ class Extractor:
         
         logger.info(f"Extrayendo datos de: {csv_file.name}")
         
-        # Detectar encoding y separador
-        encoding, separator = self._detect_file_format(csv_file)
-        logger.info(f"Formato detectado - Encoding: {encoding}, Separador: '{separator}'")
-        
-        # Leer CSV
         try:
-            df = pd.read_csv(
-                csv_file,
+            # El hash del contenido identifica el manifiesto y la caché válidos
+            content_hash = self._content_hash(csv_file) if self.use_manifest or self.use_cache else None
+            
+            df = self._load_cache(table_id, content_hash, period_filter) if self.use_cache else None
+            if df is None and self.use_cache:
+                # La caché guarda la tabla completa; el filtro se aplica después
+                df = self._parse_table(csv_file, table_id, content_hash)
+                self._save_cache(table_id, content_hash, df)
+                if period_filter is not None:
+                    df = df[self._period_mask(df['Periodo'], period_filter)].reset_index(drop=True)
+            elif df is None:
+                df = self._parse_table(csv_file, table_id, content_hash, period_filter)
+            
+            return self._finish_table(df, table_id, test_mode, period_filter)
+        
+        except Exception as e:
+            logger.error(f"Error leyendo CSV {csv_file}: {str(e)}")
+            raise
+    
+    def _finish_table(self, df: pd.DataFrame, table_id: str, test_mode: bool,
+                      period_filter: Optional[Dict]) -> pd.DataFrame:
+        """Filtro de modo test y columnas de metadatos sobre la tabla ya parseada"""
+        if period_filter is not None:
+            logger.info(f"Filtro de períodos: {len(df)} registros")
+        
+        # En modo test, filtrar solo datos recientes
+        if test_mode and 'Periodo' in df.columns:
+            df = self._filter_test_data(df)
+            logger.info(f"Modo test: filtrados a {len(df)} registros")
+        
+        # Añadir metadatos
+        df['fuente_tabla'] = table_id
+        df['tabla_nombre'] = self.tables_config.get(table_id, {}).get('name', f'Tabla {table_id}')
+        
+        return df
+    
+    def materialize(self, table_id: str) -> Tuple[Path, str]:
+        """
+        Deja la tabla parseada en su caché Parquet (solo parsea el CSV si la
+        caché no existe o está obsoleta)
+        
+        Args:
+            table_id: ID de la tabla
+        
+        Returns:
+            Tupla (ruta del Parquet, SHA-256 del CSV) con la que leer la tabla
+            mediante from_handle
+        """
+        if not self.use_cache:
+            raise RuntimeError("La caché Parquet está desactivada (requiere pyarrow)")
+        
+        csv_file = self._find_csv_file(table_id)
+        if not csv_file:
+            raise FileNotFoundError(f"No se encontró archivo CSV para tabla {table_id}")
+        
+        content_hash = self._content_hash(csv_file)
+        if not self._cache_valid(table_id, content_hash):
+            df = self._parse_table(csv_file, table_id, content_hash)
+            self._save_cache(table_id, content_hash, df)
+            if not self._cache_valid(table_id, content_hash):
+                raise RuntimeError(f"No se pudo escribir la caché Parquet de {table_id}")
+        
+        return self._cache_path(table_id), content_hash
+    
+    def extract_parallel(self, table_ids: List[str],
+                         jobs: int) -> Tuple[Dict[str, Tuple[Path, str]], Dict[str, str]]:
+        """
+        Materializa varias tablas en paralelo en un pool de procesos
+        
+        Cada proceso parsea sus tablas a la caché Parquet y devuelve solo la
+        ruta y el hash (no se serializan DataFrames entre procesos); las tablas
+        se leen después con from_handle, mapeando el Parquet en memoria
+        
+        Args:
+            table_ids: Lista de IDs de tablas
+            jobs: Número de procesos
+        
+        Returns:
+            Tupla (handles por tabla, mensaje de error por tabla fallida)
+        """
+        if jobs < 1:
+            raise ValueError(f"El número de procesos debe ser al menos 1: {jobs}")
+        if not self.use_cache:
+            logger.warning("Extracción en paralelo no disponible sin la caché Parquet; se extrae en serie")
+            return {}, {}
+        
+        handles, errors = {}, {}
+        jobs = min(jobs, max(1, len(table_ids)))
+        logger.info(f"Extrayendo {len(table_ids)} tablas con {jobs} procesos")
+        
+        # 'spawn': los procesos no heredan la conexión DuckDB ni el estado del padre
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = {pool.submit(_materialize_worker, self._worker_kwargs(), table_id): table_id
+                       for table_id in table_ids}
+            for future in as_completed(futures):
+                table_id = futures[future]
+                try:
+                    path, content_hash = future.result()
+                    handles[table_id] = (Path(path), content_hash)
+                    logger.info(f"Tabla {table_id} materializada en {path}")
+                except Exception as e:
+                    errors[table_id] = str(e)
+                    logger.error(f"Error extrayendo tabla {table_id}: {str(e)}")
+        
+        handles = {table_id: handles[table_id] for table_id in table_ids if table_id in handles}
+        return handles, errors
+    
+    def from_handle(self, table_id: str, handle: Tuple[Path, str], test_mode: bool = False,
+                    periods: Optional[List[str]] = None, since: Optional[str] = None) -> pd.DataFrame:
+        """
+        Lee una tabla materializada por extract_parallel (mismo resultado que
+        extract_table; si la caché ya no es válida se vuelve a extraer)
+        
+        Args:
+            table_id: ID de la tabla
+            handle: Tupla (ruta del Parquet, SHA-256 del CSV)
+            test_mode: Si True, extrae solo datos recientes para testing
+            periods: Si se indica, solo estos períodos
+            since: Si se indica, solo este período y los posteriores
+        
+        Returns:
+            DataFrame con los datos extraídos
+        """
+        _, content_hash = handle
+        period_filter = self._period_filter(periods, since)
+        df = self._load_cache(table_id, content_hash, period_filter)
+        if df is None:
+            return self.extract_table(table_id, test_mode, periods=periods, since=since)
+        return self._finish_table(df, table_id, test_mode, period_filter)
+    
+    def _worker_kwargs(self) -> Dict:
+        """Argumentos para reconstruir el extractor en un proceso del pool"""
+        return {
+            'raw_dir': self.raw_dir,
+            'config': self.config,
+            'use_manifest': self.use_manifest,
+            'engine': self.engine,
+            'use_cache': self.use_cache,
+            'cache_dir': self.cache_dir
+        }
+    
+    def iter_table(self, table_id: str, chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+        """
+        Extrae una tabla por bloques, con memoria acotada sea cual sea su tamaño
+        
+        Los bloques tienen las mismas columnas que extract_table; las dimensiones
+        son categóricas con las mismas categorías en todos los bloques (recogidas
+        en una primera pasada y guardadas en el manifiesto) y los valores float64
+        en todos los bloques.
+        
+        Args:
+            table_id: ID de la tabla (ej: '6042')
+            chunksize: Filas por bloque
+            
+        Yields:
+            DataFrame limpio de cada bloque
+        """
+        csv_file = self._find_csv_file(table_id)
+        if not csv_file:
+            raise FileNotFoundError(f"No se encontró archivo CSV para tabla {table_id}")
+        
+        logger.info(f"Extrayendo por bloques de {chunksize} filas: {csv_file.name}")
+        
+        content_hash = self._content_hash(csv_file) if self.use_manifest else None
+        encoding, separator = self._resolve_file_format(csv_file, content_hash)
+        columns = self._read_header(csv_file, encoding, separator)
+        if 'Periodo' not in [col.strip() for col in columns]:
+            raise ValueError(f"Tabla {table_id} no tiene columna 'Periodo'")
+        
+        value_columns = set(self._profile(table_id, columns)['value_columns'])
+        dimensions = [col for col in columns if col.strip() not in value_columns]
+        categories = self._dimension_categories(csv_file, content_hash, encoding, separator, dimensions, chunksize)
+        
+        dtypes = {col: pd.CategoricalDtype(categories[col]) for col in dimensions}
+        table_name = self.tables_config.get(table_id, {}).get('name', f'Tabla {table_id}')
+        
+        rows = 0
+        for chunk in pd.read_csv(
+            csv_file,
+            compression='infer',
+            encoding=encoding,
+            sep=separator,
+            dtype=dtypes,
+            decimal=',',
+            thousands='.',
+            na_values=self.NA_VALUES,
+            chunksize=chunksize
+        ):
+            chunk.columns = chunk.columns.str.strip()
+            # float64 en todos los bloques, aunque alguno quede sin decodificar o vacío
+            for col in chunk.columns:
+                if col in value_columns:
+                    chunk[col] = decode_ine_numbers(chunk[col])
+            
+            chunk['fuente_tabla'] = table_id
+            chunk['tabla_nombre'] = table_name
+            rows += len(chunk)
+            yield chunk
+        
+        if rows == 0:
+            raise ValueError(f"Tabla {table_id} está vacía")
+        logger.info(f"Tabla {table_id} extraída por bloques: {rows} filas")
+    
+    def _dimension_categories(self, csv_file: Path, content_hash: Optional[str], encoding: str,
+                              separator: str, dimensions: List[str], chunksize: int) -> Dict[str, List[str]]:
+        """
+        Valores distintos de cada dimensión, leyendo solo esas columnas por
+        bloques (del manifiesto si el contenido del CSV no ha cambiado)
+        """
+        manifest = self._load_manifest(csv_file) if self.use_manifest else None
+        if manifest is not None and manifest.get('hash') != content_hash:
+            manifest = None
+        if manifest and set(dimensions) <= set(manifest.get('categorias', {})):
+            return manifest['categorias']
+        
+        values = {col: set() for col in dimensions}
+        for chunk in pd.read_csv(
+            csv_file,
+            compression='infer',
+            encoding=encoding,
+            sep=separator,
+            usecols=dimensions,
+            dtype=str,
+            na_values=self.NA_VALUES,
+            chunksize=chunksize
+        ):
+            for col in dimensions:
+                values[col].update(chunk[col].dropna().unique())
+        
+        categories = {col: sorted(col_values) for col, col_values in values.items()}
+        if manifest:
+            manifest['categorias'] = categories
+            self._save_manifest(csv_file, manifest)
+        return categories
+    
+    def _parse_table(self, csv_file: Path, table_id: str, content_hash: Optional[str],
+                     period_filter: Optional[Dict] = None) -> pd.DataFrame:
+        """
+        Parsea el CSV: lectura, nombres de columna, validación y limpieza numérica
+        
+        Args:
+            csv_file: Ruta al archivo
+            table_id: ID de la tabla
+            content_hash: SHA-256 del contenido (None si no se usa el manifiesto)
+            period_filter: Filtro de períodos aplicado a cada bloque leído (None = todos)
+            
+        Returns:
+            DataFrame limpio, sin metadatos
+        """
+        # Encoding y separador (del manifiesto si el contenido no ha cambiado)
+        encoding, separator = self._resolve_file_format(csv_file, content_hash)
+        logger.info(f"Formato - Encoding: {encoding}, Separador: '{separator}'")
+        
+        if period_filter is not None:
+            if 'Periodo' not in [col.strip() for col in self._read_header(csv_file, encoding, separator)]:
+                raise ValueError(f"Tabla {table_id} no tiene columna 'Periodo'")
+        
+        # pyarrow y duckdb decodifican los valores al leer; pandas los limpia después
+        numbers_decoded = True
+        if self.engine == 'pyarrow':
+            df = self._read_csv_arrow(csv_file, table_id, encoding, separator, period_filter)
+        elif self.engine == 'duckdb' and self._duckdb_encoding(encoding):
+            df = self._read_csv_duckdb(csv_file, table_id, encoding, separator, period_filter)
+        else:
+            numbers_decoded = False
+            # pandas descomprime .gz/.zst según la extensión
+            read_options = dict(
+                compression='infer',
                 encoding=encoding,
                 sep=separator,
                 decimal=',',
                 thousands='.',
-                na_values=['..', '...', 'n.d.', 'N.D.', '']
+                na_values=self.NA_VALUES
             )
-            
-            logger.info(f"Datos cargados: {len(df)} filas, {len(df.columns)} columnas")
-            
-            # Limpiar nombres de columnas
-            df.columns = df.columns.str.strip()
-            
-            # Identificar columnas
-            columns_info = self._identify_columns(df, table_id)
-            logger.info(f"Columnas identificadas: {columns_info}")
-            
-            # Validar estructura básica
+            if period_filter is None:
+                df = pd.read_csv(csv_file, **read_options)
+            else:
+                # Se parsea todo el CSV, pero cada bloque se filtra al leerlo:
+                # solo se retienen (y limpian) las filas pedidas
+                chunks = []
+                for chunk in pd.read_csv(csv_file, chunksize=self.CSV_CHUNKSIZE, **read_options):
+                    periodo = next(col for col in chunk.columns if col.strip() == 'Periodo')
+                    chunks.append(chunk[self._period_mask(chunk[periodo], period_filter)])
+                df = pd.concat(chunks, ignore_index=True)
+        
+        logger.info(f"Datos cargados: {len(df)} filas, {len(df.columns)} columnas")
+        
+        # Limpiar nombres de columnas
+        df.columns = df.columns.str.strip()
+        
+        # Identificar columnas
+        columns_info = self._identify_columns(df, table_id)
+        logger.info(f"Columnas identificadas: {columns_info}")
+        
+        # Validar estructura básica (un filtro de períodos puede no dejar filas)
+        if period_filter is None or not df.empty:
             self._validate_structure(df, table_id)
-            
-            # En modo test, filtrar solo datos recientes
-            if test_mode and 'Periodo' in df.columns:
-                df = self._filter_test_data(df)
-                logger.info(f"Modo test: filtrados a {len(df)} registros")
-            
-            # Limpiar valores numéricos
+        
+        # Limpiar valores numéricos (si el motor no los ha decodificado al parsear)
+        if not numbers_decoded:
             df = self._clean_numeric_values(df, columns_info)
+        
+        return df
+    
+    def _cache_path(self, table_id: str) -> Path:
+        return self.cache_dir / f"{table_id}.parquet"
+    
+    def _cache_key(self, table_id: str, content_hash: str) -> Dict:
+        """Todo lo que determina el DataFrame parseado: contenido, versión, motor y esquema"""
+        return {
+            'hash': content_hash,
+            'extractor_version': self.EXTRACTOR_VERSION,
+            'engine': self.engine,
+            'value_columns': list(self._value_columns(table_id))
+        }
+    
+    def _load_cache(self, table_id: str, content_hash: str,
+                    period_filter: Optional[Dict] = None) -> Optional[pd.DataFrame]:
+        """
+        DataFrame parseado desde la caché Parquet (mapeada en memoria) si su
+        clave coincide con el CSV actual; None si no existe o está obsoleta.
+        El filtro de períodos se aplica en la lectura (row groups y filas) y las
+        filas se devuelven en el orden del CSV
+        """
+        cache_path = self._cache_path(table_id)
+        if not cache_path.exists():
+            return None
+        try:
+            if not self._cache_valid(table_id, content_hash):
+                logger.info(f"Caché de {table_id} obsoleta; se vuelve a parsear el CSV")
+                return None
+            table = pq.read_table(cache_path, memory_map=True, filters=self._parquet_filters(period_filter))
+            if self.CACHE_ROW_COLUMN in table.column_names:
+                # Filas ordenadas dentro de cada período: el sort estable solo fusiona tramos
+                rows = table.column(self.CACHE_ROW_COLUMN).to_numpy()
+                table = table.select([col for col in table.column_names if col != self.CACHE_ROW_COLUMN])
+                table = table.take(np.argsort(rows, kind='stable'))
+            df = table.to_pandas()
+        except Exception as e:
+            logger.warning(f"Caché de {table_id} ilegible, se ignora: {e}")
+            return None
+        logger.info(f"Tabla {table_id} leída de la caché: {len(df)} filas")
+        return df
+    
+    def _cache_valid(self, table_id: str, content_hash: str) -> bool:
+        """True si la caché existe y su clave coincide con el CSV actual (solo lee el esquema)"""
+        cache_path = self._cache_path(table_id)
+        if not cache_path.exists():
+            return False
+        try:
+            metadata = pq.read_schema(cache_path).metadata or {}
+            key = json.loads(metadata.get(self.CACHE_METADATA_KEY, b'{}'))
+        except Exception as e:
+            logger.warning(f"Caché de {table_id} ilegible, se ignora: {e}")
+            return False
+        return key == self._cache_key(table_id, content_hash)
+    
+    def _save_cache(self, table_id: str, content_hash: str, df: pd.DataFrame):
+        """Escribe la caché Parquet de forma atómica; un fallo solo implica volver a parsear"""
+        cache_path = self._cache_path(table_id)
+        tmp_path = cache_path.with_name(cache_path.name + '.tmp')
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if 'Periodo' in df.columns:
+                # Los CSVs del INE recorren todos los períodos dentro de cada serie:
+                # ordenados por período, cada row group cubre un rango estrecho y
+                # el filtro de la lectura puede saltar el resto
+                table = table.append_column(self.CACHE_ROW_COLUMN, pa.array(np.arange(len(df), dtype=np.int64)))
+                codes, _ = pd.factorize(np.asarray(df['Periodo'], dtype=object), sort=True)
+                table = table.take(np.argsort(codes, kind='stable'))
+            metadata = dict(table.schema.metadata or {})
+            metadata[self.CACHE_METADATA_KEY] = json.dumps(self._cache_key(table_id, content_hash)).encode('utf-8')
+            pq.write_table(table.replace_schema_metadata(metadata), tmp_path,
+                           row_group_size=self.CACHE_ROW_GROUP_SIZE)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            Path(tmp_path).unlink(missing_ok=True)
+            logger.warning(f"No se pudo guardar la caché de {table_id}: {e}")
+    
+    def _value_columns(self, table_id: str) -> List[str]:
+        """Columnas de valores declaradas para la tabla (el resto son dimensiones)"""
+        return self.tables_config.get(table_id, {}).get('value_columns', self.DEFAULT_VALUE_COLUMNS)
+    
+    def _profile(self, table_id: str, columns: List[str]) -> Dict:
+        """Perfil de esquema de la tabla para una cabecera (nombres sin espacios sobrantes)"""
+        return self.profiles.get(table_id, [col.strip() for col in columns])
+    
+    @staticmethod
+    def _period_filter(periods: Optional[List[str]], since: Optional[str]) -> Optional[Dict]:
+        """Filtro de períodos normalizado (None si no se pide ninguno)"""
+        if periods is None and since is None:
+            return None
+        return {'periods': sorted(set(periods)) if periods is not None else None, 'since': since}
+    
+    @staticmethod
+    def _keep_period(period, period_filter: Dict) -> bool:
+        """Si un período pasa el filtro ('AAAATn' se ordena como texto)"""
+        if not isinstance(period, str):
+            return False
+        if period_filter['periods'] is not None and period not in period_filter['periods']:
+            return False
+        return period_filter['since'] is None or period >= period_filter['since']
+    
+    def _period_mask(self, periods: pd.Series, period_filter: Dict) -> np.ndarray:
+        """Máscara de filas que pasan el filtro, evaluándolo una vez por período distinto"""
+        codes, uniques = pd.factorize(periods)
+        keep = np.array([self._keep_period(period, period_filter) for period in uniques] + [False], dtype=bool)
+        return keep[codes]
+    
+    @staticmethod
+    def _parquet_filters(period_filter: Optional[Dict]) -> Optional[List[Tuple]]:
+        """Filtro de períodos en formato de pyarrow.parquet (usa las estadísticas de los row groups)"""
+        if period_filter is None:
+            return None
+        filters = []
+        if period_filter['periods'] is not None:
+            filters.append(('Periodo', 'in', period_filter['periods']))
+        if period_filter['since'] is not None:
+            filters.append(('Periodo', '>=', period_filter['since']))
+        return filters
+    
+    def _read_csv_arrow(self, csv_file: Path, table_id: str, encoding: str, separator: str,
+                        period_filter: Optional[Dict] = None) -> pd.DataFrame:
+        """
+        Lee el CSV con pyarrow en una sola pasada multihilo con el esquema declarado:
+        dimensiones como categóricas y valores como float64 (cada valor distinto
+        se decodifica una sola vez con decode_ine_numbers)
+        
+        Args:
+            csv_file: Ruta al archivo
+            table_id: ID de la tabla
+            encoding: Encoding del archivo
+            separator: Separador de campos
+            period_filter: Filtro de períodos aplicado en Arrow, antes de convertir a pandas
             
-            # Añadir metadatos
-            df['fuente_tabla'] = table_id
-            df['tabla_nombre'] = self.tables_config.get(table_id, {}).get('name', f'Tabla {table_id}')
-            
-            return df
+        Returns:
+            DataFrame con dimensiones categóricas y valores float64
+        """
+        columns = self._read_header(csv_file, encoding, separator)
+        value_columns = set(self._profile(table_id, columns)['value_columns'])
+        # Valores también como diccionario: se decodifican sus entradas, no cada fila
+        column_types = {col: pa.dictionary(pa.int32(), pa.string()) for col in columns}
+        
+        # pyarrow solo decodifica UTF-8 de forma nativa (y descarta el BOM)
+        arrow_encoding = encoding
+        if encoding.lower().replace('_', '-') in ('utf-8', 'utf-8-sig', 'utf8', 'ascii'):
+            arrow_encoding = 'utf8'
+        
+        with self._open_binary(csv_file) as f:
+            table = pa_csv.read_csv(
+                f,
+                read_options=pa_csv.ReadOptions(encoding=arrow_encoding, use_threads=True),
+                parse_options=pa_csv.ParseOptions(delimiter=separator),
+                convert_options=pa_csv.ConvertOptions(
+                    column_types=column_types,
+                    null_values=pa_csv.ConvertOptions().null_values + self.NA_VALUES,
+                    strings_can_be_null=True,
+                    quoted_strings_can_be_null=True
+                )
+            )
+        
+        if period_filter is not None:
+            periodo = next(name for name in table.column_names if name.strip() == 'Periodo')
+            table = table.filter(self._arrow_period_mask(table.column(periodo), period_filter))
+        
+        df = table.to_pandas()
+        for col in df.columns:
+            if col.strip() in value_columns:
+                df[col] = decode_ine_numbers(df[col])
+        
+        return df
+    
+    def _arrow_period_mask(self, periods, period_filter: Dict):
+        """Máscara Arrow de filas que pasan el filtro, evaluado sobre el diccionario de cada bloque"""
+        masks = []
+        for chunk in periods.chunks:
+            keep = np.array([self._keep_period(period, period_filter) for period in chunk.dictionary.to_pylist()] + [False],
+                            dtype=bool)
+            masks.append(keep[chunk.indices.fill_null(-1).to_numpy(zero_copy_only=False)])
+        return pa.array(np.concatenate(masks) if masks else np.zeros(0, dtype=bool))
+    
+    def stage_table(self, table_id: str, periods: Optional[List[str]] = None, since: Optional[str] = None,
+                    conn=None):
+        """
+        Prepara la tabla cruda como relación DuckDB perezosa, sin pasar por pandas
+        
+        Dimensiones VARCHAR y valores DOUBLE (formato español decodificado en SQL).
+        Nada se lee hasta consumir la relación (SQL, .create(), .arrow()), y el filtro
+        de períodos se aplica dentro del escaneo paralelo del CSV. Con `conn` (p. ej.
+        la del Loader, ver Loader.stage_raw_table) la tabla se carga en esa base de
+        datos directamente desde el CSV.
+        
+        Args:
+            table_id: ID de la tabla (ej: '6042')
+            periods: Si se indica, solo estos períodos
+            since: Si se indica, solo este período y los posteriores
+            conn: Conexión DuckDB donde crear la relación (por defecto, una en
+                memoria del extractor)
             
-        except Exception as e:
-            logger.error(f"Error leyendo CSV {csv_file}: {str(e)}")
-            raise
+        Returns:
+            duckdb.DuckDBPyRelation sobre `conn`
+        """
+        if duckdb is None:
+            raise ImportError("Se necesita duckdb para preparar tablas como relaciones")
+        
+        csv_file = self._find_csv_file(table_id)
+        if not csv_file:
+            raise FileNotFoundError(f"No se encontró archivo CSV para tabla {table_id}")
+        
+        encoding, separator = self._resolve_file_format(csv_file)
+        if not self._duckdb_encoding(encoding):
+            raise ValueError(f"DuckDB no lee el encoding {encoding} de {csv_file.name}")
+        return self._duckdb_relation(csv_file, table_id, encoding, separator, self._period_filter(periods, since),
+                                     conn=conn)
+    
+    def _duckdb(self):
+        """Conexión DuckDB en memoria del extractor (se crea al primer uso)"""
+        if self._duckdb_conn is None:
+            self._duckdb_conn = duckdb.connect()
+        return self._duckdb_conn
+    
+    def _duckdb_encoding(self, encoding: str) -> Optional[str]:
+        return self.DUCKDB_ENCODINGS.get(encoding.lower().replace('_', '-'))
+    
+    def _duckdb_relation(self, csv_file: Path, table_id: str, encoding: str, separator: str,
+                         period_filter: Optional[Dict] = None, conn=None):
+        """Relación DuckDB con el CSV tipado, columnas sin espacios y el filtro de períodos"""
+        columns = self._read_header(csv_file, encoding, separator)
+        value_columns = set(self._profile(table_id, columns)['value_columns'])
+        
+        # DuckDB descomprime .gz/.zst según la extensión
+        relation = (conn or self._duckdb()).read_csv(
+            str(csv_file),
+            header=True,
+            sep=separator,
+            quotechar='"',
+            columns={col: 'VARCHAR' for col in columns},
+            na_values=self.NA_VALUES,
+            encoding=self._duckdb_encoding(encoding),
+            compression='auto',
+            auto_detect=False
+        )
+        
+        projections = []
+        for col in columns:
+            name = self._sql_identifier(col)
+            value = self._sql_decode_number(name) if col.strip() in value_columns else name
+            projections.append(f"{value} AS {self._sql_identifier(col.strip())}")
+        relation = relation.project(', '.join(projections))
+        
+        if period_filter is not None:
+            relation = relation.filter(self._sql_period_filter(period_filter))
+        return relation
+    
+    def _read_csv_duckdb(self, csv_file: Path, table_id: str, encoding: str, separator: str,
+                         period_filter: Optional[Dict] = None) -> pd.DataFrame:
+        """
+        Lee el CSV con el read_csv de DuckDB y materializa la relación en pandas,
+        ya filtrada y con los valores en float64
+        
+        La conversión a pandas cuesta lo mismo que el parseo que se ahorra, así
+        que este motor no es más rápido que 'c'; para cargar en DuckDB sin pasar
+        por pandas está stage_table.
+        """
+        df = self._duckdb_relation(csv_file, table_id, encoding, separator, period_filter).df()
+        
+        # Nulos de texto como NaN, igual que pandas
+        for col in df.columns:
+            if df[col].dtype == object:
+                df[col] = df[col].where(df[col].notna(), np.nan)
+        return df
+    
+    @staticmethod
+    def _sql_identifier(name: str) -> str:
+        return '"' + name.replace('"', '""') + '"'
+    
+    @staticmethod
+    def _sql_literal(value: str) -> str:
+        return "'" + value.replace("'", "''") + "'"
+    
+    @staticmethod
+    def _sql_decode_number(column: str) -> str:
+        """Expresión SQL equivalente a parse_ine_number ('1.234,5' -> 1234.5; lo no numérico, NULL)"""
+        text = f"replace(replace(trim({column}), '.', ''), ',', '.')"
+        return (f"CASE WHEN regexp_full_match({text}, '[+-]?(\\d+\\.?\\d*|\\.\\d+)([eE][+-]?\\d+)?') "
+                f"THEN CAST({text} AS DOUBLE) END")
+    
+    def _sql_period_filter(self, period_filter: Dict) -> str:
+        """Filtro de períodos como condición SQL sobre la columna Periodo"""
+        conditions = []
+        if period_filter['periods'] is not None:
+            if not period_filter['periods']:
+                return 'FALSE'
+            conditions.append(f'"Periodo" IN ({", ".join(self._sql_literal(p) for p in period_filter["periods"])})')
+        if period_filter['since'] is not None:
+            conditions.append(f'"Periodo" >= {self._sql_literal(period_filter["since"])}')
+        return ' AND '.join(conditions)
     
     def _find_csv_file(self, table_id: str) -> Optional[Path]:
         """
@@ -108,15 +774,15 @@ class Extractor:
         Returns:
             Path al archivo CSV o None si no existe
         """
-        # Buscar con patrón
-        pattern = f"{table_id}_*.csv"
-        csv_files = list(self.raw_dir.glob(pattern))
+        # Buscar con patrón (CSV plano o comprimido)
+        csv_files = [f for suffix in self.RAW_SUFFIXES for f in self.raw_dir.glob(f"{table_id}_*{suffix}")]
         
         if not csv_files:
             # Intentar con nombre exacto
-            exact_file = self.raw_dir / f"{table_id}.csv"
-            if exact_file.exists():
-                return exact_file
+            for suffix in self.RAW_SUFFIXES:
+                exact_file = self.raw_dir / f"{table_id}{suffix}"
+                if exact_file.exists():
+                    return exact_file
             return None
         
         # Si hay múltiples, tomar el más reciente
@@ -126,6 +792,105 @@ class Extractor:
         
         return csv_files[0]
     
+    def _resolve_file_format(self, file_path: Path, content_hash: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Obtiene el encoding y separador del archivo, usando el manifiesto si
+        su hash coincide con el contenido actual y detectándolos si no.
+        El manifiesto guarda también el tamaño y la fecha de modificación, con
+        los que _content_hash evita releer el archivo si no ha cambiado
+        
+        Args:
+            file_path: Ruta al archivo
+            content_hash: SHA-256 del contenido si ya se ha calculado
+            
+        Returns:
+            Tupla (encoding, separator)
+        """
+        if not self.use_manifest:
+            return self._detect_file_format(file_path)
+        
+        stamp = self._file_stamp(file_path)
+        if content_hash is None:
+            content_hash = self._content_hash(file_path)
+        manifest = self._load_manifest(file_path)
+        if manifest and manifest.get('hash') == content_hash:
+            logger.info(f"Formato tomado del manifiesto de {file_path.name}")
+            if manifest.get('stamp') != stamp:
+                # Mismo contenido con otra fecha (p. ej. restaurado): se actualiza
+                # la marca para no volver a calcular el hash
+                manifest['stamp'] = stamp
+                self._save_manifest(file_path, manifest)
+            return manifest['encoding'], manifest['separator']
+        
+        encoding, separator = self._detect_file_format(file_path)
+        self._save_manifest(file_path, {
+            'version': self.MANIFEST_VERSION,
+            'hash': content_hash,
+            'stamp': stamp,
+            'encoding': encoding,
+            'separator': separator,
+            'columns': self._read_header(file_path, encoding, separator)
+        })
+        return encoding, separator
+    
+    def _content_hash(self, file_path: Path) -> str:
+        """
+        SHA-256 del CSV descomprimido (el mismo que registra agent_extractor)
+        
+        Si el manifiesto registra el mismo tamaño y fecha de modificación que el
+        archivo actual se toma su hash sin leer el archivo
+        """
+        if self.use_manifest:
+            manifest = self._load_manifest(file_path)
+            if manifest and manifest.get('hash') and manifest.get('stamp') == self._file_stamp(file_path):
+                return manifest['hash']
+        
+        sha256 = hashlib.sha256()
+        with self._open_binary(file_path) as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                sha256.update(block)
+        return sha256.hexdigest()
+    
+    @staticmethod
+    def _file_stamp(file_path: Path) -> List[int]:
+        """Tamaño y fecha de modificación (ns) del archivo"""
+        stat = file_path.stat()
+        return [stat.st_size, stat.st_mtime_ns]
+    
+    def _manifest_path(self, file_path: Path) -> Path:
+        return file_path.with_name(file_path.name + self.MANIFEST_SUFFIX)
+    
+    def _load_manifest(self, file_path: Path) -> Optional[Dict]:
+        """Manifiesto de formato del archivo (None si no existe, es ilegible u obsoleto)"""
+        manifest_path = self._manifest_path(file_path)
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get('version') != self.MANIFEST_VERSION:
+            return None
+        return manifest
+    
+    def _save_manifest(self, file_path: Path, manifest: Dict):
+        """Guarda el manifiesto de forma atómica; un fallo solo implica volver a detectar"""
+        manifest_path = self._manifest_path(file_path)
+        tmp_path = manifest_path.with_name(manifest_path.name + '.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, manifest_path)
+        except OSError as e:
+            logger.warning(f"No se pudo guardar el manifiesto de {file_path.name}: {e}")
+    
+    def _read_header(self, file_path: Path, encoding: str, separator: str) -> List[str]:
+        """Columnas de la cabecera del CSV"""
+        try:
+            with io.TextIOWrapper(self._open_binary(file_path), encoding=encoding) as f:
+                return f.readline().lstrip('\ufeff').rstrip('\r\n').split(separator)
+        except (OSError, UnicodeDecodeError):
+            return []
+    
     def _detect_file_format(self, file_path: Path) -> Tuple[str, str]:
         """
         Detecta el encoding y separador del archivo
@@ -137,7 +902,7 @@ class Extractor:
             Tupla (encoding, separator)
         """
         # Detectar encoding con chardet
-        with open(file_path, 'rb') as f:
+        with self._open_binary(file_path) as f:
             raw_data = f.read(10000)  # Leer primeros 10KB
             result = chardet.detect(raw_data)
             detected_encoding = result['encoding']
@@ -149,7 +914,7 @@ class Extractor:
         if confidence < 0.7:
             for encoding in self.ENCODINGS:
                 try:
-                    with open(file_path, 'r', encoding=encoding) as f:
+                    with io.TextIOWrapper(self._open_binary(file_path), encoding=encoding) as f:
                         f.read(1000)  # Probar leyendo
                     logger.info(f"Encoding validado: {encoding}")
                     detected_encoding = encoding
@@ -160,7 +925,7 @@ class Extractor:
         # Detectar separador
         separator = ';'  # Por defecto, INE usa punto y coma
         try:
-            with open(file_path, 'r', encoding=detected_encoding) as f:
+            with io.TextIOWrapper(self._open_binary(file_path), encoding=detected_encoding) as f:
                 first_line = f.readline()
                 # Contar ocurrencias de posibles separadores
                 sep_counts = {sep: first_line.count(sep) for sep in self.SEPARATORS}
@@ -170,9 +935,24 @@ class Extractor:
         
         return detected_encoding or 'latin-1', separator
     
+    @staticmethod
+    def _open_binary(file_path: Path) -> BinaryIO:
+        """
+        Abre un CSV crudo en binario, descomprimiendo en streaming los
+        .csv.gz / .csv.zst
+        """
+        if file_path.name.endswith('.gz'):
+            return gzip.open(file_path, 'rb')
+        if file_path.name.endswith('.zst'):
+            if zstandard is None:
+                raise ImportError(f"Se necesita zstandard para leer {file_path.name}")
+            return zstandard.ZstdDecompressor().stream_reader(open(file_path, 'rb'), closefd=True)
+        return open(file_path, 'rb')
+    
     def _identify_columns(self, df: pd.DataFrame, table_id: str) -> Dict:
         """
-        Identifica el tipo de cada columna (dimensión vs métrica)
+        Identifica el tipo de cada columna (dimensión vs métrica) a partir del
+        perfil de esquema de la tabla
         
         Args:
             df: DataFrame con los datos
@@ -181,49 +961,12 @@ class Extractor:
         Returns:
             Diccionario con información de columnas
         """
-        columns_info = {
-            'dimensiones': [],
-            'metricas': [],
-            'tiempo_trabajo': None
+        profile = self._profile(table_id, list(df.columns))
+        return {
+            'dimensiones': list(profile['dimensiones']),
+            'metricas': list(profile['value_columns']),
+            'tiempo_trabajo': profile['metric_column']
         }
-        
-        # Patrones para identificar dimensiones
-        dimension_patterns = [
-            'periodo', 'sector', 'seccion', 'division', 'actividad',
-            'comunidad', 'ccaa', 'jornada', 'tipo de jornada',
-            'establecimiento', 'tamaño'
-        ]
-        
-        # Patrones para columna de métricas
-        metric_column_patterns = [
-            'tiempo de trabajo', 'componentes del coste',
-            'componente del coste', 'motivos', 'variable'
-        ]
-        
-        for col in df.columns:
-            col_lower = col.lower().strip()
-            
-            # Verificar si es dimensión
-            is_dimension = any(pattern in col_lower for pattern in dimension_patterns)
-            
-            # Verificar si es la columna que contiene las métricas
-            is_metric_column = any(pattern in col_lower for pattern in metric_column_patterns)
-            
-            if is_dimension:
-                columns_info['dimensiones'].append(col)
-            elif is_metric_column:
-                columns_info['tiempo_trabajo'] = col
-            else:
-                # Si no es dimensión ni columna de métricas, es una columna de valores
-                if df[col].dtype in ['float64', 'int64', 'object']:
-                    # Verificar si contiene valores numéricos
-                    try:
-                        pd.to_numeric(df[col].dropna().iloc[:10], errors='coerce')
-                        columns_info['metricas'].append(col)
-                    except:
-                        pass
-        
-        return columns_info
     
     def _validate_structure(self, df: pd.DataFrame, table_id: str):
         """
@@ -244,21 +987,10 @@ class Extractor:
         if 'Periodo' not in df.columns:
             raise ValueError(f"Tabla {table_id} no tiene columna 'Periodo'")
         
-        # Verificar que hay datos numéricos
+        # Verificar que hay datos numéricos (o columnas de valores declaradas)
         numeric_columns = df.select_dtypes(include=['float64', 'int64']).columns
-        if len(numeric_columns) == 0:
-            # Intentar encontrar columnas con valores numéricos como strings
-            potential_numeric = []
-            for col in df.columns:
-                if col != 'Periodo':
-                    try:
-                        pd.to_numeric(df[col].dropna().iloc[:10], errors='coerce')
-                        potential_numeric.append(col)
-                    except:
-                        pass
-            
-            if not potential_numeric:
-                logger.warning(f"Tabla {table_id} no tiene columnas numéricas evidentes")
+        if len(numeric_columns) == 0 and not self._profile(table_id, list(df.columns))['value_columns']:
+            logger.warning(f"Tabla {table_id} no tiene columnas numéricas evidentes")
     
     def _filter_test_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -270,16 +1002,19 @@ class Extractor:
         Returns:
             DataFrame filtrado
         """
-        # Ordenar por periodo descendente y tomar los últimos 4 trimestres
-        df_sorted = df.sort_values('Periodo', ascending=False)
-        unique_periods = df_sorted['Periodo'].unique()[:4]  # Últimos 4 trimestres
+        # Últimos 4 trimestres (orden de texto, también si la columna es categórica)
+        unique_periods = sorted(df['Periodo'].dropna().unique(), reverse=True)[:4]
         
-        return df[df['Periodo'].isin(unique_periods)]
+        return df[df['Periodo'].isin(unique_periods)].copy()
     
     def _clean_numeric_values(self, df: pd.DataFrame, columns_info: Dict) -> pd.DataFrame:
         """
         Limpia y convierte valores numéricos
         
+        read_csv ya decodifica decimal=',' y thousands='.': solo se convierten,
+        una vez y con decode_ine_numbers, las columnas de valores del perfil que
+        siguen siendo texto (dimensiones y etiquetas de métrica no se tocan)
+        
         Args:
             df: DataFrame con datos
             columns_info: Información sobre las columnas
@@ -287,56 +1022,50 @@ class Extractor:
         Returns:
             DataFrame con valores numéricos limpios
         """
-        # Identificar columnas numéricas
-        numeric_cols = columns_info.get('metricas', [])
-        
-        for col in numeric_cols:
-            if col in df.columns:
-                # Limpiar valores
-                df[col] = df[col].astype(str).str.replace('.', '', regex=False)  # Quitar separador de miles
-                df[col] = df[col].str.replace(',', '.', regex=False)  # Cambiar decimal
-                df[col] = df[col].str.strip()
-                
-                # Convertir a numérico
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-        
-        # Para columnas de tipo objeto que deberían ser numéricas
-        for col in df.columns:
-            if df[col].dtype == 'object' and col not in columns_info.get('dimensiones', []):
-                # Intentar conversión
-                try:
-                    # Primero intentar conversión directa
-                    test_values = pd.to_numeric(df[col].dropna().iloc[:10], errors='coerce')
-                    if not test_values.isna().all():
-                        # Limpiar y convertir
-                        df[col] = df[col].astype(str).str.replace('.', '', regex=False)
-                        df[col] = df[col].str.replace(',', '.', regex=False)
-                        df[col] = pd.to_numeric(df[col], errors='coerce')
-                except:
-                    pass
+        for col in columns_info.get('metricas', []):
+            if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+                df[col] = decode_ine_numbers(df[col])
         
         return df
     
-    def extract_all(self, table_ids: List[str], test_mode: bool = False) -> Dict[str, pd.DataFrame]:
+    def extract_all(self, table_ids: List[str], test_mode: bool = False, periods: Optional[List[str]] = None,
+                    since: Optional[str] = None, jobs: int = 1) -> Dict[str, pd.DataFrame]:
         """
         Extrae datos de múltiples tablas
         
         Args:
             table_ids: Lista de IDs de tablas
             test_mode: Si True, modo test
+            periods: Si se indica, solo estos períodos
+            since: Si se indica, solo este período y los posteriores
+            jobs: Procesos para parsear las tablas en paralelo (1 = en serie)
             
         Returns:
             Diccionario con DataFrames por tabla
         """
+        if jobs < 1:
+            raise ValueError(f"El número de procesos debe ser al menos 1: {jobs}")
         extracted_data = {}
         
+        handles, errors = self.extract_parallel(table_ids, jobs) if jobs > 1 else ({}, {})
         for table_id in table_ids:
             try:
-                df = self.extract_table(table_id, test_mode)
+                if table_id in errors:
+                    raise RuntimeError(errors[table_id])
+                if table_id in handles:
+                    df = self.from_handle(table_id, handles[table_id], test_mode, periods=periods, since=since)
+                else:
+                    df = self.extract_table(table_id, test_mode, periods=periods, since=since)
                 extracted_data[table_id] = df
                 logger.info(f"Tabla {table_id} extraída exitosamente")
             except Exception as e:
                 logger.error(f"Error extrayendo tabla {table_id}: {str(e)}")
                 raise
         
-        return extracted_data
\ No newline at end of file
+        return extracted_data
+
+
+def _materialize_worker(init_kwargs: Dict, table_id: str) -> Tuple[str, str]:
+    """Proceso del pool de extract_parallel: materializa una tabla en su caché Parquet"""
+    path, content_hash = Extractor(**init_kwargs).materialize(table_id)
+    return str(path), content_hash
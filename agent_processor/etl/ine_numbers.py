@@ -0,0 +1,68 @@
+"""
+Decodificador de números del INE
+Convierte texto con formato español ('1.234,5') y marcadores de dato no
+disponible ('..', 'n.d.') a float64 en una sola pasada
+"""
+
+import math
+import re
+
+import numpy as np
+import pandas as pd
+
+# Marcadores de dato no disponible en los CSVs del INE
+NA_MARKERS = frozenset(['..', '...', 'n.d.', 'N.D.', ''])
+
+# Número ya normalizado a formato Python ('1234.5'); excluye 'nan', 'inf' y '1_000'
+_NUMBER = re.compile(r'[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?')
+
+
+def parse_ine_number(value) -> float:
+    """
+    Convierte un valor del INE a float ('.' de miles, ',' decimal)
+
+    Los números ya decodificados se devuelven tal cual; los marcadores de
+    dato no disponible y el texto no numérico dan NaN.
+    """
+    if value is None:
+        return math.nan
+    if isinstance(value, (int, float, np.number)):
+        return float(value)
+    text = str(value).strip()
+    if text in NA_MARKERS:
+        return math.nan
+    text = text.replace('.', '').replace(',', '.')
+    if not _NUMBER.fullmatch(text):
+        return math.nan
+    return float(text)
+
+
+def decode_ine_numbers(values: pd.Series) -> pd.Series:
+    """
+    Decodifica una columna del INE a float64
+
+    Cada valor distinto se convierte una sola vez (factorización o categorías
+    de una columna categórica) y el resultado se expande con los códigos, sin
+    copias intermedias de texto por fila. Las columnas ya numéricas solo se
+    convierten a float64.
+
+    Args:
+        values: Serie de texto, categórica o numérica
+
+    Returns:
+        Serie float64 con el mismo índice y nombre
+    """
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values.astype('float64')
+
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        uniques = values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+
+    # Posición extra al final para el código -1 (nulo)
+    decoded = np.empty(len(uniques) + 1, dtype='float64')
+    decoded[:-1] = [parse_ine_number(value) for value in uniques]
+    decoded[-1] = np.nan
+    return pd.Series(decoded[codes], index=values.index, name=values.name)
@@ -6,7 +6,7 @@ import duckdb
 import pandas as pd
 import logging
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -218,6 +218,43 @@ class Loader:
         
         return stats
     
+    def stage_raw_table(self, extractor, table_id: str, periods: Optional[List[str]] = None,
+                        since: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Carga la tabla cruda del INE en raw_{table_id} directamente desde el CSV
+        
+        La relación de Extractor.stage_table se crea sobre esta conexión, así que
+        DuckDB lee, decodifica y guarda el CSV sin pasar por pandas.
+        
+        Args:
+            extractor: Extractor del ETL que localiza y describe el CSV
+            table_id: ID de la tabla (ej: '6042')
+            periods: Si se indica, solo estos períodos
+            since: Si se indica, solo este período y los posteriores
+        
+        Returns:
+            Diccionario con estadísticas de carga
+        """
+        if not self.conn:
+            self.connect()
+        
+        raw_table = f"raw_{table_id}"
+        stats = {'inicio': datetime.now(), 'tabla': raw_table}
+        try:
+            relation = extractor.stage_table(table_id, periods=periods, since=since, conn=self.conn)
+            self.conn.execute(f"DROP TABLE IF EXISTS {raw_table}")
+            relation.create(raw_table)
+            
+            stats['registros_cargados'] = self.conn.execute(f"SELECT COUNT(*) FROM {raw_table}").fetchone()[0]
+            stats['fin'] = datetime.now()
+            stats['duracion'] = str(stats['fin'] - stats['inicio'])
+            logger.info(f"Tabla cruda {raw_table}: {stats['registros_cargados']} registros en {stats['duracion']}")
+        except Exception as e:
+            logger.error(f"Error cargando la tabla cruda {raw_table}: {str(e)}")
+            raise
+        
+        return stats
+    
     def get_stats(self) -> Dict[str, Any]:
         """
         Obtiene estadísticas de la base de datos
@@ -0,0 +1,161 @@
+"""
+Perfiles de esquema por tabla
+Compila una sola vez, a partir de mappings.json y la cabecera del CSV, el papel
+de cada columna (dimensiones, valores, métricas, sector, jornada, CCAA) que
+usan el extractor y el transformador
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaProfiles:
+    """
+    Perfiles de esquema compilados por tabla, validados con el hash de la
+    cabecera y de la configuración de la tabla
+    """
+
+    # Versión de las reglas de compilación (al cambiarla se recompilan todos)
+    PROFILE_VERSION = 1
+
+    # Columnas de valores si la tabla no declara `value_columns` en tables_config
+    DEFAULT_VALUE_COLUMNS = ['Total']
+
+    # Columnas de metadatos que añade el extractor (no forman parte de la cabecera)
+    METADATA_COLUMNS = ['fuente_tabla', 'tabla_nombre']
+
+    # Patrones (en minúsculas) de cada papel de columna
+    METRIC_COLUMN_PATTERNS = [
+        'tiempo de trabajo', 'componentes del coste',
+        'componente del coste', 'componente', 'motivos', 'variable'
+    ]
+    SECTOR_PATTERNS = ['sector', 'seccion', 'division', 'actividad']
+    JORNADA_PATTERNS = ['jornada']
+    CCAA_COLUMN = 'Comunidades y Ciudades Autónomas'
+
+    def __init__(self, mappings: Dict, profiles_path: Optional[Path] = None):
+        """
+        Inicializa el registro de perfiles
+
+        Args:
+            mappings: Contenido de mappings.json
+            profiles_path: JSON donde persistir los perfiles compilados
+                (None = solo en memoria)
+        """
+        self.tables_config = mappings.get('tables_config', {})
+        self.profiles_path = Path(profiles_path) if profiles_path else None
+        self._profiles = self._load()
+
+    def get(self, table_id: str, columns: List[str]) -> Dict:
+        """
+        Perfil de la tabla para la cabecera dada (compilado si no existe o si
+        la cabecera o la configuración de la tabla han cambiado)
+
+        Args:
+            table_id: ID de la tabla
+            columns: Columnas de la cabecera (sin espacios sobrantes); las de
+                metadatos del extractor se ignoran
+
+        Returns:
+            Diccionario con el papel de cada columna
+        """
+        columns = [col for col in columns if col not in self.METADATA_COLUMNS]
+        header_hash = self.header_hash(columns)
+
+        profile = self._profiles.get(table_id)
+        if (profile and profile.get('version') == self.PROFILE_VERSION
+                and profile.get('header_hash') == header_hash
+                and profile.get('config_hash') == self._config_hash(table_id)):
+            return profile
+
+        if profile:
+            logger.info(f"Cabecera o configuración de {table_id} cambiada; se recompila su perfil")
+        profile = self.compile(table_id, columns)
+        self._profiles[table_id] = profile
+        self._save()
+        return profile
+
+    def compile(self, table_id: str, columns: List[str]) -> Dict:
+        """
+        Compila el perfil de una tabla a partir de su cabecera y su configuración
+
+        Args:
+            table_id: ID de la tabla
+            columns: Columnas de la cabecera
+
+        Returns:
+            Diccionario con el papel de cada columna
+        """
+        table_config = self.tables_config.get(table_id, {})
+        declared_values = table_config.get('value_columns', self.DEFAULT_VALUE_COLUMNS)
+        value_columns = [col for col in columns if col in declared_values]
+
+        # Esquema declarado: valores, la columna con las etiquetas de métrica y
+        # el resto dimensiones (texto)
+        metric_column = next(
+            (col for col in columns if col not in value_columns and self._matches(col, self.METRIC_COLUMN_PATTERNS)),
+            None
+        )
+        dimensions = [col for col in columns if col not in value_columns and col != metric_column]
+
+        profile = {
+            'version': self.PROFILE_VERSION,
+            'table_id': table_id,
+            'header_hash': self.header_hash(columns),
+            'config_hash': self._config_hash(table_id),
+            'columns': list(columns),
+            'type': 'long' if metric_column else 'wide',
+            'periodo': 'Periodo' if 'Periodo' in columns else None,
+            'dimensiones': dimensions,
+            'metric_column': metric_column,
+            'value_columns': value_columns,
+            'sector_column': next((col for col in dimensions if self._matches(col, self.SECTOR_PATTERNS)), None),
+            'jornada_column': next((col for col in dimensions if self._matches(col, self.JORNADA_PATTERNS)), None),
+            'ccaa_column': self.CCAA_COLUMN if table_config.get('has_ccaa') and self.CCAA_COLUMN in columns else None
+        }
+        logger.info(f"Perfil de esquema de {table_id} compilado: {profile['type']}, "
+                    f"métrica={metric_column}, valores={value_columns}")
+        return profile
+
+    @staticmethod
+    def header_hash(columns: List[str]) -> str:
+        """Hash de la cabecera (nombres y orden de las columnas)"""
+        return hashlib.sha256('\x1f'.join(columns).encode('utf-8')).hexdigest()[:16]
+
+    def _config_hash(self, table_id: str) -> str:
+        config = json.dumps(self.tables_config.get(table_id, {}), sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(config.encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def _matches(column: str, patterns: List[str]) -> bool:
+        column_lower = column.lower()
+        return any(pattern in column_lower for pattern in patterns)
+
+    def _load(self) -> Dict[str, Dict]:
+        """Perfiles persistidos (vacío si no hay archivo o es ilegible)"""
+        if not self.profiles_path:
+            return {}
+        try:
+            with open(self.profiles_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        """Guarda los perfiles de forma atómica; un fallo solo implica recompilar"""
+        if not self.profiles_path:
+            return
+        tmp_path = self.profiles_path.with_name(self.profiles_path.name + '.tmp')
+        try:
+            self.profiles_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._profiles, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.profiles_path)
+        except OSError as e:
+            logger.warning(f"No se pudieron guardar los perfiles de esquema: {e}")
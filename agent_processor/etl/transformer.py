@@ -9,6 +9,8 @@ import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 
+from .schema_profile import SchemaProfiles
+
 logger = logging.getLogger(__name__)
 
 class Transformer:
@@ -16,18 +18,27 @@ class Transformer:
     Transforma datos crudos del INE en formato unificado
     """
     
-    def __init__(self, config: Dict):
+    # Columna con las etiquetas de métrica tras pivotar una tabla wide
+    PIVOT_METRIC_COLUMN = 'Tiempo de trabajo'
+    
+    # Niveles CNAE que forman parte de rol_grano (el resto no añade parte)
+    ROL_GRANO_CNAE_NIVELES = ['TOTAL', 'SECTOR_BS', 'SECCION', 'DIVISION']
+    
+    def __init__(self, config: Dict, profiles: Optional[SchemaProfiles] = None):
         """
         Inicializa el transformador con configuración
         
         Args:
             config: Configuración con mappings y reglas
+            profiles: Perfiles de esquema compartidos con el extractor
+                (None = compilarlos en memoria desde mappings)
         """
         self.config = config
         self.mappings = config.get('mappings', {})
         self.dimension_mappings = self.mappings.get('dimension_mappings', {})
         self.metric_mappings = self.mappings.get('metric_mappings', {})
         self.tables_config = self.mappings.get('tables_config', {})
+        self.profiles = profiles or SchemaProfiles(self.mappings)
         
     def transform_all(self, raw_data: Dict[str, pd.DataFrame]) -> pd.DataFrame:
         """
@@ -71,8 +82,8 @@ class Transformer:
         Returns:
             DataFrame transformado
         """
-        # Obtener configuración de la tabla
-        table_config = self.tables_config.get(table_id, {})
+        # Perfil de esquema (papel de cada columna) compilado para esta cabecera
+        profile = self.profiles.get(table_id, list(df.columns))
         
         # 1. Identificar estructura de la tabla
         structure = self._identify_table_structure(df, table_id)
@@ -88,16 +99,16 @@ class Transformer:
         df_long = self._map_periodo(df_long)
         
         # 4. Mapear dimensiones territoriales
-        df_long = self._map_territorial(df_long, table_id)
+        df_long = self._map_territorial(df_long, table_id, profile)
         
         # 5. Mapear dimensiones sectoriales
-        df_long = self._map_sectorial(df_long, table_id)
+        df_long = self._map_sectorial(df_long, table_id, profile)
         
         # 6. Mapear tipo de jornada
-        df_long = self._map_jornada(df_long, table_id)
+        df_long = self._map_jornada(df_long, table_id, profile)
         
         # 7. Mapear métricas y causas
-        df_long = self._map_metrics(df_long)
+        df_long = self._map_metrics(df_long, profile)
         
         # 8. Calcular campos derivados
         df_long = self._calculate_derived_fields(df_long, table_id)
@@ -112,7 +123,8 @@ class Transformer:
     
     def _identify_table_structure(self, df: pd.DataFrame, table_id: str) -> Dict:
         """
-        Identifica si la tabla es wide (columnas = métricas) o long
+        Identifica si la tabla es wide (columnas = métricas) o long a partir
+        del perfil de esquema de la tabla
         
         Args:
             df: DataFrame a analizar
@@ -121,43 +133,13 @@ class Transformer:
         Returns:
             Diccionario con información de estructura
         """
-        structure = {
-            'type': 'unknown',
-            'metric_column': None,
-            'value_columns': [],
-            'dimension_columns': []
+        profile = self.profiles.get(table_id, list(df.columns))
+        return {
+            'type': profile['type'],
+            'metric_column': profile['metric_column'],
+            'value_columns': list(profile['value_columns']),
+            'dimension_columns': list(profile['dimensiones'])
         }
-        
-        # Buscar columna "Tiempo de trabajo" o similar
-        metric_columns = [col for col in df.columns 
-                         if 'tiempo de trabajo' in col.lower() 
-                         or 'componente' in col.lower()
-                         or 'motivos' in col.lower()]
-        
-        if metric_columns:
-            # Formato long: métricas en una columna
-            structure['type'] = 'long'
-            structure['metric_column'] = metric_columns[0]
-            
-            # Identificar columnas de valores (numéricas)
-            for col in df.columns:
-                if col != structure['metric_column']:
-                    if df[col].dtype in ['float64', 'int64']:
-                        structure['value_columns'].append(col)
-                    elif col not in ['fuente_tabla', 'tabla_nombre']:
-                        structure['dimension_columns'].append(col)
-        else:
-            # Formato wide: cada métrica es una columna
-            structure['type'] = 'wide'
-            
-            # Todas las columnas numéricas son métricas
-            for col in df.columns:
-                if df[col].dtype in ['float64', 'int64']:
-                    structure['value_columns'].append(col)
-                elif col not in ['fuente_tabla', 'tabla_nombre']:
-                    structure['dimension_columns'].append(col)
-        
-        return structure
     
     def _pivot_to_long(self, df: pd.DataFrame, structure: Dict) -> pd.DataFrame:
         """
@@ -189,7 +171,7 @@ class Transformer:
             df,
             id_vars=id_vars,
             value_vars=value_vars,
-            var_name='Tiempo de trabajo',
+            var_name=self.PIVOT_METRIC_COLUMN,
             value_name='valor'
         )
         
@@ -208,8 +190,8 @@ class Transformer:
         if 'Periodo' not in df.columns:
             raise ValueError("No se encuentra la columna Periodo")
         
-        # Renombrar a minúsculas
-        df['periodo'] = df['Periodo']
+        # Renombrar a minúsculas (como texto aunque llegue como categórica)
+        df['periodo'] = df['Periodo'].astype(object)
         
         # Calcular fechas de inicio y fin del trimestre
         def get_quarter_dates(periodo):
@@ -242,13 +224,14 @@ class Transformer:
         
         return df
     
-    def _map_territorial(self, df: pd.DataFrame, table_id: str) -> pd.DataFrame:
+    def _map_territorial(self, df: pd.DataFrame, table_id: str, profile: Dict) -> pd.DataFrame:
         """
         Mapea dimensiones territoriales (nacional vs CCAA)
         
         Args:
             df: DataFrame
             table_id: ID de la tabla
+            profile: Perfil de esquema de la tabla
             
         Returns:
             DataFrame con dimensiones territoriales mapeadas
@@ -258,12 +241,13 @@ class Transformer:
         df['ccaa_codigo'] = None
         df['ccaa_nombre'] = None
         
-        # Solo tabla 6063 tiene CCAA
-        if table_id == '6063' and 'Comunidades y Ciudades Autónomas' in df.columns:
-            ccaa_mapping = self.dimension_mappings.get('comunidades', {}).get('6063', {})
+        # Solo las tablas con has_ccaa (6063) tienen columna de CCAA en el perfil
+        ccaa_col = profile['ccaa_column']
+        if ccaa_col and ccaa_col in df.columns:
+            ccaa_mapping = self.dimension_mappings.get('comunidades', {}).get(table_id, {})
             
             for ccaa_name, mapping in ccaa_mapping.items():
-                mask = df['Comunidades y Ciudades Autónomas'] == ccaa_name
+                mask = df[ccaa_col] == ccaa_name
                 df.loc[mask, 'ambito_territorial'] = mapping['ambito_territorial']
                 if mapping['ccaa_codigo']:
                     df.loc[mask, 'ccaa_codigo'] = mapping['ccaa_codigo']
@@ -271,13 +255,14 @@ class Transformer:
         
         return df
     
-    def _map_sectorial(self, df: pd.DataFrame, table_id: str) -> pd.DataFrame:
+    def _map_sectorial(self, df: pd.DataFrame, table_id: str, profile: Dict) -> pd.DataFrame:
         """
         Mapea dimensiones sectoriales (CNAE)
         
         Args:
             df: DataFrame
             table_id: ID de la tabla
+            profile: Perfil de esquema de la tabla
             
         Returns:
             DataFrame con dimensiones sectoriales mapeadas
@@ -292,11 +277,10 @@ class Transformer:
         table_config = self.tables_config.get(table_id, {})
         cnae_nivel = table_config.get('cnae_nivel', 'TOTAL')
         
-        # Buscar columna de sectores
-        sector_columns = [col for col in df.columns 
-                         if any(s in col.lower() for s in ['sector', 'seccion', 'division', 'actividad'])]
+        # Columna de sectores del perfil
+        sector_col = profile['sector_column']
         
-        if not sector_columns:
+        if not sector_col or sector_col not in df.columns:
             # No hay dimensión sectorial, todo es TOTAL
             df['cnae_nivel'] = 'TOTAL'
             df['cnae_codigo'] = None
@@ -304,8 +288,6 @@ class Transformer:
             df['jerarquia_sector_lbl'] = 'Total'
             return df
         
-        sector_col = sector_columns[0]
-        
         # Obtener mapping específico de la tabla
         if table_id in ['6042', '6044', '6063']:
             # Sectores B-S
@@ -356,13 +338,14 @@ class Transformer:
         
         return df
     
-    def _map_jornada(self, df: pd.DataFrame, table_id: str) -> pd.DataFrame:
+    def _map_jornada(self, df: pd.DataFrame, table_id: str, profile: Dict) -> pd.DataFrame:
         """
         Mapea tipo de jornada
         
         Args:
             df: DataFrame
             table_id: ID de la tabla
+            profile: Perfil de esquema de la tabla
             
         Returns:
             DataFrame con jornada mapeada
@@ -374,42 +357,38 @@ class Transformer:
         if not has_jornada:
             df['tipo_jornada'] = None
         else:
-            # Buscar columna de jornada
-            jornada_columns = [col for col in df.columns 
-                              if 'jornada' in col.lower() or 'tiempo' in col.lower()]
+            # Columna de jornada del perfil
+            jornada_col = profile['jornada_column']
             
-            if jornada_columns:
-                jornada_col = jornada_columns[0]
+            if jornada_col and jornada_col in df.columns:
                 jornada_mapping = self.dimension_mappings.get('tipo_jornada', {}).get('mapping', {})
                 
-                # Mapear valores
-                df['tipo_jornada'] = df[jornada_col].map(jornada_mapping)
+                # Mapear valores (como texto aunque la columna llegue como categórica)
+                jornada_values = df[jornada_col].astype(object)
+                df['tipo_jornada'] = jornada_values.map(jornada_mapping)
                 
                 # Si no se encuentra mapping, usar valor original
-                df['tipo_jornada'] = df['tipo_jornada'].fillna(df[jornada_col])
+                df['tipo_jornada'] = df['tipo_jornada'].fillna(jornada_values)
             else:
                 df['tipo_jornada'] = 'TOTAL'
         
         return df
     
-    def _map_metrics(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _map_metrics(self, df: pd.DataFrame, profile: Dict) -> pd.DataFrame:
         """
         Mapea métricas y causas desde la columna "Tiempo de trabajo"
         
         Args:
             df: DataFrame con columna de métricas
+            profile: Perfil de esquema de la tabla
             
         Returns:
             DataFrame con métricas y causas mapeadas
         """
-        # Buscar columna de métricas
-        metric_column = None
-        for col in df.columns:
-            if 'tiempo de trabajo' in col.lower() or 'componente' in col.lower():
-                metric_column = col
-                break
+        # Columna de métricas del perfil (la de la pivotación si la tabla era wide)
+        metric_column = profile['metric_column'] if profile['type'] == 'long' else self.PIVOT_METRIC_COLUMN
         
-        if not metric_column:
+        if metric_column not in df.columns:
             # Si no hay columna de métricas, asumir que ya están mapeadas
             if 'metrica' not in df.columns:
                 df['metrica'] = 'horas_efectivas'  # Default
@@ -466,38 +445,38 @@ class Transformer:
         table_config = self.tables_config.get(table_id, {})
         rol_grano_base = table_config.get('rol_grano_base', 'UNKNOWN')
         
-        def calculate_rol_grano(row):
-            parts = []
-            
-            # Territorial
-            if row['ambito_territorial'] == 'NAC':
-                parts.append('NAC')
-            else:
-                parts.append('CCAA')
-            
-            # Sectorial
-            if row['cnae_nivel'] == 'TOTAL':
-                parts.append('TOTAL')
-            elif row['cnae_nivel'] == 'SECTOR_BS':
-                parts.append('SECTOR_BS')
-            elif row['cnae_nivel'] == 'SECCION':
-                parts.append('SECCION')
-            elif row['cnae_nivel'] == 'DIVISION':
-                parts.append('DIVISION')
-            
-            # Jornada
-            if pd.notna(row['tipo_jornada']) and row['tipo_jornada'] != 'TOTAL':
-                parts.append('JORNADA')
-            
-            return '_'.join(parts)
-        
-        df['rol_grano'] = df.apply(calculate_rol_grano, axis=1)
+        # rol_grano = territorial + nivel CNAE (si es uno de los conocidos) + JORNADA
+        # (si hay jornada y no es TOTAL): se codifica cada parte como entero y el
+        # código combinado indexa la tabla de etiquetas, sin recorrer las filas
+        cnae_nivel = df['cnae_nivel']
+        codigo_cnae = np.select(
+            [cnae_nivel == nivel for nivel in self.ROL_GRANO_CNAE_NIVELES],
+            np.arange(1, len(self.ROL_GRANO_CNAE_NIVELES) + 1), default=0
+        )
+        codigo_territorial = (~df['es_total_ccaa']).to_numpy(dtype=np.int64)
+        codigo_jornada = (df['tipo_jornada'].notna() & (df['tipo_jornada'] != 'TOTAL')).to_numpy(dtype=np.int64)
+        codigo = (codigo_territorial * (len(self.ROL_GRANO_CNAE_NIVELES) + 1) + codigo_cnae) * 2 + codigo_jornada
+        df['rol_grano'] = pd.Series(self._rol_grano_labels()[codigo], index=df.index, dtype=object)
         
         # Unidad de medida
         df['unidad'] = 'horas/mes por trabajador'
         
         return df
     
+    @classmethod
+    def _rol_grano_labels(cls) -> np.ndarray:
+        """
+        Etiquetas de rol_grano indexadas por el código combinado
+        (territorial * (niveles + 1) + nivel CNAE) * 2 + jornada
+        """
+        labels = []
+        for territorial in ['NAC', 'CCAA']:
+            for nivel in [None] + cls.ROL_GRANO_CNAE_NIVELES:
+                for jornada in [False, True]:
+                    parts = [territorial] + ([nivel] if nivel else []) + (['JORNADA'] if jornada else [])
+                    labels.append('_'.join(parts))
+        return np.array(labels, dtype=object)
+    
     def _add_metadata(self, df: pd.DataFrame, table_id: str) -> pd.DataFrame:
         """
         Añade metadatos al DataFrame
@@ -549,9 +528,6 @@ class Transformer:
         if 'valor' in df.columns:
             df['valor'] = pd.to_numeric(df['valor'], errors='coerce')
             
-            # Los valores del INE vienen multiplicados por 10 (151 = 15.1 horas)
-            df['valor'] = df['valor'] / 10.0
-            
             # Redondear a 3 decimales según diseño
             df['valor'] = df['valor'].round(3)
             
@@ -560,7 +536,7 @@ class Transformer:
         else:
             # Si no existe columna valor, puede que esté en 'Total' u otra
             if 'Total' in df.columns:
-                df['valor'] = pd.to_numeric(df['Total'], errors='coerce') / 10.0
+                df['valor'] = pd.to_numeric(df['Total'], errors='coerce')
                 df['valor'] = df['valor'].round(3)
                 df = df.drop(columns=['Total'])
             else:
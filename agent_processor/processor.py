@@ -9,7 +9,7 @@ from typing import Dict, List, Optional, Any
 import json
 from datetime import datetime
 
-from .etl import Extractor, Transformer, Loader
+from .etl import Extractor, Transformer, Loader, SchemaProfiles
 from .validators import BusinessValidator, DataQualityValidator
 
 logger = logging.getLogger(__name__)
@@ -22,18 +22,25 @@ class ProcessorETCL:
     
     REQUIRED_TABLES = ['6042', '6043', '6044', '6045', '6046', '6063']
     
-    def __init__(self, config_path: Optional[Path] = None):
+    def __init__(self, config_path: Optional[Path] = None, parse_engine: str = 'c', use_cache: bool = True,
+                 jobs: int = 1):
         """
         Inicializa el procesador con configuración
         
         Args:
             config_path: Ruta al archivo de configuración (opcional)
+            parse_engine: Motor de parseo de los CSVs ('c', 'pyarrow' o 'duckdb')
+            use_cache: Si False, se parsean siempre los CSVs sin usar la caché Parquet
+            jobs: Procesos para extraer las tablas en paralelo (1 = en serie)
         """
         self.base_dir = Path(__file__).parent.parent
         self.data_dir = self.base_dir / "data"
         self.raw_dir = self.data_dir / "raw" / "csv"
         self.processed_dir = self.data_dir / "processed"
         self.db_path = self.data_dir / "analysis.db"
+        if jobs < 1:
+            raise ValueError(f"El número de procesos debe ser al menos 1: {jobs}")
+        self.jobs = jobs
         
         # Crear directorio de procesados si no existe
         self.processed_dir.mkdir(parents=True, exist_ok=True)
@@ -41,9 +48,15 @@ class ProcessorETCL:
         # Cargar configuración
         self.config = self._load_config(config_path)
         
-        # Inicializar componentes
-        self.extractor = Extractor(self.raw_dir, self.config)
-        self.transformer = Transformer(self.config)
+        # Inicializar componentes (extractor y transformador comparten los perfiles de esquema)
+        self.schema_profiles = SchemaProfiles(
+            self.config.get('mappings', {}), self.data_dir / "cache" / "schema_profiles.json"
+        )
+        self.extractor = Extractor(
+            self.raw_dir, self.config, engine=parse_engine, use_cache=use_cache,
+            cache_dir=self.data_dir / "cache" / "extractor", profiles=self.schema_profiles
+        )
+        self.transformer = Transformer(self.config, profiles=self.schema_profiles)
         self.loader = Loader(self.db_path)
         self.business_validator = BusinessValidator()
         self.quality_validator = DataQualityValidator()
@@ -102,10 +115,19 @@ class ProcessorETCL:
             # 1. EXTRACCIÓN
             logger.info("FASE 1: Extracción de datos")
             raw_data = {}
+            handles, extraction_errors = {}, {}
+            if self.jobs > 1:
+                # Cada proceso deja su tabla en la caché Parquet; aquí solo se leen
+                handles, extraction_errors = self.extractor.extract_parallel(self.REQUIRED_TABLES, self.jobs)
             for table_id in self.REQUIRED_TABLES:
                 logger.info(f"Extrayendo tabla {table_id}")
                 try:
-                    df = self.extractor.extract_table(table_id, test_mode=test_mode)
+                    if table_id in extraction_errors:
+                        raise RuntimeError(extraction_errors[table_id])
+                    if table_id in handles:
+                        df = self.extractor.from_handle(table_id, handles[table_id], test_mode=test_mode)
+                    else:
+                        df = self.extractor.extract_table(table_id, test_mode=test_mode)
                     raw_data[table_id] = df
                     logger.info(f"Tabla {table_id}: {len(df)} registros extraídos")
                 except Exception as e:
@@ -165,13 +187,19 @@ class ProcessorETCL:
         
         return stats
     
-    def process_table(self, table_id: str, test_mode: bool = False) -> Dict[str, Any]:
+    def process_table(self, table_id: str, test_mode: bool = False, periods: Optional[List[str]] = None,
+                      since: Optional[str] = None) -> Dict[str, Any]:
         """
         Procesa una tabla individual
         
+        Con `periods` o `since` solo se leen, transforman y añaden esos períodos
+        (actualización trimestral incremental)
+        
         Args:
             table_id: ID de la tabla a procesar (ej: '6042')
             test_mode: Si True, procesa solo un período para testing
+            periods: Si se indica, solo estos períodos (ej: ['2024T4'])
+            since: Si se indica, solo este período y los posteriores
             
         Returns:
             Diccionario con estadísticas del procesamiento
@@ -188,9 +216,17 @@ class ProcessorETCL:
         
         try:
             # Extraer
-            df = self.extractor.extract_table(table_id, test_mode=test_mode)
+            df = self.extractor.extract_table(table_id, test_mode=test_mode, periods=periods, since=since)
             stats['registros_extraidos'] = len(df)
             
+            if df.empty:
+                # Actualización incremental sin períodos nuevos: nada que cargar
+                logger.info(f"Tabla {table_id}: sin registros en los períodos pedidos")
+                stats['fin'] = datetime.now()
+                stats['duracion'] = str(stats['fin'] - stats['inicio'])
+                stats['exitoso'] = True
+                return stats
+            
             # Transformar
             transformed = self.transformer.transform_table(table_id, df)
             stats['registros_transformados'] = len(transformed)
@@ -239,8 +275,8 @@ class ProcessorETCL:
         # Verificar qué tablas están disponibles
         available_tables = []
         for table_id in self.REQUIRED_TABLES:
-            csv_pattern = f"{table_id}_*.csv"
-            csv_files = list(self.raw_dir.glob(csv_pattern))
+            csv_files = [f for suffix in Extractor.RAW_SUFFIXES
+                         for f in self.raw_dir.glob(f"{table_id}_*{suffix}")]
             if csv_files:
                 available_tables.append({
                     'id': table_id,
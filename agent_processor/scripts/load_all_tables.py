@@ -1,8 +1,10 @@
 """
 Script para cargar todas las tablas ETCL requeridas a DuckDB
 Procesa las 6 tablas necesarias: 6042, 6043, 6044, 6045, 6046, 6063
+Con --all re-extrae a la caché Parquet todas las tablas de config/tables.json
 """
 
+import argparse
 import sys
 import pandas as pd
 from pathlib import Path
@@ -25,16 +27,21 @@ sys.path.append(str(Path(__file__).resolve().parents[2]))
 from agent_processor.etl.extractor import Extractor
 from agent_processor.etl.transformer import Transformer
 from agent_processor.etl.loader import Loader
+from agent_processor.etl.schema_profile import SchemaProfiles
 
 # Tablas requeridas según diseño validado
 REQUIRED_TABLES = ['6042', '6043', '6044', '6045', '6046', '6063']
 
-def load_all_tables(test_mode=False):
+def load_all_tables(test_mode=False, parse_engine='c', use_cache=True, jobs=1, auto_confirm=False):
     """
     Carga todas las tablas ETCL requeridas a DuckDB
     
     Args:
         test_mode: Si True, procesa solo datos recientes para pruebas
+        parse_engine: Motor de parseo de los CSVs ('c', 'pyarrow' o 'duckdb')
+        use_cache: Si False, se parsean siempre los CSVs sin usar la caché Parquet
+        jobs: Procesos para extraer las tablas en paralelo (1 = en serie)
+        auto_confirm: Si True, limpia los datos existentes sin preguntar
     """
     print("\n" + "="*80)
     print("CARGA COMPLETA DE TABLAS ETCL A DUCKDB")
@@ -61,8 +68,9 @@ def load_all_tables(test_mode=False):
             config = {'mappings': json.load(f)}
         
         # Inicializar componentes
-        extractor = Extractor(raw_dir, config)
-        transformer = Transformer(config)
+        profiles = SchemaProfiles(config['mappings'], repo_root / "data" / "cache" / "schema_profiles.json")
+        extractor = Extractor(raw_dir, config, engine=parse_engine, use_cache=use_cache, profiles=profiles)
+        transformer = Transformer(config, profiles=profiles)
         loader = Loader(db_path)
         
         # Conectar a la base de datos
@@ -74,7 +82,7 @@ def load_all_tables(test_mode=False):
         
         # Limpiar datos existentes (soporta --yes para auto-confirmar)
         if not test_mode:
-            if any(arg in ("--yes", "-y") for arg in sys.argv[1:]):
+            if auto_confirm:
                 loader.conn.execute(f"DELETE FROM {loader.table_name}")
                 print("Tabla limpiada (auto).")
             else:
@@ -86,6 +94,12 @@ def load_all_tables(test_mode=False):
         print("\nIniciando carga de tablas...")
         print("-" * 40)
         
+        # Con --jobs N las tablas se parsean antes en paralelo a la caché Parquet
+        handles, extraction_errors = {}, {}
+        if jobs > 1:
+            print(f"Extrayendo {len(REQUIRED_TABLES)} tablas con {jobs} procesos...")
+            handles, extraction_errors = extractor.extract_parallel(REQUIRED_TABLES, jobs)
+        
         # Procesar cada tabla
         all_transformed_data = []
         
@@ -95,7 +109,12 @@ def load_all_tables(test_mode=False):
             try:
                 # Extraer datos
                 print(f"  Extrayendo datos...")
-                df_raw = extractor.extract_table(table_id, test_mode=test_mode)
+                if table_id in extraction_errors:
+                    raise RuntimeError(extraction_errors[table_id])
+                if table_id in handles:
+                    df_raw = extractor.from_handle(table_id, handles[table_id], test_mode=test_mode)
+                else:
+                    df_raw = extractor.extract_table(table_id, test_mode=test_mode)
                 registros_extraidos = len(df_raw)
                 print(f"  [OK] {registros_extraidos} registros extraídos")
                 
@@ -281,9 +300,95 @@ def load_all_tables(test_mode=False):
         traceback.print_exc()
         return False
 
+def materialize_all_tables(parse_engine='c', use_cache=True, jobs=1):
+    """
+    Re-extrae a la caché Parquet todas las tablas de config/tables.json
+    (las 35, no solo las que se cargan a DuckDB), en paralelo con jobs > 1
+    
+    Args:
+        parse_engine: Motor de parseo de los CSVs ('c', 'pyarrow' o 'duckdb')
+        use_cache: Debe ser True: el resultado de la extracción es la caché
+        jobs: Procesos para extraer las tablas en paralelo (1 = en serie)
+    """
+    print("\n" + "="*80)
+    print("RE-EXTRACCIÓN DE TODAS LAS TABLAS A LA CACHÉ PARQUET")
+    print("="*80 + "\n")
+    
+    if not use_cache:
+        print("[ERROR] --all guarda las tablas en la caché Parquet; no se puede combinar con --no-cache")
+        return False
+    
+    repo_root = Path(__file__).resolve().parents[2]
+    with open(repo_root / "config" / "tables.json", 'r', encoding='utf-8') as f:
+        table_ids = [codigo for info in json.load(f)['categorias'].values() for codigo in info['tablas']]
+    with open(repo_root / "agent_processor" / "config" / "mappings.json", 'r', encoding='utf-8') as f:
+        config = {'mappings': json.load(f)}
+    
+    extractor = Extractor(repo_root / "data" / "raw" / "csv", config, engine=parse_engine)
+    if not extractor.use_cache:
+        print("[ERROR] La caché Parquet requiere pyarrow")
+        return False
+    
+    inicio = datetime.now()
+    print(f"Extrayendo {len(table_ids)} tablas con {jobs} proceso(s)...")
+    if jobs > 1:
+        handles, errores = extractor.extract_parallel(table_ids, jobs)
+    else:
+        handles, errores = {}, {}
+        for table_id in table_ids:
+            try:
+                handles[table_id] = extractor.materialize(table_id)
+            except Exception as e:
+                logger.error(f"Error extrayendo tabla {table_id}: {str(e)}")
+                errores[table_id] = str(e)
+    
+    for table_id in table_ids:
+        if table_id in handles:
+            print(f"  [OK] {table_id}: {handles[table_id][0].name}")
+        else:
+            print(f"  [ERROR] {table_id}: {errores.get(table_id)}")
+    
+    print(f"\n{len(handles)}/{len(table_ids)} tablas en la caché ({datetime.now() - inicio})")
+    return not errores
+
+def positive_int(value):
+    """Entero >= 1 para argparse (número de procesos)"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' no es un número entero")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"debe ser al menos 1 (recibido {number})")
+    return number
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Carga las tablas ETCL requeridas a DuckDB')
+    parser.add_argument('-y', '--yes', action='store_true',
+                        help='Carga completa sin preguntas (limpia los datos existentes)')
+    motor = parser.add_mutually_exclusive_group()
+    motor.add_argument('--pyarrow', dest='parse_engine', action='store_const', const='pyarrow', default='c',
+                       help="Parsear los CSVs con el motor 'pyarrow'")
+    motor.add_argument('--duckdb', dest='parse_engine', action='store_const', const='duckdb',
+                       help="Parsear los CSVs con el motor 'duckdb'")
+    parser.add_argument('--no-cache', dest='use_cache', action='store_false',
+                        help='Parsear siempre los CSVs sin usar la caché Parquet')
+    parser.add_argument('--jobs', type=positive_int, default=1, metavar='N',
+                        help='Procesos para extraer las tablas en paralelo (1 = en serie)')
+    parser.add_argument('--all', dest='all_tables', action='store_true',
+                        help='Re-extraer a la caché Parquet todas las tablas de config/tables.json (sin cargar a DuckDB)')
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
+    args = parse_args()
+    
+    if args.all_tables:
+        success = materialize_all_tables(parse_engine=args.parse_engine, use_cache=args.use_cache, jobs=args.jobs)
+        sys.exit(0 if success else 1)
+    
     # Modo no interactivo si se pasa --yes/-y
-    if any(arg in ("--yes", "-y") for arg in sys.argv[1:]):
+    if args.yes:
         test_mode = False
         print("\nModo completo (auto) - se cargarán todos los datos históricos")
     else:
@@ -301,7 +406,6 @@ if __name__ == "__main__":
         else:
             print("\nModo completo - se cargarán todos los datos históricos")
     
-    success = load_all_tables(test_mode=test_mode)
+    success = load_all_tables(test_mode=test_mode, parse_engine=args.parse_engine, use_cache=args.use_cache,
+                              jobs=args.jobs, auto_confirm=args.yes)
     sys.exit(0 if success else 1)
-
-
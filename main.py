@@ -23,6 +23,7 @@ Ejemplos de uso:
   python main.py --download-all       # Descargar todas las tablas
   python main.py --download 6042      # Descargar tabla específica
   python main.py --info 6042          # Ver información de una tabla
+  python main.py --check-scheduled    # Verificar solo lo que toca según el calendario (cron)
         """
     )
     
@@ -41,12 +42,33 @@ Ejemplos de uso:
     parser.add_argument('--check-smart', action='store_true',
                       help='Verificar actualizaciones usando metadata local (más rápido)')
     
+    parser.add_argument('--check-scheduled', action='store_true',
+                      help='Verificar solo las tablas en su ventana de publicación esperada (para cron)')
+    
+    parser.add_argument('--next-check', action='store_true',
+                      help='Mostrar la próxima verificación planificada por tabla')
+    
+    parser.add_argument('--daemon', action='store_true',
+                      help='Verificar en bucle según el calendario de publicación')
+    
+    parser.add_argument('--auto-update', action='store_true',
+                      help='Con --daemon, descargar las tablas con nuevos períodos')
+    
     parser.add_argument('--update', type=str, metavar='CODIGO',
                       help='Actualizar una tabla específica si hay nuevos datos')
     
     parser.add_argument('--update-all', action='store_true',
                       help='Actualizar todas las tablas con nuevos datos disponibles')
     
+    parser.add_argument('--restore', type=str, metavar='CODIGO',
+                      help='Restaurar una tabla desde los backups')
+    
+    parser.add_argument('--restore-version', type=int, metavar='N',
+                      help='Versión a restaurar con --restore (por defecto la última respaldada)')
+    
+    parser.add_argument('--concurrencia', type=int, metavar='N',
+                      help='Peticiones simultáneas para --download-all, --check-smart y --check-scheduled (1 = secuencial)')
+    
     parser.add_argument('--quiet', action='store_true',
                       help='Modo silencioso, menos output')
     
@@ -89,7 +111,7 @@ Ejemplos de uso:
     # Descargar todas las tablas
     elif args.download_all:
         print("Iniciando descarga de todas las tablas...")
-        resultado = extractor.download_all(verbose=not args.quiet)
+        resultado = extractor.download_all(verbose=not args.quiet, concurrencia=args.concurrencia)
         
         if not args.quiet:
             print(f"\n✅ Descarga completada:")
@@ -102,7 +124,9 @@ Ejemplos de uso:
         print(f"Descargando tabla {codigo}...")
         resultado = extractor.download_table(codigo)
         
-        if resultado['exitoso']:
+        if resultado.get('sin_cambios'):
+            print(f"[OK] Tabla {codigo} sin cambios desde la última descarga")
+        elif resultado['exitoso']:
             print(f"[OK] Tabla {codigo} descargada exitosamente")
             print(f"  • Tamaño: {resultado['tamaño_kb']:.1f} KB")
             print(f"  • Encoding: {resultado['encoding_usado']}")
@@ -119,11 +143,12 @@ Ejemplos de uso:
             print(f"\n[INFO] Información de tabla {codigo}:")
             print(f"  • Nombre: {info['nombre']}")
             print(f"  • Categoría: {info['categoria']}")
-            print(f"  • Datos disponibles: {info['datos_disponibles']}")
+            print(f"  • Series disponibles: {info['datos_disponibles']}")
             
             if info['periodo_info']['ultimo_periodo']:
                 print(f"  • Último periodo: {info['periodo_info']['ultimo_periodo']}")
-                print(f"  • Total periodos: {info['periodo_info']['total_periodos']}")
+                if info['periodo_info'].get('total_periodos'):
+                    print(f"  • Total periodos: {info['periodo_info']['total_periodos']}")
             
             print(f"\nURLs:")
             print(f"  • CSV: {info['url_csv']}")
@@ -134,7 +159,7 @@ Ejemplos de uso:
     # Verificación inteligente de actualizaciones
     elif args.check_smart:
         print("Verificando actualizaciones (modo inteligente)...")
-        resultado = extractor.check_updates_smart()
+        resultado = extractor.check_updates_smart(concurrency=args.concurrencia)
         
         print(f"\n[RESUMEN]")
         print(f"  • Total tablas verificadas: {resultado['total_tablas']}")
@@ -146,6 +171,40 @@ Ejemplos de uso:
                 if tabla['necesita_actualizacion']:
                     print(f"  • {tabla['codigo']}: {tabla['mensaje']}")
     
+    # Verificación planificada (solo tablas en su ventana de publicación)
+    elif args.check_scheduled:
+        print("Verificando actualizaciones (modo planificado)...")
+        resultado = extractor.check_updates_scheduled(concurrency=args.concurrencia)
+        
+        print(f"\n[RESUMEN]")
+        print(f"  • Tablas consultadas: {resultado['tablas_verificadas']}/{resultado['total_tablas']}")
+        print(f"  • Actualizaciones disponibles: {resultado['actualizaciones_disponibles']}")
+        print(f"  • Próxima verificación: {resultado['proxima_verificacion']}")
+        
+        if resultado['actualizaciones_disponibles'] > 0:
+            print(f"\n[TABLAS CON ACTUALIZACIONES]")
+            for tabla in resultado['tablas']:
+                if tabla['necesita_actualizacion']:
+                    print(f"  • {tabla['codigo']}: {tabla['mensaje']}")
+    
+    # Plan de verificaciones
+    elif args.next_check:
+        plan = extractor.get_check_plan()
+        print(f"{'Tabla':<7} {'Próxima verificación':<20} {'Período':<9} {'Ventana de publicación'}")
+        print("-" * 70)
+        for entrada in plan:
+            ventana = 'n/d'
+            if entrada['ventana_inicio']:
+                ventana = f"{entrada['ventana_inicio'][:10]} → {entrada['ventana_fin'][:10]}"
+            pendiente = ' (pendiente de descarga)' if entrada['pendiente'] else ''
+            print(f"{entrada['codigo']:<7} {entrada['proxima_verificacion'][:19]:<20} "
+                  f"{entrada['periodo_esperado'] or 'n/d':<9} {ventana}{pendiente}")
+    
+    # Modo demonio
+    elif args.daemon:
+        print("Iniciando verificación planificada en bucle (Ctrl+C para salir)...")
+        extractor.run_scheduler(actualizar=args.auto_update, concurrency=args.concurrencia)
+    
     # Actualizar tabla específica
     elif args.update:
         codigo = args.update
@@ -168,6 +227,20 @@ Ejemplos de uso:
         print(f"  • Tablas actualizadas: {resultado['tablas_actualizadas']}")
         print(f"  • Errores: {resultado['errores']}")
     
+    # Restaurar tabla desde backup
+    elif args.restore:
+        codigo = args.restore
+        try:
+            metadata = extractor.restore_table(codigo, version=args.restore_version)
+            if metadata is None:
+                print(f"[ERROR] Archivo de la tabla {codigo} restaurado, pero no se pudo guardar su metadata")
+            else:
+                print(f"[OK] Tabla {codigo} restaurada a la versión {metadata['restaurado_de_version']}")
+                print(f"  • Archivo: {metadata['archivo']}")
+                print(f"  • Último período: {metadata.get('ultimo_periodo', 'N/A')}")
+        except KeyError as e:
+            print(f"[ERROR] {e.args[0]}")
+    
     print(f"\n{'='*60}\n")
 
 if __name__ == '__main__':
@@ -0,0 +1,66 @@
+"""
+Benchmark offline de UpdateManager.check_all_updates
+Compara la verificación secuencial (requests) con la asíncrona (httpx) contra
+un stand-in local del INE
+
+Uso:
+    python scripts/bench_check_updates.py --latencia 0.1 --concurrencia 8
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from agent_extractor.updater import UpdateManager
+from ine_mock_server import INEMockServer
+
+
+def preparar_updater(server, tmp_dir):
+    """UpdateManager apuntando al servidor local y con metadata vacía"""
+    updater = UpdateManager()
+    updater.config = server.config_local(updater.config)
+    updater.metadata_manager.metadata_dir = tmp_dir / 'metadata'
+    updater.metadata_manager.metadata_dir.mkdir(parents=True, exist_ok=True)
+    return updater
+
+
+def ejecutar(server, concurrencia):
+    with tempfile.TemporaryDirectory() as tmp:
+        updater = preparar_updater(server, Path(tmp))
+        peticiones_antes = server.peticiones
+        inicio = time.perf_counter()
+        resultados = updater.check_all_updates(verbose=False, concurrency=concurrencia)
+        tiempo = time.perf_counter() - inicio
+    return {
+        'tiempo': tiempo,
+        'tablas': resultados['total_tablas'],
+        'con_periodo': sum(1 for t in resultados['tablas'] if t.get('periodo_remoto')),
+        'peticiones': server.peticiones - peticiones_antes
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de verificación de actualizaciones')
+    parser.add_argument('--latencia', type=float, default=0.1, help='Latencia simulada por petición (s)')
+    parser.add_argument('--concurrencia', type=int, default=8, help='Verificaciones simultáneas')
+    args = parser.parse_args()
+
+    with INEMockServer(latencia=args.latencia) as server:
+        secuencial = ejecutar(server, 1)
+        asincrono = ejecutar(server, args.concurrencia)
+
+    print(f"{'Modo':<20} {'Tiempo (s)':>10} {'Tablas':>7} {'Con periodo':>12} {'Peticiones':>11}")
+    print('-' * 64)
+    for nombre, r in (('secuencial', secuencial), (f"asíncrono (x{args.concurrencia})", asincrono)):
+        print(f"{nombre:<20} {r['tiempo']:>10.2f} {r['tablas']:>7} {r['con_periodo']:>12} {r['peticiones']:>11}")
+    print('-' * 64)
+    print(f"Speedup: {secuencial['tiempo'] / asincrono['tiempo']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
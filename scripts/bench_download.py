@@ -0,0 +1,80 @@
+"""
+Benchmark offline de Downloader.download_all_tables
+Compara la descarga secuencial con la concurrente contra un stand-in local del INE,
+y una segunda pasada sin cambios (revalidación condicional ETag/Last-Modified)
+
+Uso:
+    python scripts/bench_download.py --latencia 0.2 --concurrencia 4 --rps 20
+"""
+
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from agent_extractor.downloader import Downloader
+from ine_mock_server import INEMockServer
+
+
+def preparar_downloader(server, tmp_dir, rps, rafaga):
+    """Downloader apuntando al servidor local y a un directorio temporal"""
+    downloader = Downloader()
+    downloader.config = server.config_local(downloader.config)
+    downloader.config['configuracion_descarga']['peticiones_por_segundo'] = rps
+    downloader.config['configuracion_descarga']['rafaga_maxima'] = rafaga
+    downloader.rate_limiter = downloader._create_rate_limiter()
+    downloader.data_path = tmp_dir / 'raw'
+    downloader.metadata_manager.base_path = tmp_dir
+    downloader.metadata_manager.metadata_dir = tmp_dir / 'metadata'
+    downloader.metadata_manager.metadata_dir.mkdir(parents=True, exist_ok=True)
+    return downloader
+
+
+def ejecutar(server, tmp_dir, concurrencia, rps, rafaga):
+    downloader = preparar_downloader(server, tmp_dir, rps, rafaga)
+    peticiones_antes = server.peticiones
+    bytes_antes = server.bytes_enviados
+    resultados = downloader.download_all_tables(verbose=False, concurrencia=concurrencia)
+    return {
+        'tiempo': resultados['tiempo_total'],
+        'exitosas': len(resultados['exitosas']),
+        'fallidas': len(resultados['fallidas']),
+        'peticiones': server.peticiones - peticiones_antes,
+        'kb': (server.bytes_enviados - bytes_antes) / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de descarga concurrente')
+    parser.add_argument('--latencia', type=float, default=0.2, help='Latencia simulada por petición (s)')
+    parser.add_argument('--concurrencia', type=int, default=4, help='Descargas simultáneas')
+    parser.add_argument('--rps', type=float, default=20, help='Peticiones por segundo por host')
+    parser.add_argument('--rafaga', type=int, default=4, help='Ráfaga máxima del token bucket')
+    args = parser.parse_args()
+
+    with INEMockServer(latencia=args.latencia) as server, \
+            tempfile.TemporaryDirectory() as tmp_sec, tempfile.TemporaryDirectory() as tmp_conc:
+        secuencial = ejecutar(server, Path(tmp_sec), 1, args.rps, args.rafaga)
+        concurrente = ejecutar(server, Path(tmp_conc), args.concurrencia, args.rps, args.rafaga)
+        # Misma carpeta: la metadata ya tiene ETag/Last-Modified
+        revalidacion = ejecutar(server, Path(tmp_conc), args.concurrencia, args.rps, args.rafaga)
+
+    filas = (
+        ('secuencial', secuencial),
+        (f"concurrente (x{args.concurrencia})", concurrente),
+        ('revalidación (304)', revalidacion),
+    )
+    print(f"{'Modo':<22} {'Tiempo (s)':>10} {'OK':>5} {'Fallos':>7} {'Peticiones':>11} {'KB':>10}")
+    print('-' * 69)
+    for nombre, r in filas:
+        print(f"{nombre:<22} {r['tiempo']:>10.2f} {r['exitosas']:>5} {r['fallidas']:>7} "
+              f"{r['peticiones']:>11} {r['kb']:>10.1f}")
+    print('-' * 69)
+    print(f"Speedup: {secuencial['tiempo'] / concurrente['tiempo']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark de la ingesta nativa en DuckDB (motor 'duckdb' del Extractor del ETL)
+Compara, sobre las tablas que usa el procesador, cargar cada tabla cruda en la
+base de datos del Loader (un analysis.db temporal) pasando por pandas (read_csv
+de pandas + conn.register + CREATE TABLE) con Loader.stage_raw_table (read_csv
+de DuckDB sobre la misma conexión, sin objetos Python), y comprueba que las
+tablas resultantes son idénticas. También mide extract_table con los motores
+'c' y 'duckdb', que devuelven el mismo DataFrame
+
+Uso:
+    python scripts/bench_duckdb_ingest.py --filas-por-periodo 2000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from agent_processor.etl.extractor import Extractor, duckdb
+from agent_processor.etl.loader import Loader
+from agent_processor.processor import ProcessorETCL
+from ine_mock_server import generar_csv
+
+
+def escribir_csvs(csv_dir, tablas, filas_por_periodo):
+    """CSVs sintéticos con la forma de los del INE (con decimales, miles y '..')"""
+    for tabla in tablas:
+        lineas = generar_csv(tabla, filas_por_periodo).decode('utf-8').splitlines()
+        for i in range(1, len(lineas)):
+            if i % 97 == 0:
+                lineas[i] = lineas[i].rsplit(';', 1)[0] + ';..'
+            elif i % 13 == 0:
+                lineas[i] = lineas[i].rsplit(';', 1)[0] + ';1.234,5'
+        (csv_dir / f"{tabla}_bench.csv").write_text('\n'.join(lineas) + '\n', encoding='utf-8')
+
+
+def via_pandas(extractor, conn, tabla):
+    df = extractor.extract_table(tabla).drop(columns=['fuente_tabla', 'tabla_nombre'])
+    conn.register('df_temp', df)
+    conn.execute(f"CREATE OR REPLACE TABLE raw_{tabla}_pandas AS SELECT * FROM df_temp")
+    conn.unregister('df_temp')
+
+
+def via_duckdb(extractor, loader, tabla):
+    loader.stage_raw_table(extractor, tabla)
+
+
+def mejor_tiempo(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de la ingesta nativa en DuckDB del ETL')
+    parser.add_argument('--filas-por-periodo', type=int, default=1000, help='Filas por período en cada CSV')
+    parser.add_argument('--repeticiones', type=int, default=3, help='Repeticiones por medida (se toma la mejor)')
+    args = parser.parse_args()
+
+    if duckdb is None:
+        sys.exit("duckdb no está instalado")
+
+    logging.disable(logging.WARNING)
+    tablas = ProcessorETCL.REQUIRED_TABLES
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_dir = Path(tmp)
+        escribir_csvs(csv_dir, tablas, args.filas_por_periodo)
+        pandas_extractor = Extractor(csv_dir, {}, use_cache=False)
+        duckdb_extractor = Extractor(csv_dir, {}, engine='duckdb', use_cache=False)
+
+        with Loader(csv_dir / 'analysis.db') as loader:
+            conn = loader.conn
+            hilos = conn.execute("SELECT current_setting('threads')").fetchone()[0]
+            print(f"DuckDB con {hilos} hilos ({os.cpu_count()} CPUs)\n")
+            print("Carga de la tabla cruda en analysis.db")
+            print(f"{'Tabla':<7} {'Filas':>9} {'Vía pandas (ms)':>16} {'stage_raw_table (ms)':>21} {'Ahorro':>7}")
+            print('-' * 64)
+            total_pandas = total_duckdb = 0.0
+            for tabla in tablas:
+                t_pandas = mejor_tiempo(lambda: via_pandas(pandas_extractor, conn, tabla), args.repeticiones)
+                t_duckdb = mejor_tiempo(lambda: via_duckdb(duckdb_extractor, loader, tabla), args.repeticiones)
+
+                # Mismas filas por las dos vías
+                diferencias = conn.execute(
+                    f"SELECT count(*) FROM (SELECT * FROM raw_{tabla}_pandas EXCEPT ALL SELECT * FROM raw_{tabla})"
+                ).fetchone()[0]
+                assert diferencias == 0, f"{tabla}: {diferencias} filas distintas"
+
+                filas = conn.execute(f"SELECT count(*) FROM raw_{tabla}").fetchone()[0]
+                total_pandas += t_pandas
+                total_duckdb += t_duckdb
+                print(f"{tabla:<7} {filas:>9} {t_pandas * 1000:>16.1f} {t_duckdb * 1000:>21.1f} {t_pandas / t_duckdb:>6.1f}x")
+
+            print('-' * 64)
+            print(f"{'Total':<7} {'':>9} {total_pandas * 1000:>16.1f} {total_duckdb * 1000:>21.1f} "
+                  f"{total_pandas / total_duckdb:>6.1f}x")
+
+        print("\nextract_table (DataFrame para el Transformer)")
+        print(f"{'Tabla':<7} {'Motor c (ms)':>13} {'Motor duckdb (ms)':>18} {'Ahorro':>7}")
+        print('-' * 48)
+        total_c = total_motor = 0.0
+        for tabla in tablas:
+            pd.testing.assert_frame_equal(pandas_extractor.extract_table(tabla), duckdb_extractor.extract_table(tabla))
+            t_c = mejor_tiempo(lambda: pandas_extractor.extract_table(tabla), args.repeticiones)
+            t_motor = mejor_tiempo(lambda: duckdb_extractor.extract_table(tabla), args.repeticiones)
+            total_c += t_c
+            total_motor += t_motor
+            print(f"{tabla:<7} {t_c * 1000:>13.1f} {t_motor * 1000:>18.1f} {t_c / t_motor:>6.1f}x")
+        print('-' * 48)
+        print(f"{'Total':<7} {total_c * 1000:>13.1f} {total_motor * 1000:>18.1f} {total_c / total_motor:>6.1f}x")
+        print("Tablas en analysis.db y extracción a pandas idénticas a las del motor 'c'")
+
+if __name__ == '__main__':
+    main()
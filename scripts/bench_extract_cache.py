@@ -0,0 +1,79 @@
+"""
+Benchmark de la caché Parquet del Extractor del ETL
+Compara, sobre las tablas que usa el procesador, el parseo de los CSVs con la
+lectura de la caché Parquet y comprueba que ambos dan el mismo DataFrame
+
+Uso:
+    python scripts/bench_extract_cache.py --filas-por-periodo 1000 --motor pyarrow
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from agent_processor.etl.extractor import Extractor, pa
+from agent_processor.processor import ProcessorETCL
+from ine_mock_server import generar_csv
+
+
+def mejor_tiempo(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de la caché Parquet del ETL')
+    parser.add_argument('--filas-por-periodo', type=int, default=500, help='Filas por período en cada CSV')
+    parser.add_argument('--motor', choices=Extractor.ENGINES, default='c', help='Motor de parseo')
+    parser.add_argument('--repeticiones', type=int, default=3, help='Repeticiones por medida (se toma la mejor)')
+    args = parser.parse_args()
+
+    if pa is None:
+        sys.exit("pyarrow no está instalado")
+
+    logging.disable(logging.WARNING)
+    tablas = ProcessorETCL.REQUIRED_TABLES
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_dir = Path(tmp) / 'raw'
+        csv_dir.mkdir()
+        for tabla in tablas:
+            (csv_dir / f"{tabla}_bench.csv").write_bytes(generar_csv(tabla, args.filas_por_periodo))
+
+        sin_cache = Extractor(csv_dir, {}, engine=args.motor, use_cache=False)
+        con_cache = Extractor(csv_dir, {}, engine=args.motor, cache_dir=Path(tmp) / 'cache')
+
+        print(f"{'Tabla':<7} {'Filas':>9} {'CSV (ms)':>10} {'Caché (ms)':>11} {'Ahorro':>7} {'Parquet KB':>11}")
+        print('-' * 60)
+        total_csv = total_cache = 0.0
+        for tabla in tablas:
+            t_csv, df_csv = mejor_tiempo(lambda: sin_cache.extract_table(tabla), args.repeticiones)
+            con_cache.extract_table(tabla)  # crea la caché
+            t_cache, df_cache = mejor_tiempo(lambda: con_cache.extract_table(tabla), args.repeticiones)
+            pd.testing.assert_frame_equal(df_csv, df_cache)
+
+            total_csv += t_csv
+            total_cache += t_cache
+            tamaño = con_cache._cache_path(tabla).stat().st_size / 1024
+            print(f"{tabla:<7} {len(df_csv):>9} {t_csv * 1000:>10.1f} {t_cache * 1000:>11.1f} "
+                  f"{t_csv / t_cache:>6.1f}x {tamaño:>11.1f}")
+
+        print('-' * 60)
+        print(f"{'Total':<7} {'':>9} {total_csv * 1000:>10.1f} {total_cache * 1000:>11.1f} {total_csv / total_cache:>6.1f}x")
+        print("La lectura de caché incluye el SHA-256 del CSV que valida la clave")
+
+
+if __name__ == '__main__':
+    main()
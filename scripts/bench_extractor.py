@@ -0,0 +1,209 @@
+"""
+Suite de benchmarks offline de agent_extractor contra el stand-in local del INE
+
+Mide tiempo, peticiones, bytes servidos y pico de RSS de:
+    download    Downloader.download_all_tables   (python main.py --download-all)
+    check-smart UpdateManager.check_all_updates   (python main.py --check-smart)
+    check       INEScraper.check_updates          (python main.py --check)
+    check-scheduled UpdateManager.check_scheduled_updates (python main.py --check-scheduled)
+
+Cada escenario corre en un subproceso propio, así el pico de RSS es solo el del
+cliente (el servidor vive en el proceso principal). Los escenarios comparten el
+directorio de datos: check-smart y check ven la metadata que deja download.
+Un escenario puede repetirse; repetir check-scheduled muestra el coste de una
+ejecución rutinaria de cron con el estado del planificador ya guardado.
+
+Uso:
+    python scripts/bench_extractor.py --latencia 0.05 --tasa-errores 0.05
+    python scripts/bench_extractor.py --escenarios download --tasa-cortes 0.3 [--sin-reanudar]
+    python scripts/bench_extractor.py --escenarios download check-scheduled check-scheduled
+    python scripts/bench_extractor.py --json resultados.json    # para CI
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows: sin pico de RSS
+    resource = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from ine_mock_server import INEMockServer, reescribir_urls
+
+ESCENARIOS = ('download', 'check-smart', 'check', 'check-scheduled')
+PREFIJO_RESULTADO = 'RESULTADO '
+
+
+def pico_rss_mb():
+    """Pico de RSS del proceso actual en MB (None si no se puede medir)"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa en KB, macOS en bytes
+    return pico / 1024 / 1024 if sys.platform == 'darwin' else pico / 1024
+
+
+def ajustar_descarga(config, args):
+    """Aplica al bloque configuracion_descarga los ajustes del benchmark"""
+    descarga = config['configuracion_descarga']
+    descarga['delay_entre_reintentos'] = args.delay_reintentos
+    descarga['reanudar_descargas'] = not args.sin_reanudar
+    if args.rps is not None:
+        descarga['peticiones_por_segundo'] = args.rps
+    return config
+
+
+def escenario_download(args, tmp_dir):
+    from agent_extractor.downloader import Downloader
+
+    downloader = Downloader()
+    downloader.config = ajustar_descarga(reescribir_urls(downloader.config, args.base_url), args)
+    downloader.rate_limiter = downloader._create_rate_limiter()
+    downloader.data_path = tmp_dir / 'raw'
+    downloader.metadata_manager.base_path = tmp_dir
+    downloader.metadata_manager.metadata_dir = tmp_dir / 'metadata'
+    downloader.metadata_manager.metadata_dir.mkdir(parents=True, exist_ok=True)
+    resultados = downloader.download_all_tables(verbose=False, concurrencia=args.concurrencia)
+    return {'ok': len(resultados['exitosas']), 'fallos': len(resultados['fallidas'])}
+
+
+def escenario_check_smart(args, tmp_dir):
+    from agent_extractor.updater import UpdateManager
+
+    updater = UpdateManager()
+    updater.config = ajustar_descarga(reescribir_urls(updater.config, args.base_url), args)
+    updater.metadata_manager.base_path = tmp_dir
+    updater.metadata_manager.metadata_dir = tmp_dir / 'metadata'
+    updater.metadata_manager.metadata_dir.mkdir(parents=True, exist_ok=True)
+    resultados = updater.check_all_updates(verbose=False, concurrency=args.concurrencia)
+    fallos = sum(1 for t in resultados['tablas'] if not t.get('periodo_remoto'))
+    return {'ok': resultados['total_tablas'] - fallos, 'fallos': fallos}
+
+
+def escenario_check_scheduled(args, tmp_dir):
+    from agent_extractor.updater import UpdateManager
+
+    updater = UpdateManager()
+    updater.config = ajustar_descarga(reescribir_urls(updater.config, args.base_url), args)
+    updater.metadata_manager.base_path = tmp_dir
+    updater.metadata_manager.metadata_dir = tmp_dir / 'metadata'
+    updater.metadata_manager.metadata_dir.mkdir(parents=True, exist_ok=True)
+    resultados = updater.check_scheduled_updates(verbose=False, concurrency=args.concurrencia)
+    fallos = sum(1 for t in resultados['tablas'] if not t.get('periodo_remoto'))
+    return {'ok': resultados['tablas_verificadas'] - fallos, 'fallos': fallos}
+
+
+def escenario_check(args, tmp_dir):
+    from agent_extractor.ine_scraper import INEScraper
+
+    scraper = INEScraper()
+    scraper.config = ajustar_descarga(reescribir_urls(scraper.config, args.base_url), args)
+    scraper.metadata_path = tmp_dir / 'metadata'
+    scraper.metadata_path.mkdir(parents=True, exist_ok=True)
+    scraper.period_probe = scraper._create_period_probe()
+    resultado = scraper.check_updates(usar_cache=False)
+    return {'ok': resultado['tablas_verificadas'], 'fallos': len(resultado['errores'])}
+
+
+FUNCIONES = {
+    'download': escenario_download,
+    'check-smart': escenario_check_smart,
+    'check': escenario_check,
+    'check-scheduled': escenario_check_scheduled,
+}
+
+
+def worker(args):
+    """Ejecuta un escenario en este proceso e imprime el resultado como JSON"""
+    inicio = time.perf_counter()
+    resultado = FUNCIONES[args.worker](args, Path(args.tmp))
+    resultado['tiempo'] = time.perf_counter() - inicio
+    resultado['pico_rss_mb'] = pico_rss_mb()
+    print(PREFIJO_RESULTADO + json.dumps(resultado))
+
+
+def lanzar(escenario, server, tmp_dir, args):
+    """Ejecuta un escenario en un subproceso y añade los contadores del servidor"""
+    comando = [
+        sys.executable, str(Path(__file__).resolve()),
+        '--worker', escenario, '--base-url', server.base_url, '--tmp', str(tmp_dir),
+        '--delay-reintentos', str(args.delay_reintentos)
+    ]
+    if args.sin_reanudar:
+        comando.append('--sin-reanudar')
+    if args.concurrencia is not None:
+        comando += ['--concurrencia', str(args.concurrencia)]
+    if args.rps is not None:
+        comando += ['--rps', str(args.rps)]
+
+    antes = server.stats()
+    proceso = subprocess.run(comando, capture_output=True, text=True, cwd=tmp_dir)
+    despues = server.stats()
+    if proceso.returncode != 0:
+        raise RuntimeError(f"Escenario {escenario} falló:\n{proceso.stderr}")
+
+    linea = next(l for l in reversed(proceso.stdout.splitlines()) if l.startswith(PREFIJO_RESULTADO))
+    resultado = json.loads(linea[len(PREFIJO_RESULTADO):])
+    resultado.update({clave: despues[clave] - antes[clave] for clave in despues})
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks offline de agent_extractor')
+    parser.add_argument('--escenarios', nargs='+', choices=ESCENARIOS, default=list(ESCENARIOS))
+    parser.add_argument('--latencia', type=float, default=0.05, help='Latencia simulada por petición (s)')
+    parser.add_argument('--tasa-errores', type=float, default=0.0, help='Fracción de peticiones con 503')
+    parser.add_argument('--tasa-cortes', type=float, default=0.0, help='Fracción de respuestas cortadas a mitad')
+    parser.add_argument('--sin-rangos', action='store_true', help='El servidor ignora Range (siempre 200)')
+    parser.add_argument('--sin-reanudar', action='store_true', help='Desactivar la reanudación de descargas (.part)')
+    parser.add_argument('--series', type=int, default=10, help='Series por tabla en DATOS_TABLA')
+    parser.add_argument('--concurrencia', type=int, help='Concurrencia de download/check-smart (por defecto la de tables.json)')
+    parser.add_argument('--rps', type=float, help='Peticiones por segundo por host (0 = sin límite)')
+    parser.add_argument('--delay-reintentos', type=float, default=0.1, help='Espera base entre reintentos (s)')
+    parser.add_argument('--json', type=str, metavar='RUTA', help='Guardar los resultados en JSON')
+    # Uso interno: ejecución de un escenario en el subproceso
+    parser.add_argument('--worker', choices=ESCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    parser.add_argument('--tmp', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    resultados = {}
+    with INEMockServer(latencia=args.latencia, series=args.series, soporta_rangos=not args.sin_rangos,
+                       tasa_errores=args.tasa_errores, tasa_cortes=args.tasa_cortes) as server, tempfile.TemporaryDirectory() as tmp:
+        for escenario in args.escenarios:
+            clave, repeticion = escenario, 1
+            while clave in resultados:
+                repeticion += 1
+                clave = f"{escenario}#{repeticion}"
+            resultados[clave] = lanzar(escenario, server, Path(tmp), args)
+
+    print(f"{'Escenario':<17} {'Tiempo (s)':>10} {'OK':>4} {'Fallos':>7} {'Peticiones':>11} "
+          f"{'304':>5} {'206':>5} {'Errores':>8} {'Cortes':>7} {'KB':>10} {'RSS MB':>7}")
+    print('-' * 99)
+    for escenario, r in resultados.items():
+        rss = f"{r['pico_rss_mb']:.1f}" if r['pico_rss_mb'] is not None else 'n/d'
+        print(f"{escenario:<17} {r['tiempo']:>10.2f} {r['ok']:>4} {r['fallos']:>7} {r['peticiones']:>11} "
+              f"{r['respuestas_304']:>5} {r['respuestas_206']:>5} {r['errores_inyectados']:>8} {r['cortes_inyectados']:>7} "
+              f"{r['bytes_enviados'] / 1024:>10.1f} {rss:>7}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'parametros': {k: v for k, v in vars(args).items() if k not in ('worker', 'base_url', 'tmp')},
+                       'resultados': resultados}, f, indent=2, ensure_ascii=False)
+        print(f"\nResultados guardados en {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark del manifiesto de formato del Extractor del ETL
+Compara, sobre las tablas que usa el procesador, la detección de encoding y
+separador (chardet + sondeo de separador) con la lectura del manifiesto, y el
+tiempo total de Extractor.extract_table con y sin manifiesto
+
+Uso:
+    python scripts/bench_format_manifest.py --filas-por-periodo 400
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from agent_processor.etl.extractor import Extractor
+from agent_processor.processor import ProcessorETCL
+from ine_mock_server import generar_csv
+
+
+def escribir_csvs(csv_dir, tablas, filas_por_periodo):
+    """CSVs sintéticos con la forma de los del INE (con acentos, como los reales)"""
+    for tabla in tablas:
+        contenido = generar_csv(tabla, filas_por_periodo).replace(b'Sector ', 'Sección '.encode('utf-8'))
+        (csv_dir / f"{tabla}_bench.csv").write_bytes(contenido)
+
+
+def mejor_tiempo(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del manifiesto de formato del ETL')
+    parser.add_argument('--filas-por-periodo', type=int, default=200, help='Filas por período en cada CSV')
+    parser.add_argument('--repeticiones', type=int, default=5, help='Repeticiones por medida (se toma la mejor)')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    tablas = ProcessorETCL.REQUIRED_TABLES
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_dir = Path(tmp)
+        escribir_csvs(csv_dir, tablas, args.filas_por_periodo)
+        sin_manifiesto = Extractor(csv_dir, {}, use_manifest=False, use_cache=False)
+        con_manifiesto = Extractor(csv_dir, {}, use_cache=False)
+
+        print(f"{'Tabla':<7} {'Detección (ms)':>15} {'Manifiesto (ms)':>16} {'Ahorro':>7} "
+              f"{'Extracción sin (ms)':>20} {'con (ms)':>9}")
+        print('-' * 80)
+        totales = [0.0, 0.0, 0.0, 0.0]
+        for tabla in tablas:
+            csv_file = con_manifiesto._find_csv_file(tabla)
+            con_manifiesto._resolve_file_format(csv_file)  # crea el manifiesto
+
+            medidas = [
+                mejor_tiempo(lambda: sin_manifiesto._detect_file_format(csv_file), args.repeticiones),
+                mejor_tiempo(lambda: con_manifiesto._resolve_file_format(csv_file), args.repeticiones),
+                mejor_tiempo(lambda: sin_manifiesto.extract_table(tabla), args.repeticiones),
+                mejor_tiempo(lambda: con_manifiesto.extract_table(tabla), args.repeticiones),
+            ]
+            totales = [t + m for t, m in zip(totales, medidas)]
+            deteccion, manifiesto, extraccion_sin, extraccion_con = (m * 1000 for m in medidas)
+            print(f"{tabla:<7} {deteccion:>15.2f} {manifiesto:>16.2f} {deteccion / manifiesto:>6.1f}x "
+                  f"{extraccion_sin:>20.1f} {extraccion_con:>9.1f}")
+
+        print('-' * 80)
+        deteccion, manifiesto, extraccion_sin, extraccion_con = (t * 1000 for t in totales)
+        print(f"{'Total':<7} {deteccion:>15.2f} {manifiesto:>16.2f} {deteccion / manifiesto:>6.1f}x "
+              f"{extraccion_sin:>20.1f} {extraccion_con:>9.1f}")
+        print("El manifiesto se valida con el tamaño y la fecha del archivo; el SHA-256 solo se recalcula si cambian")
+
+
+if __name__ == '__main__':
+    main()
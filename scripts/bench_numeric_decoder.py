@@ -0,0 +1,81 @@
+"""
+Benchmark del decodificador de números del INE (ETL)
+Compara tiempo y memoria asignada de decode_ine_numbers con la conversión
+anterior de _clean_numeric_values (varias copias de texto) sobre una columna
+con formato español ('1.234,5', '..'). El comportamiento del decodificador se
+comprueba en tests/test_ine_numbers.py
+
+Uso:
+    python scripts/bench_numeric_decoder.py --filas 1000000
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from agent_processor.etl.ine_numbers import decode_ine_numbers
+
+
+def formato_espanol(valor, decimales):
+    """'1234.5' -> '1.234,5' (separador de miles opcional, como en el INE)"""
+    texto = f"{valor:,.{decimales}f}"
+    return texto.replace(',', '#').replace('.', ',').replace('#', '.')
+
+
+def conversion_anterior(serie):
+    """Conversión de _clean_numeric_values antes del decodificador (sondeo + conversión)"""
+    pd.to_numeric(serie.dropna().iloc[:10], errors='coerce')
+    texto = serie.astype(str).str.replace('.', '', regex=False)
+    texto = texto.str.replace(',', '.', regex=False)
+    texto = texto.str.strip()
+    return pd.to_numeric(texto, errors='coerce')
+
+
+def medir(funcion, serie, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(serie)
+        tiempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    funcion(serie)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(tiempos), pico / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del decodificador de números del INE')
+    parser.add_argument('--filas', type=int, default=500000, help='Filas de la columna de valores')
+    parser.add_argument('--repeticiones', type=int, default=3, help='Repeticiones por medida (se toma la mejor)')
+    parser.add_argument('--semilla', type=int, default=2024)
+    args = parser.parse_args()
+
+    # Columna de valores como las del INE: un decimal, algunos miles y '..'
+    rng = np.random.default_rng(args.semilla)
+    valores = [formato_espanol(v, 1) for v in rng.integers(0, 20000, 5000) / 10]
+    serie = pd.Series(rng.choice(valores + ['..'], args.filas), dtype=object, name='Total')
+
+    print(f"{'Método':<22} {'Tiempo (ms)':>12} {'Memoria pico MB':>16}")
+    print('-' * 52)
+    medidas = {
+        'conversión anterior': medir(conversion_anterior, serie, args.repeticiones),
+        'decode_ine_numbers': medir(decode_ine_numbers, serie, args.repeticiones),
+    }
+    for nombre, (tiempo, memoria) in medidas.items():
+        print(f"{nombre:<22} {tiempo * 1000:>12.1f} {memoria:>16.1f}")
+    print('-' * 52)
+    (t_ant, m_ant), (t_nuevo, m_nuevo) = medidas.values()
+    print(f"{args.filas} filas: {t_ant / t_nuevo:.1f}x más rápido, {m_ant / m_nuevo:.1f}x menos memoria asignada")
+
+
+if __name__ == '__main__':
+    main()
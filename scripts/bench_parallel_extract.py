@@ -0,0 +1,79 @@
+"""
+Benchmark de la extracción en paralelo (Extractor.extract_parallel) del ETL
+Recorre todas las tablas de config/tables.json con CSVs sintéticos y compara la
+extracción en serie con la de un pool de N procesos (cada proceso deja su tabla
+en la caché Parquet y el padre solo la lee), comprobando que los DataFrames son
+idénticos
+
+Uso:
+    python scripts/bench_parallel_extract.py --filas-por-periodo 2000 --jobs 4
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from agent_processor.etl.extractor import Extractor, pa
+from ine_mock_server import generar_csv
+
+TABLES_PATH = Path(__file__).resolve().parents[1] / 'config' / 'tables.json'
+
+
+def extraer(csv_dir, cache_dir, tablas, jobs):
+    """Extracción en frío (caché vacía) de todas las tablas"""
+    extractor = Extractor(csv_dir, {}, cache_dir=cache_dir)
+    inicio = time.perf_counter()
+    resultado = extractor.extract_all(tablas, jobs=jobs)
+    return time.perf_counter() - inicio, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de la extracción en paralelo del ETL')
+    parser.add_argument('--filas-por-periodo', type=int, default=500, help='Filas por período en cada CSV')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='Procesos del pool')
+    args = parser.parse_args()
+
+    if pa is None:
+        sys.exit("pyarrow no está instalado (la extracción en paralelo usa la caché Parquet)")
+
+    logging.disable(logging.WARNING)
+    with open(TABLES_PATH, 'r', encoding='utf-8') as f:
+        tablas = [codigo for info in json.load(f)['categorias'].values() for codigo in info['tablas']]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_dir = Path(tmp) / 'raw'
+        csv_dir.mkdir()
+        for tabla in tablas:
+            (csv_dir / f"{tabla}_bench.csv").write_bytes(generar_csv(tabla, args.filas_por_periodo))
+
+        t_serie, serie = extraer(csv_dir, Path(tmp) / 'cache_serie', tablas, jobs=1)
+        t_pool, pool = extraer(csv_dir, Path(tmp) / 'cache_pool', tablas, jobs=args.jobs)
+
+        assert list(serie) == list(pool) == tablas
+        for tabla in tablas:
+            pd.testing.assert_frame_equal(serie[tabla], pool[tabla])
+        filas = sum(len(df) for df in serie.values())
+
+        print(f"{len(tablas)} tablas, {filas} filas ({os.cpu_count()} CPUs)\n")
+        print(f"{'Modo':<18} {'Tiempo (s)':>11} {'Filas/s':>12}")
+        print('-' * 43)
+        print(f"{'En serie':<18} {t_serie:>11.2f} {filas / t_serie:>12.0f}")
+        print(f"{f'{args.jobs} procesos':<18} {t_pool:>11.2f} {filas / t_pool:>12.0f}")
+        print('-' * 43)
+        print(f"Aceleración: {t_serie / t_pool:.2f}x; DataFrames idénticos a la extracción en serie")
+        print("Ambos tiempos incluyen parsear y escribir la caché Parquet; con una sola CPU "
+              "el pool solo añade el arranque de los procesos")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark y verificación de los motores de parseo del Extractor del ETL
+Extrae y transforma las tablas con el motor 'c' (pandas), con 'pyarrow'
+(esquema declarado: dimensiones categóricas, valores float64) y con 'duckdb'
+(read_csv paralelo de DuckDB), comprueba que la salida es idéntica a la del
+motor 'c' y compara tiempos y memoria del DataFrame extraído
+
+Uso:
+    python scripts/bench_parse_engines.py --tablas 6063 6046 --filas-por-periodo 2000
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from agent_processor.etl.extractor import Extractor, duckdb, pa
+from agent_processor.etl.transformer import Transformer
+from ine_mock_server import generar_csv
+
+MAPPINGS_PATH = Path(__file__).resolve().parents[1] / 'agent_processor' / 'config' / 'mappings.json'
+
+
+def escribir_csvs(csv_dir, tablas, filas_por_periodo):
+    """CSVs sintéticos con la forma de los del INE (con decimales, miles y '..')"""
+    for tabla in tablas:
+        lineas = generar_csv(tabla, filas_por_periodo).decode('utf-8').splitlines()
+        for i in range(1, len(lineas)):
+            if i % 97 == 0:
+                lineas[i] = lineas[i].rsplit(';', 1)[0] + ';..'
+            elif i % 13 == 0:
+                lineas[i] = lineas[i].rsplit(';', 1)[0] + ';1.234,5'
+        (csv_dir / f"{tabla}_bench.csv").write_text('\n'.join(lineas) + '\n', encoding='utf-8')
+
+
+def como_texto(df):
+    """Categóricas como object para comparar con el motor 'c'"""
+    return df.astype({col: object for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+
+
+def mejor_tiempo(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de los motores de parseo del ETL')
+    parser.add_argument('--tablas', nargs='+', default=['6063', '6046'])
+    parser.add_argument('--filas-por-periodo', type=int, default=1000, help='Filas por período en cada CSV')
+    parser.add_argument('--repeticiones', type=int, default=3, help='Repeticiones por medida (se toma la mejor)')
+    args = parser.parse_args()
+
+    motores = ['c'] + (['pyarrow'] if pa is not None else []) + (['duckdb'] if duckdb is not None else [])
+    if len(motores) < 2:
+        sys.exit("Se necesita pyarrow o duckdb para comparar motores")
+
+    logging.disable(logging.WARNING)
+    with open(MAPPINGS_PATH, 'r', encoding='utf-8') as f:
+        config = {'mappings': json.load(f)}
+    transformer = Transformer(config)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_dir = Path(tmp)
+        escribir_csvs(csv_dir, args.tablas, args.filas_por_periodo)
+        extractores = {engine: Extractor(csv_dir, config, engine=engine, use_cache=False) for engine in motores}
+
+        print(f"{'Tabla':<7} {'Motor':<8} {'Filas':>9} {'Extracción (s)':>15} {'Transformación (s)':>19} {'Memoria MB':>11}")
+        print('-' * 74)
+        for tabla in args.tablas:
+            salidas = {}
+            for engine, extractor in extractores.items():
+                t_ext, df = mejor_tiempo(lambda: extractor.extract_table(tabla), args.repeticiones)
+                t_tr, transformado = mejor_tiempo(lambda: transformer.transform_table(tabla, df.copy()), 1)
+                memoria = df.memory_usage(deep=True).sum() / 1024 / 1024
+                salidas[engine] = (df, transformado)
+                print(f"{tabla:<7} {engine:<8} {len(df):>9} {t_ext:>15.3f} {t_tr:>19.3f} {memoria:>11.1f}")
+
+            df_c, tr_c = salidas.pop('c')
+            columnas = [col for col in tr_c.columns if col != 'fecha_carga']
+            for df, transformado in salidas.values():
+                pd.testing.assert_frame_equal(df_c, como_texto(df))
+                pd.testing.assert_frame_equal(tr_c[columnas], transformado[columnas])
+            print(f"{tabla:<7} salida idéntica en extracción y transformación")
+
+
+if __name__ == '__main__':
+    main()
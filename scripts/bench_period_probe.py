@@ -0,0 +1,62 @@
+"""
+Verificación y benchmark del sondeo de período por rango de bytes
+(UpdateManager._extract_period_from_csv) contra un stand-in local del INE
+
+Ejecuta el sondeo con un servidor que respeta `Range` (206) y con otro que lo
+ignora (200), comprueba que ambos devuelven el mismo período y muestra los
+bytes servidos por tabla.
+
+Uso:
+    python scripts/bench_period_probe.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from agent_extractor.updater import UpdateManager
+from ine_mock_server import INEMockServer
+
+
+def sondear(soporta_rangos, pasadas=2):
+    """Sondea el período de las 35 tablas; la segunda pasada usa el layout cacheado"""
+    with INEMockServer(soporta_rangos=soporta_rangos) as server, tempfile.TemporaryDirectory() as tmp:
+        updater = UpdateManager()
+        updater.config = server.config_local(updater.config)
+        updater.metadata_manager.metadata_dir = Path(tmp)
+
+        tablas = [
+            (codigo, tabla_info)
+            for info in updater.config['categorias'].values()
+            for codigo, tabla_info in info['tablas'].items()
+        ]
+        bytes_por_pasada = []
+        periodos = {}
+        for _ in range(pasadas):
+            bytes_antes = server.bytes_enviados
+            for codigo, tabla_info in tablas:
+                periodos[codigo] = updater._extract_period_from_csv(tabla_info['url_csv'])
+            bytes_por_pasada.append((server.bytes_enviados - bytes_antes) / len(tablas))
+        return periodos, bytes_por_pasada, server.respuestas_206
+
+
+def main():
+    con_rangos, bytes_con, respuestas_206 = sondear(True)
+    sin_rangos, bytes_sin, _ = sondear(False)
+
+    assert respuestas_206 > 0, "El servidor con rangos no devolvió 206"
+    assert all(con_rangos.values()), "Sondeo con rangos sin período"
+    assert con_rangos == sin_rangos, "Los dos caminos devuelven períodos distintos"
+
+    print(f"Período detectado en {len(con_rangos)} tablas: {sorted(set(con_rangos.values()))}")
+    print(f"{'Servidor':<18} {'Bytes/tabla (1ª)':>17} {'Bytes/tabla (cache)':>20}")
+    print('-' * 57)
+    print(f"{'con Range (206)':<18} {bytes_con[0]:>17.0f} {bytes_con[1]:>20.0f}")
+    print(f"{'sin Range (200)':<18} {bytes_sin[0]:>17.0f} {bytes_sin[1]:>20.0f}")
+
+
+if __name__ == '__main__':
+    main()
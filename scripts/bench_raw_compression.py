@@ -0,0 +1,101 @@
+"""
+Benchmark del almacenamiento comprimido de CSVs crudos (compresion_raw)
+Descarga las tablas del stand-in local del INE como .csv, .csv.gz y .csv.zst y
+compara el espacio en disco y el tiempo de Extractor.extract_table (ETL) sobre
+las tablas que usa el procesador
+
+Uso:
+    python scripts/bench_raw_compression.py --filas-por-periodo 400
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from agent_extractor.downloader import Downloader
+from agent_extractor.raw_storage import zstandard
+from agent_processor.etl.extractor import Extractor
+from agent_processor.processor import ProcessorETCL
+from ine_mock_server import INEMockServer
+
+
+def descargar(server, tmp_dir, compresion):
+    """Descarga todas las tablas con la compresión indicada; devuelve el directorio de CSVs"""
+    downloader = Downloader()
+    downloader.config = server.config_local(downloader.config)
+    config_descarga = downloader.config['configuracion_descarga']
+    config_descarga['compresion_raw'] = compresion
+    config_descarga['peticiones_por_segundo'] = 0
+    downloader.compresion = compresion
+    downloader.rate_limiter = downloader._create_rate_limiter()
+    downloader.data_path = tmp_dir / 'raw'
+    downloader.metadata_manager.base_path = tmp_dir
+    downloader.metadata_manager.metadata_dir = tmp_dir / 'metadata'
+    downloader.metadata_manager.metadata_dir.mkdir(parents=True, exist_ok=True)
+
+    inicio = time.perf_counter()
+    resultados = downloader.download_all_tables(verbose=False)
+    if resultados['fallidas']:
+        raise RuntimeError(f"Descargas fallidas: {[r['codigo'] for r in resultados['fallidas']]}")
+    return downloader.data_path / 'csv', time.perf_counter() - inicio
+
+
+def medir(server, tmp_dir, compresion, tablas, repeticiones):
+    csv_dir, tiempo_descarga = descargar(server, tmp_dir, compresion)
+    disco = sum(f.stat().st_size for f in csv_dir.iterdir())
+    disco_tablas = sum(f.stat().st_size for t in tablas for f in csv_dir.glob(f"{t}_*"))
+
+    extractor = Extractor(csv_dir, {}, use_cache=False)
+    tiempos = []
+    filas = 0
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        filas = sum(len(extractor.extract_table(t)) for t in tablas)
+        tiempos.append(time.perf_counter() - inicio)
+
+    return {
+        'descarga': tiempo_descarga,
+        'disco_mb': disco / 1024 / 1024,
+        'disco_tablas_mb': disco_tablas / 1024 / 1024,
+        'extraccion': min(tiempos),
+        'filas': filas
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de CSVs crudos comprimidos')
+    parser.add_argument('--filas-por-periodo', type=int, default=200, help='Filas por período en cada CSV')
+    parser.add_argument('--repeticiones', type=int, default=3, help='Repeticiones de la extracción (se toma la mejor)')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    tablas = ProcessorETCL.REQUIRED_TABLES
+    formatos = [None, 'gzip'] + (['zstd'] if zstandard is not None else [])
+
+    resultados = {}
+    with INEMockServer(filas_por_periodo=args.filas_por_periodo) as server:
+        for compresion in formatos:
+            with tempfile.TemporaryDirectory() as tmp:
+                resultados[compresion] = medir(server, Path(tmp), compresion, tablas, args.repeticiones)
+
+    base = resultados[None]
+    print(f"{'Formato':<10} {'Disco MB':>9} {'ETL MB':>8} {'Ratio':>6} {'Descarga (s)':>13} "
+          f"{'Extracción (s)':>15} {'Filas':>9}")
+    print('-' * 76)
+    for compresion, r in resultados.items():
+        nombre = compresion or 'csv'
+        print(f"{nombre:<10} {r['disco_mb']:>9.1f} {r['disco_tablas_mb']:>8.1f} "
+              f"{base['disco_mb'] / r['disco_mb']:>5.1f}x {r['descarga']:>13.2f} "
+              f"{r['extraccion']:>15.2f} {r['filas']:>9}")
+    print('-' * 76)
+    print(f"Extracción ETL sobre las tablas {', '.join(tablas)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark offline de INEScraper.check_updates (python main.py --check)
+Compara la descarga completa de DATOS_TABLA con el sondeo de la última
+observación (nult=1) y con la cache TTL, contra un stand-in local del INE
+
+Uso:
+    python scripts/bench_scraper_check.py --series 200
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from agent_extractor.ine_scraper import INEScraper
+from ine_mock_server import INEMockServer
+
+
+def ejecutar(server, tmp_dir, solo_ultimo, usar_cache=False):
+    scraper = INEScraper()
+    scraper.config = server.config_local(scraper.config)
+    scraper.metadata_path = tmp_dir
+    scraper.period_probe = scraper._create_period_probe()
+    scraper.period_probe.solo_ultimo = solo_ultimo
+
+    peticiones_antes = server.peticiones
+    bytes_antes = server.bytes_enviados
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = scraper.check_updates(usar_cache=usar_cache)
+    tiempo = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'tiempo': tiempo,
+        'verificadas': resultado['tablas_verificadas'],
+        'periodos': sorted({t['ultimo_periodo'] for t in resultado['actualizaciones_detectadas']}),
+        'peticiones': server.peticiones - peticiones_antes,
+        'kb': (server.bytes_enviados - bytes_antes) / 1024,
+        'pico_mb': pico / 1024 / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de INEScraper.check_updates')
+    parser.add_argument('--series', type=int, default=200, help='Series por tabla en DATOS_TABLA')
+    parser.add_argument('--latencia', type=float, default=0.0, help='Latencia simulada por petición (s)')
+    args = parser.parse_args()
+
+    with INEMockServer(latencia=args.latencia, series=args.series) as server:
+        server.warm_up(INEScraper().config, nult=1)
+        with tempfile.TemporaryDirectory() as tmp:
+            completo = ejecutar(server, Path(tmp), solo_ultimo=False)
+        with tempfile.TemporaryDirectory() as tmp:
+            sondeo = ejecutar(server, Path(tmp), solo_ultimo=True)
+            cache = ejecutar(server, Path(tmp), solo_ultimo=True, usar_cache=True)
+
+    print(f"{'Modo':<22} {'Tiempo (s)':>10} {'Tablas':>7} {'Peticiones':>11} {'KB':>10} {'Pico MB':>8}")
+    print('-' * 73)
+    for nombre, r in (('DATOS_TABLA completo', completo), ('nult=1', sondeo), ('nult=1 + cache TTL', cache)):
+        print(f"{nombre:<22} {r['tiempo']:>10.2f} {r['verificadas']:>7} {r['peticiones']:>11} "
+              f"{r['kb']:>10.1f} {r['pico_mb']:>8.1f}")
+    print('-' * 73)
+    print(f"Último periodo (completo / nult=1): {completo['periodos']} / {sondeo['periodos']}")
+
+
+if __name__ == '__main__':
+    main()
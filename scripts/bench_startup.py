@@ -0,0 +1,103 @@
+"""
+Benchmark de arranque de la CLI (import de agent_extractor y main.py)
+Mide el tiempo de import con `python -X importtime` y el tiempo total de
+varios comandos que no tocan la red. Con presupuestos definidos sale con código
+1 si alguno se supera (para CI, cron o health checks)
+
+Uso:
+    python scripts/bench_startup.py
+    python scripts/bench_startup.py --presupuesto-import-ms 20 --presupuesto-cli-ms 150
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+
+COMANDOS = {
+    'python -c pass': [sys.executable, '-c', 'pass'],
+    'import agent_extractor': [sys.executable, '-c', 'import agent_extractor'],
+    'INEExtractor()': [sys.executable, '-c', 'from agent_extractor import INEExtractor; INEExtractor()'],
+    'main.py --help': [sys.executable, 'main.py', '--help'],
+}
+
+
+def tiempo_comando(comando, repeticiones):
+    """Mediana del tiempo total (ms) de un comando"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        subprocess.run(comando, cwd=RAIZ, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+
+def importtime(modulo):
+    """
+    Tiempo acumulado (ms) del import de `modulo` según -X importtime y los
+    submódulos más costosos que arrastra
+    """
+    proceso = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+        cwd=RAIZ, capture_output=True, text=True, check=True
+    )
+    filas = []
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        propio, acumulado, nombre = linea[len('import time:'):].split('|')
+        # La sangría del nombre indica la profundidad en el árbol de imports
+        nivel = len(nombre) - len(nombre.lstrip())
+        filas.append((int(propio), int(acumulado), nombre.strip(), nivel))
+
+    # -X importtime lista los hijos (más sangrados) justo antes que el padre
+    indice = next((i for i, fila in enumerate(filas) if fila[2] == modulo), None)
+    if indice is None:
+        return 0.0, []
+    total, nivel_modulo = filas[indice][1], filas[indice][3]
+    hijos = []
+    for fila in reversed(filas[:indice]):
+        if fila[3] <= nivel_modulo:
+            break
+        hijos.append(fila)
+    pesados = sorted(hijos, key=lambda f: f[0], reverse=True)[:5]
+    return total / 1000, [(nombre, propio / 1000) for propio, _, nombre, _ in pesados]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de arranque de la CLI')
+    parser.add_argument('--repeticiones', type=int, default=7)
+    parser.add_argument('--presupuesto-import-ms', type=float, help='Máximo para importar agent_extractor')
+    parser.add_argument('--presupuesto-cli-ms', type=float, help='Máximo para `main.py --help`')
+    args = parser.parse_args()
+
+    import_ms, pesados = importtime('agent_extractor')
+    print(f"import agent_extractor (-X importtime): {import_ms:.1f} ms")
+    for nombre, ms in pesados:
+        print(f"    {nombre:<40} {ms:>6.1f} ms")
+
+    print(f"\n{'Comando':<26} {'Mediana (ms)':>12}")
+    print('-' * 39)
+    tiempos = {}
+    for nombre, comando in COMANDOS.items():
+        tiempos[nombre] = tiempo_comando(comando, args.repeticiones)
+        print(f"{nombre:<26} {tiempos[nombre]:>12.1f}")
+
+    fallos = []
+    if args.presupuesto_import_ms is not None and import_ms > args.presupuesto_import_ms:
+        fallos.append(f"import agent_extractor: {import_ms:.1f} ms > {args.presupuesto_import_ms} ms")
+    if args.presupuesto_cli_ms is not None and tiempos['main.py --help'] > args.presupuesto_cli_ms:
+        fallos.append(f"main.py --help: {tiempos['main.py --help']:.1f} ms > {args.presupuesto_cli_ms} ms")
+    if fallos:
+        print('\n[PRESUPUESTO SUPERADO]')
+        for fallo in fallos:
+            print(f"  • {fallo}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -7,6 +7,7 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from agent_extractor.metadata_manager import MetadataManager
+from agent_extractor.raw_storage import SUFIJOS, raw_base_name
 import json
 
 def generate_retroactive_metadata():
@@ -25,18 +26,19 @@ def generate_retroactive_metadata():
     archivo_a_codigo = {}
     for categoria, info in config['categorias'].items():
         for codigo, tabla_info in info['tablas'].items():
-            nombre_archivo = f"{codigo}_{tabla_info['nombre'].replace(' ', '_').replace('/', '-')}.csv"
+            nombre_archivo = f"{codigo}_{tabla_info['nombre'].replace(' ', '_').replace('/', '-')}"
             archivo_a_codigo[nombre_archivo] = (codigo, tabla_info['url_csv'])
     
-    # Procesar cada archivo CSV existente
+    # Procesar cada archivo CSV existente (plano o comprimido)
     archivos_procesados = 0
-    for csv_file in csv_dir.glob("*.csv"):
+    csv_files = [f for sufijo in SUFIJOS.values() for f in csv_dir.glob(f"*{sufijo}")]
+    for csv_file in csv_files:
         # Buscar código correspondiente
         codigo_tabla = None
         url_origen = None
         
         for nombre_esperado, (codigo, url) in archivo_a_codigo.items():
-            if csv_file.name == nombre_esperado:
+            if raw_base_name(csv_file) == nombre_esperado:
                 codigo_tabla = codigo
                 url_origen = url
                 break
@@ -0,0 +1,315 @@
+"""
+Servidor HTTP local que imita los endpoints del INE usados por agent_extractor
+Permite medir y probar las descargas sin acceso a red
+"""
+
+import copy
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def generar_periodos(desde=2008, hasta=2025, ultimo_trimestre=1):
+    """Devuelve los periodos YYYYTQ de más reciente a más antiguo (orden INE)"""
+    periodos = []
+    for year in range(desde, hasta + 1):
+        for quarter in range(1, 5):
+            if year == hasta and quarter > ultimo_trimestre:
+                break
+            periodos.append(f"{year}T{quarter}")
+    return list(reversed(periodos))
+
+
+def generar_csv(codigo, filas_por_periodo=40, periodos=None):
+    """
+    Genera un CSV con la misma forma que los del INE (separador ';', decimales ','):
+    una serie tras otra y, dentro de cada serie, todos los períodos del más
+    reciente al más antiguo
+    """
+    periodos = periodos or generar_periodos()
+    lineas = ["Tipo de jornada;Sectores de actividad CNAE 2009;Tiempo de trabajo;Periodo;Total"]
+    for i in range(filas_por_periodo):
+        for periodo in periodos:
+            valor = f"{(int(codigo) + i * 37) % 2000},{i % 10}"
+            lineas.append(f"Ambas jornadas;Sector {i % 5};Horas pactadas {i};{periodo};{valor}")
+    return ("\n".join(lineas) + "\n").encode('utf-8')
+
+
+def generar_json(codigo, periodos=None, series=10, nult=None):
+    """
+    Genera un payload DATOS_TABLA con la forma de Tempus (tip=AM): observaciones
+    con Anyo y FK_Periodo (19-22 = T1-T4), de más reciente a más antigua.
+    Con `nult` solo se incluyen las últimas N observaciones de cada serie.
+    """
+    periodos = periodos or generar_periodos()
+    if nult:
+        periodos = periodos[:nult]
+    return json.dumps([
+        {
+            'COD': f"ETCL{codigo}{s}",
+            'Nombre': f"Serie {s}",
+            'Data': [
+                {'Anyo': int(p[:4]), 'FK_Periodo': 18 + int(p[5]), 'Valor': 100.0 + s, 'Secreto': False}
+                for p in periodos
+            ]
+        }
+        for s in range(series)
+    ]).encode('utf-8')
+
+
+def reescribir_urls(config, base_url):
+    """Copia de tables.json con las URLs apuntando a `base_url`"""
+    config = copy.deepcopy(config)
+    for categoria_info in config['categorias'].values():
+        for tabla_info in categoria_info['tablas'].values():
+            for clave in ('url_csv', 'url_json'):
+                url = urlparse(tabla_info[clave])
+                tabla_info[clave] = base_url + url.path + (f"?{url.query}" if url.query else '')
+    return config
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    """Ignora las desconexiones de clientes que solo leen el inicio de la respuesta"""
+
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class INEMockServer:
+    """
+    Stand-in del INE en 127.0.0.1 (puerto libre).
+
+    Sirve `/jaxiT3/files/t/es/csv_bdsc/{codigo}.csv` y
+    `/wstempus/js/es/DATOS_TABLA/{codigo}` con contenido sintético, con
+    validadores ETag/Last-Modified, respuestas 304 condicionales y, si
+    `soporta_rangos`, respuestas 206 a peticiones `Range: bytes=a-b`.
+    Con `tasa_errores` > 0 una fracción de las peticiones (reproducible con
+    `semilla`) recibe un `codigo_error` en lugar del contenido, y con
+    `tasa_cortes` > 0 una fracción de las respuestas se corta a mitad del cuerpo.
+    """
+
+    def __init__(self, latencia=0.0, filas_por_periodo=40, soporta_rangos=True, series=10,
+                 tasa_errores=0.0, codigo_error=503, semilla=0, tasa_cortes=0.0):
+        self.latencia = latencia
+        self.tasa_cortes = tasa_cortes
+        self.tasa_errores = tasa_errores
+        self.codigo_error = codigo_error
+        self.random = random.Random(semilla)
+        self.filas_por_periodo = filas_por_periodo
+        self.series = series
+        self.soporta_rangos = soporta_rangos
+        self.contenido = {}
+        self.last_modified = formatdate(time.time(), usegmt=True)
+        self.peticiones = 0
+        self.respuestas_304 = 0
+        self.respuestas_206 = 0
+        self.errores_inyectados = 0
+        self.cortes_inyectados = 0
+        self.bytes_enviados = 0
+        self.lock = threading.Lock()
+        self.httpd = None
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self, puerto=0):
+        """Arranca el servidor en un hilo daemon (puerto 0 = uno libre)"""
+        self.httpd = _QuietHTTPServer(('127.0.0.1', puerto), self._handler_class())
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Detiene el servidor"""
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def config_local(self, config):
+        """Copia de tables.json con las URLs apuntando a este servidor"""
+        return reescribir_urls(config, self.base_url)
+
+    def stats(self):
+        """Contadores acumulados del servidor"""
+        with self.lock:
+            return {
+                'peticiones': self.peticiones,
+                'respuestas_304': self.respuestas_304,
+                'respuestas_206': self.respuestas_206,
+                'errores_inyectados': self.errores_inyectados,
+                'cortes_inyectados': self.cortes_inyectados,
+                'bytes_enviados': self.bytes_enviados
+            }
+
+    def warm_up(self, config, nult=None):
+        """Genera de antemano el contenido de todas las tablas (para no medirlo)"""
+        for categoria_info in config['categorias'].values():
+            for codigo in categoria_info['tablas']:
+                self.get_content('csv', codigo)
+                self.get_content('json', codigo)
+                if nult:
+                    self.get_content('json', codigo, nult)
+
+    def get_content(self, tipo, codigo, nult=None):
+        """Contenido (bytes) servido para una tabla; se genera una sola vez"""
+        clave = (tipo, codigo) if tipo == 'csv' or not nult else (tipo, codigo, nult)
+        with self.lock:
+            if clave not in self.contenido:
+                if tipo == 'csv':
+                    self.contenido[clave] = generar_csv(codigo, self.filas_por_periodo)
+                else:
+                    self.contenido[clave] = generar_json(codigo, series=self.series, nult=nult)
+            return self.contenido[clave]
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                with server.lock:
+                    server.peticiones += 1
+                    error = server.tasa_errores and server.random.random() < server.tasa_errores
+                    if error:
+                        server.errores_inyectados += 1
+                if server.latencia:
+                    time.sleep(server.latencia)
+                if error:
+                    self.send_response(server.codigo_error)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                url = urlparse(self.path)
+                path = url.path
+                nult = parse_qs(url.query).get('nult', [None])[0]
+                nombre = path.rstrip('/').rsplit('/', 1)[-1]
+                if path.endswith('.csv'):
+                    tipo, codigo, content_type = 'csv', nombre[:-4], 'text/csv'
+                elif '/DATOS_TABLA/' in path:
+                    tipo, codigo, content_type = 'json', nombre, 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+
+                body = server.get_content(tipo, codigo, int(nult) if nult and nult.isdigit() else None)
+                etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+                if self._not_modified(etag):
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Last-Modified', server.last_modified)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    with server.lock:
+                        server.respuestas_304 += 1
+                    return
+
+                rango = self._parse_range(len(body), etag)
+                if rango:
+                    inicio, fin = rango
+                    self.send_response(206)
+                    self.send_header('Content-Range', f'bytes {inicio}-{fin}/{len(body)}')
+                    body = body[inicio:fin + 1]
+                    with server.lock:
+                        server.respuestas_206 += 1
+                else:
+                    self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Last-Modified', server.last_modified)
+                self.send_header('Accept-Ranges', 'bytes' if server.soporta_rangos else 'none')
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+
+                with server.lock:
+                    corte = server.tasa_cortes and len(body) > 1 and server.random.random() < server.tasa_cortes
+                    if corte:
+                        server.cortes_inyectados += 1
+                if corte:
+                    # Se envía la mitad del cuerpo anunciado y se cierra la conexión
+                    body = body[:len(body) // 2]
+                    self.close_connection = True
+                try:
+                    self.wfile.write(body)
+                    enviados = len(body)
+                except (ConnectionResetError, BrokenPipeError):
+                    enviados = 0
+                with server.lock:
+                    server.bytes_enviados += enviados
+
+            def _parse_range(self, total, etag):
+                """(inicio, fin) de un `Range: bytes=a-b` simple, o None"""
+                cabecera = self.headers.get('Range')
+                if not server.soporta_rangos or not cabecera:
+                    return None
+                if_range = self.headers.get('If-Range')
+                if if_range and if_range not in (etag, server.last_modified):
+                    return None
+                match = re.fullmatch(r'bytes=(\d+)-(\d*)', cabecera.strip())
+                if not match or int(match.group(1)) >= total:
+                    return None
+                inicio = int(match.group(1))
+                fin = min(int(match.group(2)) if match.group(2) else total - 1, total - 1)
+                return inicio, fin
+
+            def _not_modified(self, etag):
+                if_none_match = self.headers.get('If-None-Match')
+                if if_none_match is not None:
+                    return etag in [v.strip() for v in if_none_match.split(',')] or if_none_match.strip() == '*'
+                return self.headers.get('If-Modified-Since') == server.last_modified
+
+        return Handler
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Stand-in local de los endpoints del INE')
+    parser.add_argument('--puerto', type=int, default=8000)
+    parser.add_argument('--latencia', type=float, default=0.0, help='Latencia por petición (s)')
+    parser.add_argument('--tasa-errores', type=float, default=0.0, help='Fracción de peticiones con error')
+    parser.add_argument('--codigo-error', type=int, default=503)
+    parser.add_argument('--tasa-cortes', type=float, default=0.0, help='Fracción de respuestas cortadas a mitad')
+    parser.add_argument('--sin-rangos', action='store_true', help='Ignorar cabeceras Range (siempre 200)')
+    args = parser.parse_args()
+
+    server = INEMockServer(latencia=args.latencia, soporta_rangos=not args.sin_rangos,
+                           tasa_errores=args.tasa_errores, codigo_error=args.codigo_error,
+                           tasa_cortes=args.tasa_cortes)
+    server.start(args.puerto)
+    print(f"Stand-in del INE en {server.base_url} (Ctrl+C para parar)")
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -8,6 +8,8 @@ import json
 
 sys.path.append(str(Path(__file__).parent.parent))
 
+from agent_extractor.raw_storage import find_raw_files
+
 def check_duplicates():
     """Verifica que no haya archivos duplicados en data/raw/csv"""
     
@@ -32,7 +34,7 @@ def check_duplicates():
     
     # Verificar cada tabla
     for codigo in sorted(codigos_tablas):
-        archivos = list(csv_dir.glob(f"{codigo}_*.csv"))
+        archivos = find_raw_files(csv_dir, codigo)
         archivos_por_tabla[codigo] = archivos
         
         if len(archivos) > 1:
@@ -91,7 +93,7 @@ def clean_duplicates():
     archivos_eliminados = 0
     
     for codigo in sorted(codigos_tablas):
-        archivos = list(csv_dir.glob(f"{codigo}_*.csv"))
+        archivos = find_raw_files(csv_dir, codigo)
         
         if len(archivos) > 1:
             # Ordenar por fecha de modificación (más reciente primero)
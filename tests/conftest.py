@@ -0,0 +1,96 @@
+"""
+Configuración común de los tests: permite importar los paquetes desde la raíz del repo
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'scripts'))
+
+
+PERIODOS = [f"{year}T{quarter}" for year in range(2024, 2020, -1) for quarter in range(4, 0, -1)]
+
+
+def csv_ine(series=20, periodos=PERIODOS):
+    """
+    CSV con la forma de los del INE: separador ';', decimales ',', miles '.',
+    marcadores '..' y todos los períodos (del más reciente) dentro de cada serie
+    """
+    lineas = ["Tipo de jornada;Sectores de actividad CNAE 2009;Tiempo de trabajo;Periodo;Total"]
+    for i in range(series):
+        for j, periodo in enumerate(periodos):
+            valor = '..' if (i + j) % 11 == 0 else f"{1000 + i * 7 + j}.{j % 10}{i % 10}0,{j % 10}"
+            lineas.append(f"Ambas jornadas;Sección {i % 4};Horas pactadas {i};{periodo};{valor}")
+    return "\n".join(lineas) + "\n"
+
+
+@pytest.fixture
+def raw_dir(tmp_path):
+    """Directorio de CSVs crudos con la tabla 6042 en formato INE"""
+    directorio = tmp_path / 'raw' / 'csv'
+    directorio.mkdir(parents=True)
+    (directorio / '6042_tiempo_trabajo.csv').write_text(csv_ine(), encoding='utf-8')
+    return directorio
+
+
+class RespuestaFalsa:
+    """Respuesta HTTP en streaming; con `corte` la conexión se cae tras ese byte"""
+
+    def __init__(self, status_code=200, cuerpo=b'', headers=None, corte=None):
+        self.status_code = status_code
+        self.cuerpo = cuerpo
+        self.headers = headers or {}
+        self.corte = corte
+        self.cerrada = False
+
+    def iter_content(self, chunk_size=1):
+        fin = len(self.cuerpo) if self.corte is None else self.corte
+        for inicio in range(0, fin, chunk_size):
+            yield self.cuerpo[inicio:min(inicio + chunk_size, fin)]
+        if self.corte is not None:
+            import requests
+            raise requests.exceptions.ConnectionError("conexión cortada")
+
+    def close(self):
+        self.cerrada = True
+
+
+class SesionFalsa:
+    """Sesión que devuelve las respuestas en orden y guarda las cabeceras de cada petición"""
+
+    def __init__(self, *respuestas):
+        self.respuestas = list(respuestas)
+        self.peticiones = []
+
+    def get(self, url, headers=None, timeout=None, stream=False):
+        self.peticiones.append(dict(headers or {}))
+        return self.respuestas.pop(0)
+
+
+@pytest.fixture
+def downloader(tmp_path, monkeypatch):
+    """Downloader de la tabla 6042 con sesión falsa y datos, metadata y backups en tmp_path"""
+    import logging
+
+    from agent_extractor.downloader import Downloader
+    from agent_extractor.http_client import load_config
+    from agent_extractor.metadata_manager import MetadataManager
+
+    config = load_config()
+    config['configuracion_descarga'].update(delay_entre_reintentos=0, peticiones_por_segundo=1000,
+                                            rafaga_maxima=1000)
+    metadata_manager = MetadataManager(config)
+    metadata_manager.base_path = tmp_path
+    metadata_manager.metadata_dir = tmp_path / 'metadata'
+    metadata_manager.metadata_dir.mkdir()
+
+    # Sin el downloads.log del repo
+    monkeypatch.setattr(Downloader, '_setup_logger', lambda self: logging.getLogger('agent_extractor.downloader'))
+    downloader = Downloader(config, session=SesionFalsa(), metadata_manager=metadata_manager)
+    downloader.data_path = tmp_path / 'raw'
+    downloader.CHUNK_SIZE = 1024
+    yield downloader
+    metadata_manager.catalog.close()
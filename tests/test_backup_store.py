@@ -0,0 +1,103 @@
+"""
+Tests del almacén de backups direccionado por contenido (BackupStore)
+"""
+
+import threading
+
+import pytest
+
+from agent_extractor.backup_store import BackupStore
+
+
+def escribir(path, texto):
+    path.write_text(texto, encoding='utf-8')
+    return path
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BackupStore(tmp_path / 'backups', versiones_por_tabla=3)
+
+
+def test_store_y_restore_devuelve_el_contenido(store, tmp_path):
+    csv = escribir(tmp_path / '6042_t.csv', 'Periodo;Total\n2024T1;1,5\n')
+    objeto = store.store(csv, '6042', version=1)
+
+    assert objeto.exists() and objeto.name.endswith('.csv.gz')
+    destino, entrada = store.restore('6042', destino=tmp_path / 'restaurado.csv')
+    assert destino.read_text(encoding='utf-8') == 'Periodo;Total\n2024T1;1,5\n'
+    assert entrada['version'] == 1
+
+
+def test_contenido_repetido_comparte_objeto_y_registra_cada_version(store, tmp_path):
+    csv = escribir(tmp_path / '6042_t.csv', 'Periodo;Total\n2024T1;1,5\n')
+    primero = store.store(csv, '6042', version=1)
+    segundo = store.store(csv, '6042', version=2)
+
+    assert primero == segundo
+    assert len(list(store.objects_dir.glob('*/*.csv.*'))) == 1
+    assert [v['version'] for v in store.list_versions('6042')] == [1, 2]
+    destino, entrada = store.restore('6042', version=2, destino=tmp_path / 'v2.csv')
+    assert entrada['version'] == 2
+
+
+def test_misma_version_y_contenido_no_duplica_entrada(store, tmp_path):
+    csv = escribir(tmp_path / '6042_t.csv', 'a;b\n')
+    store.store(csv, '6042', version=1)
+    store.store(csv, '6042', version=1)
+    assert len(store.list_versions('6042')) == 1
+
+
+def test_restore_de_version_inexistente_lanza_keyerror(store, tmp_path):
+    store.store(escribir(tmp_path / '6042_t.csv', 'a;b\n'), '6042', version=1)
+    with pytest.raises(KeyError):
+        store.restore('6042', version=7)
+    with pytest.raises(KeyError):
+        store.restore('9999')
+
+
+def test_retencion_recorta_versiones_y_borra_objetos_sin_referencias(store, tmp_path):
+    csv = tmp_path / '6042_t.csv'
+    for version in range(1, 6):
+        store.store(escribir(csv, f'Periodo;Total\n2024T1;{version}\n'), '6042', version=version)
+
+    assert [v['version'] for v in store.list_versions('6042')] == [3, 4, 5]
+    assert len(list(store.objects_dir.glob('*/*.csv.*'))) == 3
+
+
+def test_hash_conocido_reutiliza_el_objeto_sin_leer_el_archivo(store, tmp_path):
+    csv = escribir(tmp_path / '6042_t.csv', 'a;b\n')
+    objeto = store.store(csv, '6042', version=1)
+    hash_archivo = store.list_versions('6042')[0]['hash']
+
+    # El archivo ya no tiene ese contenido: si se leyera, cambiaría el hash
+    escribir(csv, 'otro contenido\n')
+    assert store.store(csv, '6042', version=2, hash_archivo=hash_archivo) == objeto
+
+
+def test_backups_concurrentes_no_pierden_objetos(tmp_path):
+    store = BackupStore(tmp_path / 'backups', versiones_por_tabla=2)
+    tablas = [str(6000 + i) for i in range(8)]
+    errores = []
+
+    def respaldar(codigo):
+        try:
+            for version in range(1, 4):
+                csv = escribir(tmp_path / f'{codigo}_v{version}.csv', f'{codigo};{version}\n' * 200)
+                store.store(csv, codigo, version=version)
+        except Exception as e:  # pragma: no cover - se comprueba abajo
+            errores.append(e)
+
+    hilos = [threading.Thread(target=respaldar, args=(codigo,)) for codigo in tablas]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert not errores
+    for codigo in tablas:
+        versiones = store.list_versions(codigo)
+        assert [v['version'] for v in versiones] == [2, 3]
+        for entrada in versiones:
+            assert (store.root / entrada['objeto']).exists()
+    assert not list(store.objects_dir.glob('*.tmp'))
@@ -0,0 +1,91 @@
+"""
+Tests de la revalidación de descargas del Downloader: HTTP 304 con los
+validadores guardados y contenido idéntico al local
+"""
+
+from pathlib import Path
+
+import pytest
+
+from conftest import RespuestaFalsa, csv_ine
+
+pytest.importorskip('requests')
+
+CUERPO = csv_ine(series=3).encode('utf-8')
+VALIDADORES = {'ETag': '"v1"', 'Last-Modified': 'Fri, 10 Jan 2025 10:00:00 GMT'}
+
+
+def descargar(downloader, *respuestas):
+    downloader.session.respuestas.extend(respuestas)
+    return downloader.download_single_table('6042')
+
+
+def test_primera_descarga_guarda_validadores(downloader):
+    resultado = descargar(downloader, RespuestaFalsa(200, CUERPO, VALIDADORES))
+
+    assert resultado['exitoso'] and not resultado.get('sin_cambios')
+    assert downloader.session.peticiones[0].get('If-None-Match') is None
+    metadata = downloader.metadata_manager.get_table_metadata('6042')
+    assert metadata['version'] == 1 and metadata['etag'] == '"v1"'
+    assert metadata['ultimo_periodo'] == '2024T4'
+
+
+def test_304_no_reescribe_ni_crea_version(downloader):
+    csv_path = Path(descargar(downloader, RespuestaFalsa(200, CUERPO, VALIDADORES))['archivo'])
+    mtime = csv_path.stat().st_mtime_ns
+
+    respuesta = RespuestaFalsa(304)
+    resultado = descargar(downloader, respuesta)
+
+    assert resultado['exitoso'] and resultado['sin_cambios'] and respuesta.cerrada
+    assert resultado['archivo'] == str(csv_path)
+    assert downloader.session.peticiones[1]['If-None-Match'] == '"v1"'
+    assert downloader.session.peticiones[1]['If-Modified-Since'] == VALIDADORES['Last-Modified']
+    assert downloader.metadata_manager.get_table_metadata('6042')['version'] == 1
+    assert csv_path.stat().st_mtime_ns == mtime
+    assert not (downloader.metadata_manager.base_path / 'data' / 'backups').exists()
+
+
+def test_sin_csv_local_no_se_envian_validadores(downloader):
+    descargar(downloader, RespuestaFalsa(200, CUERPO, VALIDADORES))
+    for archivo in (downloader.data_path / 'csv').glob('6042_*'):
+        archivo.unlink()
+
+    resultado = descargar(downloader, RespuestaFalsa(200, CUERPO, VALIDADORES))
+    assert resultado['exitoso']
+    assert 'If-None-Match' not in downloader.session.peticiones[1]
+
+
+def test_contenido_identico_solo_actualiza_validadores(downloader):
+    csv_path = Path(descargar(downloader, RespuestaFalsa(200, CUERPO, VALIDADORES))['archivo'])
+    mtime = csv_path.stat().st_mtime_ns
+
+    nuevos = {'ETag': '"v2"', 'Last-Modified': 'Sat, 11 Jan 2025 10:00:00 GMT'}
+    resultado = descargar(downloader, RespuestaFalsa(200, CUERPO, nuevos))
+
+    assert resultado['exitoso'] and resultado['sin_cambios']
+    metadata = downloader.metadata_manager.get_table_metadata('6042')
+    assert metadata['version'] == 1 and metadata['etag'] == '"v2"'
+    assert metadata['last_modified'] == nuevos['Last-Modified']
+    assert csv_path.stat().st_mtime_ns == mtime
+    assert not (downloader.metadata_manager.base_path / 'data' / 'backups').exists()
+    assert [archivo.name for archivo in csv_path.parent.iterdir()] == [csv_path.name]
+
+
+def test_contenido_nuevo_respalda_y_crea_version(downloader):
+    csv_path = Path(descargar(downloader, RespuestaFalsa(200, CUERPO, VALIDADORES))['archivo'])
+    nuevo = csv_ine(series=3, periodos=['2025T1'] + [f"2024T{t}" for t in range(4, 0, -1)]).encode('utf-8')
+
+    resultado = descargar(downloader, RespuestaFalsa(200, nuevo, {'ETag': '"v2"'}))
+
+    assert resultado['exitoso'] and not resultado.get('sin_cambios')
+    assert csv_path.read_bytes() == nuevo
+    metadata = downloader.metadata_manager.get_table_metadata('6042')
+    assert metadata['version'] == 2 and metadata['ultimo_periodo'] == '2025T1'
+    assert metadata['hash_archivo'] == downloader.metadata_manager.calculate_file_hash(csv_path)
+
+    # El contenido anterior queda respaldado con la versión que tenía
+    backups = downloader.metadata_manager.backup_store
+    assert [v['version'] for v in backups.list_versions('6042')] == [1]
+    destino, _ = backups.restore('6042', destino=csv_path.with_name('restaurado.csv'))
+    assert destino.read_bytes() == CUERPO
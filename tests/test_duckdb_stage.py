@@ -0,0 +1,60 @@
+"""
+Tests del motor 'duckdb' del Extractor y de la carga de tablas crudas en el
+Loader sin pasar por pandas (stage_table / Loader.stage_raw_table)
+"""
+
+import pandas as pd
+import pytest
+
+from agent_processor.etl.extractor import Extractor
+
+pytest.importorskip('duckdb')
+
+from agent_processor.etl.loader import Loader  # noqa: E402
+
+
+@pytest.fixture
+def loader(tmp_path):
+    with Loader(tmp_path / 'analysis.db') as loader:
+        yield loader
+
+
+def test_motor_duckdb_igual_que_motor_c(raw_dir):
+    referencia = Extractor(raw_dir, {}, use_cache=False)
+    extractor = Extractor(raw_dir, {}, engine='duckdb', use_cache=False)
+    for filtros in ({}, {'since': '2024T1'}, {'periods': ['2022T3']}):
+        pd.testing.assert_frame_equal(extractor.extract_table('6042', **filtros),
+                                      referencia.extract_table('6042', **filtros))
+
+
+def test_stage_raw_table_carga_en_la_base_del_loader(raw_dir, tmp_path, loader):
+    extractor = Extractor(raw_dir, {}, engine='duckdb', use_cache=False)
+    stats = loader.stage_raw_table(extractor, '6042')
+
+    esperado = Extractor(raw_dir, {}, use_cache=False).extract_table('6042')
+    esperado = esperado.drop(columns=['fuente_tabla', 'tabla_nombre'])
+    cargado = loader.execute_query("SELECT * FROM raw_6042")
+    assert stats['registros_cargados'] == len(esperado)
+    pd.testing.assert_frame_equal(cargado.fillna(pd.NA).astype(object),
+                                  esperado.fillna(pd.NA).astype(object))
+
+    # La tabla queda en analysis.db, no en la conexión del extractor
+    loader.disconnect()
+    with Loader(tmp_path / 'analysis.db') as otro:
+        assert otro.execute_query("SELECT count(*) AS n FROM raw_6042")['n'][0] == len(esperado)
+    assert extractor._duckdb_conn is None
+
+
+def test_stage_raw_table_reemplaza_y_filtra_periodos(raw_dir, loader):
+    extractor = Extractor(raw_dir, {}, use_cache=False)
+    loader.stage_raw_table(extractor, '6042')
+    stats = loader.stage_raw_table(extractor, '6042', since='2024T3')
+
+    periodos = loader.execute_query("SELECT DISTINCT Periodo FROM raw_6042 ORDER BY 1")['Periodo'].tolist()
+    assert periodos == ['2024T3', '2024T4']
+    assert stats['registros_cargados'] == 20 * 2
+
+
+def test_stage_raw_table_de_tabla_inexistente_falla(raw_dir, loader):
+    with pytest.raises(FileNotFoundError):
+        loader.stage_raw_table(Extractor(raw_dir, {}, use_cache=False), '9999')
@@ -0,0 +1,76 @@
+"""
+Tests del manifiesto de formato del Extractor ({archivo}.manifest.json)
+"""
+
+import json
+import os
+
+import pytest
+
+from agent_processor.etl.extractor import Extractor
+
+
+def leer_manifiesto(csv_file):
+    with open(csv_file.with_name(csv_file.name + Extractor.MANIFEST_SUFFIX), encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def csv_file(raw_dir):
+    return next(raw_dir.glob('6042_*.csv'))
+
+
+def test_manifiesto_guarda_formato_hash_y_marca(raw_dir, csv_file):
+    extractor = Extractor(raw_dir, {}, use_cache=False)
+    assert extractor._resolve_file_format(csv_file) == ('utf-8', ';')
+
+    manifiesto = leer_manifiesto(csv_file)
+    assert manifiesto['hash'] == Extractor(raw_dir, {}, use_manifest=False)._content_hash(csv_file)
+    assert manifiesto['stamp'] == [csv_file.stat().st_size, csv_file.stat().st_mtime_ns]
+    assert manifiesto['columns'][3] == 'Periodo'
+
+
+def test_archivo_sin_cambios_no_se_relee(raw_dir, csv_file, monkeypatch):
+    extractor = Extractor(raw_dir, {}, use_cache=False)
+    extractor._resolve_file_format(csv_file)
+
+    def sin_lectura(*args, **kwargs):
+        raise AssertionError("no debería leerse el CSV")
+
+    monkeypatch.setattr(Extractor, '_open_binary', staticmethod(sin_lectura))
+    monkeypatch.setattr(Extractor, '_detect_file_format', sin_lectura)
+    assert extractor._content_hash(csv_file) == leer_manifiesto(csv_file)['hash']
+    assert extractor._resolve_file_format(csv_file) == ('utf-8', ';')
+
+
+def test_contenido_modificado_recalcula_hash_y_formato(raw_dir, csv_file):
+    extractor = Extractor(raw_dir, {}, use_cache=False)
+    extractor._resolve_file_format(csv_file)
+    hash_anterior = leer_manifiesto(csv_file)['hash']
+
+    csv_file.write_text("Periodo,Total\n2024T1,1\n", encoding='latin-1')
+    assert extractor._resolve_file_format(csv_file)[1] == ','
+    assert leer_manifiesto(csv_file)['hash'] != hash_anterior
+
+
+def test_mismo_contenido_con_otra_fecha_actualiza_la_marca(raw_dir, csv_file):
+    extractor = Extractor(raw_dir, {}, use_cache=False)
+    extractor._resolve_file_format(csv_file)
+    manifiesto = leer_manifiesto(csv_file)
+
+    stat = csv_file.stat()
+    os.utime(csv_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert extractor._content_hash(csv_file) == manifiesto['hash']
+    extractor._resolve_file_format(csv_file)
+    assert leer_manifiesto(csv_file)['stamp'][1] == stat.st_mtime_ns + 10**9
+
+
+def test_sin_manifiesto_siempre_se_calcula_el_hash(raw_dir, csv_file):
+    Extractor(raw_dir, {}, use_cache=False)._resolve_file_format(csv_file)
+    sin_manifiesto = Extractor(raw_dir, {}, use_manifest=False, use_cache=False)
+
+    # Un manifiesto manipulado no afecta si está desactivado
+    manifiesto = leer_manifiesto(csv_file)
+    manifiesto['hash'] = 'x' * 64
+    csv_file.with_name(csv_file.name + Extractor.MANIFEST_SUFFIX).write_text(json.dumps(manifiesto))
+    assert sin_manifiesto._content_hash(csv_file) != 'x' * 64
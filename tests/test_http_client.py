@@ -0,0 +1,40 @@
+"""
+Tests de la sesión HTTP compartida (create_session)
+"""
+
+import pytest
+
+from agent_extractor.http_client import create_session, load_config
+
+pytest.importorskip('requests')
+
+
+@pytest.fixture
+def config():
+    return load_config()
+
+
+def tablas(config):
+    return [tabla_info for categoria_info in config['categorias'].values()
+            for tabla_info in categoria_info['tablas'].values()]
+
+
+def test_descargas_de_csv_sin_reintentos_de_urllib3(config):
+    # Cada intento del Downloader consume un token del HostRateLimiter: urllib3
+    # no puede repetir la petición por debajo
+    session = create_session(config)
+    for tabla_info in tablas(config):
+        assert session.get_adapter(tabla_info['url_csv']).max_retries.total == 0
+
+
+def test_resto_de_peticiones_con_reintentos_ante_5xx(config):
+    session = create_session(config)
+    retry = session.get_adapter(tablas(config)[0]['url_json']).max_retries
+    assert retry.total == 3 and 503 in retry.status_forcelist
+    assert session.get_adapter('https://www.ine.es/dyngs/INEbase/').max_retries.total == 3
+
+
+def test_pools_compartidos_por_prefijo(config):
+    session = create_session(config)
+    adaptadores = {id(session.get_adapter(tabla_info['url_csv'])) for tabla_info in tablas(config)}
+    assert len(adaptadores) == 1
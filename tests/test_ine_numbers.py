@@ -0,0 +1,103 @@
+"""
+Tests del decodificador de números del INE (parse_ine_number / decode_ine_numbers)
+"""
+
+import math
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agent_processor.etl.ine_numbers import NA_MARKERS, decode_ine_numbers, parse_ine_number
+
+
+@pytest.mark.parametrize('texto, esperado', [
+    ('1.234,5', 1234.5),
+    ('1.234.567', 1234567.0),
+    ('12,75', 12.75),
+    ('-3,5', -3.5),
+    (' 7 ', 7.0),
+    ('0', 0.0),
+])
+def test_formato_espanol(texto, esperado):
+    assert parse_ine_number(texto) == esperado
+
+
+@pytest.mark.parametrize('marcador', sorted(NA_MARKERS) + [None, '   '])
+def test_marcadores_de_dato_no_disponible(marcador):
+    assert math.isnan(parse_ine_number(marcador))
+
+
+@pytest.mark.parametrize('texto', ['abc', 'Total Nacional', 'nan', 'inf', '1_000', '12,5%', '1,2,3', ' .. '])
+def test_texto_no_numerico_da_nan(texto):
+    assert math.isnan(parse_ine_number(texto))
+
+
+def test_numeros_ya_decodificados_se_devuelven_tal_cual():
+    assert parse_ine_number(1234.5) == 1234.5
+    assert parse_ine_number(np.int64(3)) == 3.0
+
+
+def test_decode_igual_que_valor_a_valor():
+    valores = ['1.234,5', '..', '12,5', None, 'n.d.', '1.234,5', '7', 'x']
+    serie = pd.Series(valores, index=range(10, 18), name='Total')
+    decodificado = decode_ine_numbers(serie)
+
+    esperado = pd.Series([parse_ine_number(v) for v in valores], index=serie.index, name='Total')
+    pd.testing.assert_series_equal(decodificado, esperado)
+
+
+def test_decode_categorica_con_nulos():
+    serie = pd.Series(['1.000', None, '2,5', '1.000', '..'], dtype='category')
+    decodificado = decode_ine_numbers(serie)
+    assert decodificado.isna().tolist() == [False, True, False, False, True]
+    assert decodificado.dropna().tolist() == [1000.0, 2.5, 1000.0]
+
+
+def test_decode_columna_numerica_solo_cambia_el_tipo():
+    serie = pd.Series([1, 2, 3], dtype='int32', name='Total')
+    decodificado = decode_ine_numbers(serie)
+    assert decodificado.dtype == 'float64'
+    assert decodificado.tolist() == [1.0, 2.0, 3.0]
+
+
+def test_decode_serie_vacia():
+    decodificado = decode_ine_numbers(pd.Series([], dtype=object))
+    assert decodificado.dtype == 'float64' and decodificado.empty
+
+
+def formato_espanol(valor, decimales):
+    """'1234.5' -> '1.234,5' (separador de miles opcional, como en el INE)"""
+    texto = f"{valor:,.{decimales}f}"
+    return texto.replace(',', '#').replace('.', ',').replace('#', '.')
+
+
+def test_ida_y_vuelta_sobre_valores_aleatorios():
+    rng = random.Random(2024)
+    textos, esperados = [], []
+    for _ in range(5000):
+        decimales = rng.randint(0, 3)
+        valor = round(rng.uniform(-1e7, 1e7) * rng.choice([1, 1e-4]), decimales)
+        texto = formato_espanol(valor, decimales)
+        if rng.random() < 0.3:
+            texto = texto.replace('.', '')  # sin separador de miles
+        if rng.random() < 0.1:
+            texto = f"  {texto} "
+        textos.append(texto)
+        esperados.append(float(f"{valor:.{decimales}f}"))
+
+    for dtype in (object, 'category'):
+        decodificado = decode_ine_numbers(pd.Series(textos, dtype=dtype))
+        assert decodificado.dtype == 'float64'
+        np.testing.assert_array_equal(decodificado.to_numpy(), np.array(esperados))
+    assert [parse_ine_number(texto) for texto in textos] == esperados
+
+
+def test_decodificar_dos_veces_no_cambia_el_resultado():
+    decodificado = decode_ine_numbers(pd.Series(['1.234,5', '..', '0,25', '12'], dtype=object))
+    pd.testing.assert_series_equal(decode_ine_numbers(decodificado), decodificado)
+
+
+def test_nulos_de_pandas_dan_nan():
+    assert decode_ine_numbers(pd.Series([None, np.nan, '..'], dtype=object)).isna().all()
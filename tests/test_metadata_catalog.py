@@ -0,0 +1,125 @@
+"""
+Tests del catálogo SQLite de metadata (MetadataCatalog)
+"""
+
+import json
+import threading
+
+import pytest
+
+from agent_extractor.metadata_catalog import MetadataCatalog
+
+
+def metadata(codigo='6042', hash_archivo='a' * 64, periodo='2024T4', **campos):
+    return {'codigo_tabla': codigo, 'archivo': f'{codigo}_tiempo_trabajo.csv', 'hash_archivo': hash_archivo,
+            'ultimo_periodo': periodo, 'fecha_descarga': '2025-01-10T10:00:00', 'tamaño_bytes': 100, **campos}
+
+
+@pytest.fixture
+def catalogo(tmp_path):
+    catalogo = MetadataCatalog(tmp_path / 'catalogo.db')
+    yield catalogo
+    catalogo.close()
+
+
+def test_save_version_incrementa_y_guarda_historial(catalogo):
+    primera = catalogo.save_version(metadata())
+    segunda = catalogo.save_version(metadata(hash_archivo='b' * 64, periodo='2025T1'))
+
+    assert primera['version'] == 1 and 'version_anterior' not in primera
+    assert segunda['version'] == 2
+    assert segunda['version_anterior'] == {'fecha': '2025-01-10T10:00:00', 'periodo': '2024T4', 'hash': 'a' * 64}
+    assert catalogo.get('6042') == segunda
+    assert [v['version'] for v in catalogo.history('6042')] == [1, 2]
+    assert catalogo.get('9999') is None
+
+
+def test_update_fields_no_crea_version(catalogo):
+    catalogo.save_version(metadata())
+    actualizada = catalogo.update_fields('6042', etag='"abc"', last_modified='Fri, 10 Jan 2025 10:00:00 GMT')
+
+    assert actualizada['etag'] == '"abc"' and actualizada['version'] == 1
+    assert len(catalogo.history('6042')) == 1
+    assert catalogo.update_fields('9999', etag='"x"') is None
+    with pytest.raises(ValueError):
+        catalogo.update_fields('6042', titulo='no es un campo')
+
+
+def test_error_en_la_transaccion_deshace_la_version(catalogo, monkeypatch):
+    catalogo.save_version(metadata())
+
+    def fallar(valores):
+        raise RuntimeError("fallo al escribir el historial")
+
+    monkeypatch.setattr(catalogo, '_insert_version', fallar)
+    with pytest.raises(RuntimeError):
+        catalogo.save_version(metadata(hash_archivo='b' * 64))
+
+    # Ni la fila actual ni el historial reflejan la versión fallida
+    assert catalogo.get('6042')['version'] == 1
+    assert catalogo.get('6042')['hash_archivo'] == 'a' * 64
+    monkeypatch.undo()
+    assert catalogo.save_version(metadata(hash_archivo='b' * 64))['version'] == 2
+
+
+def test_versiones_concurrentes_sin_huecos(catalogo):
+    def guardar(codigo):
+        for i in range(10):
+            catalogo.save_version(metadata(codigo=codigo, hash_archivo=f'{i:064d}'))
+
+    hilos = [threading.Thread(target=guardar, args=(codigo,)) for codigo in ('6042', '6042', '6063')]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert [v['version'] for v in catalogo.history('6042')] == list(range(1, 21))
+    assert catalogo.get('6063')['version'] == 10
+
+
+def test_datos_persisten_al_reabrir(tmp_path):
+    catalogo = MetadataCatalog(tmp_path / 'catalogo.db')
+    catalogo.save_version(metadata())
+    catalogo.close()
+
+    reabierto = MetadataCatalog(tmp_path / 'catalogo.db')
+    assert reabierto.get('6042')['hash_archivo'] == 'a' * 64
+    reabierto.close()
+
+
+def escribir_json(directorio, nombre, contenido):
+    (directorio / nombre).write_text(json.dumps(contenido) if isinstance(contenido, dict) else contenido,
+                                     encoding='utf-8')
+
+
+def test_importa_json_legado(tmp_path):
+    legado = tmp_path / 'metadata'
+    legado.mkdir()
+    anterior = {'fecha': '2024-10-01T09:00:00', 'periodo': '2024T3', 'hash': 'c' * 64}
+    escribir_json(legado, '6042_metadata.json', metadata(version=3, version_anterior=anterior))
+    escribir_json(legado, '6063_metadata.json', {'hash_archivo': 'd' * 64, 'ultimo_periodo': '2024T4'})
+    escribir_json(legado, 'tabla_6042_metadata.json', {'codigo_tabla': '6042', 'titulo': 'del scraper'})
+    escribir_json(legado, '6044_metadata.json', '{no es json')
+
+    catalogo = MetadataCatalog(tmp_path / 'catalogo.db', json_legado_dir=legado)
+
+    assert [m['codigo_tabla'] for m in catalogo.all()] == ['6042', '6063']
+    assert catalogo.get('6042')['version'] == 3
+    assert catalogo.get('6042')['version_anterior'] == anterior
+    assert [v['version'] for v in catalogo.history('6042')] == [2, 3]
+    assert catalogo.get('6063')['version'] == 1
+    catalogo.close()
+
+
+def test_importacion_solo_con_catalogo_vacio(tmp_path, catalogo):
+    legado = tmp_path / 'metadata'
+    legado.mkdir()
+    escribir_json(legado, '6063_metadata.json', metadata(codigo='6063'))
+
+    catalogo.save_version(metadata())
+    assert catalogo.import_json_dir(legado) == 0
+    assert catalogo.get('6063') is None
+
+    vacio = MetadataCatalog(tmp_path / 'otro.db')
+    assert vacio.import_json_dir(tmp_path / 'no_existe') == 0
+    vacio.close()
@@ -0,0 +1,92 @@
+"""
+Tests de la extracción en paralelo (Extractor.extract_parallel / from_handle)
+y de las opciones de agent_processor/scripts/load_all_tables.py
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from agent_processor.etl.extractor import Extractor
+from conftest import csv_ine
+
+pytest.importorskip('pyarrow')
+
+LOAD_ALL_TABLES = Path(__file__).resolve().parents[1] / 'agent_processor' / 'scripts' / 'load_all_tables.py'
+
+
+@pytest.fixture
+def tablas(raw_dir):
+    (raw_dir / '6063_tiempo_trabajo_ccaa.csv').write_text(csv_ine(series=7), encoding='utf-8')
+    (raw_dir / '6044_vacia.csv').write_text('', encoding='utf-8')
+    return ['6042', '6063']
+
+
+def test_handles_dan_el_mismo_resultado_que_extract_table(raw_dir, tmp_path, tablas):
+    extractor = Extractor(raw_dir, {}, cache_dir=tmp_path / 'cache')
+    handles, errores = extractor.extract_parallel(tablas, jobs=2)
+
+    assert not errores and list(handles) == tablas
+    referencia = Extractor(raw_dir, {}, use_cache=False)
+    for tabla in tablas:
+        path, _ = handles[tabla]
+        assert path.exists()
+        for filtros in ({}, {'since': '2024T1'}, {'test_mode': True}):
+            pd.testing.assert_frame_equal(extractor.from_handle(tabla, handles[tabla], **filtros),
+                                          referencia.extract_table(tabla, **filtros), check_categorical=False)
+
+
+def test_errores_por_tabla_no_detienen_el_resto(raw_dir, tmp_path, tablas):
+    extractor = Extractor(raw_dir, {}, cache_dir=tmp_path / 'cache')
+    handles, errores = extractor.extract_parallel(tablas + ['6044', '9999'], jobs=2)
+
+    assert list(handles) == tablas
+    assert set(errores) == {'6044', '9999'}
+    with pytest.raises(RuntimeError):
+        extractor.extract_all(tablas + ['9999'], jobs=2)
+
+
+def test_extract_all_en_paralelo_igual_que_en_serie(raw_dir, tmp_path, tablas):
+    serie = Extractor(raw_dir, {}, cache_dir=tmp_path / 'serie').extract_all(tablas)
+    paralelo = Extractor(raw_dir, {}, cache_dir=tmp_path / 'paralelo').extract_all(tablas, jobs=2)
+    for tabla in tablas:
+        pd.testing.assert_frame_equal(serie[tabla], paralelo[tabla])
+
+
+def test_numero_de_procesos_invalido(raw_dir, tmp_path, tablas):
+    extractor = Extractor(raw_dir, {}, cache_dir=tmp_path / 'cache')
+    for jobs in (0, -1):
+        with pytest.raises(ValueError):
+            extractor.extract_parallel(tablas, jobs)
+        with pytest.raises(ValueError):
+            extractor.extract_all(tablas, jobs=jobs)
+
+
+def test_sin_cache_se_extrae_en_serie(raw_dir, tablas):
+    extractor = Extractor(raw_dir, {}, use_cache=False)
+    assert extractor.extract_parallel(tablas, jobs=2) == ({}, {})
+    assert list(extractor.extract_all(tablas, jobs=2)) == tablas
+
+
+@pytest.fixture(scope='module')
+def load_all_tables():
+    spec = importlib.util.spec_from_file_location('load_all_tables', LOAD_ALL_TABLES)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def test_opciones_de_load_all_tables(load_all_tables):
+    args = load_all_tables.parse_args(['--all', '--jobs', '4', '--pyarrow'])
+    assert args.all_tables and args.jobs == 4 and args.parse_engine == 'pyarrow' and args.use_cache
+
+    args = load_all_tables.parse_args(['-y', '--no-cache'])
+    assert args.yes and not args.all_tables and args.jobs == 1 and not args.use_cache
+
+
+@pytest.mark.parametrize('valor', ['0', '-3', 'dos'])
+def test_jobs_invalido_se_rechaza(load_all_tables, valor):
+    with pytest.raises(SystemExit):
+        load_all_tables.parse_args(['--jobs', valor])
@@ -0,0 +1,102 @@
+"""
+Tests de la caché Parquet de tablas parseadas del Extractor (invalidación por
+hash del CSV, motor, versión del extractor y columnas de valores)
+"""
+
+import json
+
+import pandas as pd
+import pytest
+
+from agent_processor.etl.extractor import Extractor
+
+pq = pytest.importorskip('pyarrow.parquet')
+
+
+@pytest.fixture
+def parseos(monkeypatch):
+    """Cuenta las veces que se parsea el CSV (las lecturas de la caché no cuentan)"""
+    llamadas = []
+    original = Extractor._parse_table
+
+    def contar(self, *args, **kwargs):
+        llamadas.append(self.engine)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(Extractor, '_parse_table', contar)
+    return llamadas
+
+
+def clave_cache(extractor, table_id='6042'):
+    metadata = pq.read_schema(extractor._cache_path(table_id)).metadata
+    return json.loads(metadata[Extractor.CACHE_METADATA_KEY])
+
+
+def test_segunda_lectura_sale_de_la_cache(raw_dir, tmp_path, parseos):
+    extractor = Extractor(raw_dir, {}, cache_dir=tmp_path / 'cache')
+    primera = extractor.extract_table('6042')
+    segunda = Extractor(raw_dir, {}, cache_dir=tmp_path / 'cache').extract_table('6042')
+
+    assert len(parseos) == 1
+    pd.testing.assert_frame_equal(primera, segunda, check_categorical=False)
+    assert clave_cache(extractor)['hash'] == extractor._content_hash(next(raw_dir.glob('6042_*.csv')))
+
+
+def test_cambio_de_contenido_invalida(raw_dir, tmp_path, parseos):
+    extractor = Extractor(raw_dir, {}, cache_dir=tmp_path / 'cache')
+    extractor.extract_table('6042')
+
+    csv_file = next(raw_dir.glob('6042_*.csv'))
+    lineas = csv_file.read_text(encoding='utf-8').splitlines()
+    lineas[1] = lineas[1].rsplit(';', 1)[0] + ';999,5'
+    csv_file.write_text('\n'.join(lineas) + '\n', encoding='utf-8')
+
+    df = extractor.extract_table('6042')
+    assert len(parseos) == 2
+    assert df['Total'].iloc[0] == 999.5
+    assert clave_cache(extractor)['hash'] == extractor._content_hash(csv_file)
+
+
+def test_cambio_de_motor_invalida(raw_dir, tmp_path, parseos):
+    Extractor(raw_dir, {}, cache_dir=tmp_path / 'cache').extract_table('6042')
+    arrow = Extractor(raw_dir, {}, engine='pyarrow', cache_dir=tmp_path / 'cache')
+    arrow.extract_table('6042')
+    arrow.extract_table('6042')
+
+    assert parseos == ['c', 'pyarrow']
+    assert clave_cache(arrow)['engine'] == 'pyarrow'
+
+
+def test_cambio_de_version_del_extractor_invalida(raw_dir, tmp_path, parseos, monkeypatch):
+    Extractor(raw_dir, {}, cache_dir=tmp_path / 'cache').extract_table('6042')
+    monkeypatch.setattr(Extractor, 'EXTRACTOR_VERSION', Extractor.EXTRACTOR_VERSION + 1)
+    extractor = Extractor(raw_dir, {}, cache_dir=tmp_path / 'cache')
+    extractor.extract_table('6042')
+
+    assert len(parseos) == 2
+    assert clave_cache(extractor)['extractor_version'] == Extractor.EXTRACTOR_VERSION
+
+
+def test_cambio_de_columnas_de_valores_invalida(raw_dir, tmp_path, parseos):
+    Extractor(raw_dir, {}, cache_dir=tmp_path / 'cache').extract_table('6042')
+    config = {'mappings': {'tables_config': {'6042': {'value_columns': ['Total', 'Otra']}}}}
+    Extractor(raw_dir, config, cache_dir=tmp_path / 'cache').extract_table('6042')
+    assert len(parseos) == 2
+
+
+def test_cache_corrupta_se_ignora_y_se_reescribe(raw_dir, tmp_path, parseos):
+    extractor = Extractor(raw_dir, {}, cache_dir=tmp_path / 'cache')
+    esperado = extractor.extract_table('6042')
+    extractor._cache_path('6042').write_bytes(b'no es parquet')
+
+    pd.testing.assert_frame_equal(extractor.extract_table('6042'), esperado, check_categorical=False)
+    extractor.extract_table('6042')
+    assert len(parseos) == 2
+
+
+def test_sin_cache_no_se_escribe_nada(raw_dir, tmp_path, parseos):
+    extractor = Extractor(raw_dir, {}, use_cache=False, cache_dir=tmp_path / 'cache')
+    extractor.extract_table('6042')
+    extractor.extract_table('6042')
+    assert len(parseos) == 2
+    assert not (tmp_path / 'cache').exists()
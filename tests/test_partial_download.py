@@ -0,0 +1,120 @@
+"""
+Tests de las descargas reanudables (PartialDownload y su uso en el Downloader)
+"""
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from agent_extractor.partial_download import PartialDownload
+from conftest import RespuestaFalsa, csv_ine
+
+pytest.importorskip('requests')
+
+CUERPO = csv_ine(series=10).encode('utf-8')
+CORTE = 5000
+RANGOS = {'Accept-Ranges': 'bytes', 'ETag': '"v1"', 'Content-Length': str(len(CUERPO))}
+
+
+def resto(desde=CORTE, cuerpo=CUERPO, etag='"v1"'):
+    """Respuesta 206 con el cuerpo desde `desde`"""
+    return RespuestaFalsa(206, cuerpo[desde:], {
+        'Content-Range': f'bytes {desde}-{len(cuerpo) - 1}/{len(cuerpo)}',
+        'ETag': etag
+    })
+
+
+def descargar(downloader, *respuestas):
+    downloader.session.respuestas.extend(respuestas)
+    return downloader.download_single_table('6042')
+
+
+def parciales(downloader):
+    return sorted(archivo.name for archivo in (downloader.data_path / 'csv').glob('.*.part*'))
+
+
+def test_corte_se_reanuda_con_range(downloader):
+    resultado = descargar(downloader, RespuestaFalsa(200, CUERPO, RANGOS, corte=CORTE), resto())
+
+    assert resultado['exitoso'] and resultado['intentos'] == 2
+    assert resultado['bytes_reanudados'] == CORTE
+    assert downloader.session.peticiones[1]['Range'] == f'bytes={CORTE}-'
+    assert downloader.session.peticiones[1]['If-Range'] == '"v1"'
+    assert Path(resultado['archivo']).read_bytes() == CUERPO
+    assert downloader.metadata_manager.get_table_metadata('6042')['hash_archivo'] == \
+        downloader.metadata_manager.calculate_file_hash(Path(resultado['archivo']))
+    assert parciales(downloader) == []
+
+
+def test_if_range_caducado_el_servidor_envia_el_archivo_nuevo(downloader):
+    # El recurso cambió entre intentos: If-Range no coincide y llega un 200 completo
+    nuevo = csv_ine(series=11).encode('utf-8')
+    resultado = descargar(downloader, RespuestaFalsa(200, CUERPO, RANGOS, corte=CORTE),
+                          RespuestaFalsa(200, nuevo, {'Accept-Ranges': 'bytes', 'ETag': '"v2"'}))
+
+    assert resultado['exitoso'] and resultado['bytes_reanudados'] == 0
+    assert Path(resultado['archivo']).read_bytes() == nuevo
+    assert downloader.metadata_manager.get_table_metadata('6042')['etag'] == '"v2"'
+    assert parciales(downloader) == []
+
+
+def test_content_range_incoherente_reinicia_la_descarga(downloader):
+    resultado = descargar(downloader, RespuestaFalsa(200, CUERPO, RANGOS, corte=CORTE), resto(desde=CORTE - 100),
+                          RespuestaFalsa(200, CUERPO, RANGOS))
+
+    assert resultado['exitoso'] and resultado['intentos'] == 3
+    assert 'Range' not in downloader.session.peticiones[2]
+    assert Path(resultado['archivo']).read_bytes() == CUERPO
+
+
+def test_sin_accept_ranges_no_se_guarda_checkpoint(downloader):
+    sin_rangos = {'ETag': '"v1"'}
+    resultado = descargar(downloader, RespuestaFalsa(200, CUERPO, sin_rangos, corte=CORTE),
+                          RespuestaFalsa(200, CUERPO, sin_rangos))
+
+    assert resultado['exitoso'] and resultado['bytes_reanudados'] == 0
+    assert 'Range' not in downloader.session.peticiones[1]
+    assert parciales(downloader) == []
+
+
+def test_cuerpo_mas_corto_que_content_length_se_completa(downloader):
+    corto = RespuestaFalsa(200, CUERPO[:CORTE], RANGOS)
+    resultado = descargar(downloader, corto, resto())
+
+    assert resultado['exitoso'] and resultado['bytes_reanudados'] == CORTE
+    assert Path(resultado['archivo']).read_bytes() == CUERPO
+
+
+def test_416_descarta_el_parcial(downloader):
+    resultado = descargar(downloader, RespuestaFalsa(200, CUERPO, RANGOS, corte=CORTE), RespuestaFalsa(416),
+                          RespuestaFalsa(200, CUERPO, RANGOS))
+
+    assert resultado['exitoso'] and resultado['intentos'] == 3
+    assert 'Range' not in downloader.session.peticiones[2]
+
+
+def test_parcial_de_otra_url_no_se_reanuda(tmp_path):
+    csv_path = tmp_path / '6042_tabla.csv'
+    parcial = PartialDownload(csv_path, 'https://ine.es/6042.csv')
+    parcial.start(RespuestaFalsa(200, CUERPO, RANGOS))
+    parcial.part_path.write_bytes(CUERPO[:CORTE])
+
+    assert PartialDownload(csv_path, 'https://ine.es/6042.csv').resume_headers()['Range'] == f'bytes={CORTE}-'
+    assert PartialDownload(csv_path, 'https://ine.es/otra.csv').resume_headers() == {}
+    assert not parcial.part_path.exists() and not parcial.meta_path.exists()
+
+
+def test_cleanup_stale_borra_solo_los_antiguos(tmp_path):
+    antiguo = PartialDownload(tmp_path / '6042_a.csv', 'u')
+    reciente = PartialDownload(tmp_path / '6063_b.csv', 'u')
+    for parcial in (antiguo, reciente):
+        parcial.part_path.write_bytes(b'x')
+        parcial.meta_path.write_text('{}')
+    hace_dos_dias = time.time() - 2 * 86400
+    os.utime(antiguo.part_path, (hace_dos_dias, hace_dos_dias))
+
+    assert PartialDownload.cleanup_stale(tmp_path, 86400) == 1
+    assert not antiguo.part_path.exists() and not antiguo.meta_path.exists()
+    assert reciente.part_path.exists() and reciente.meta_path.exists()
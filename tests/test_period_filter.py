@@ -0,0 +1,75 @@
+"""
+Tests del filtro de períodos de la extracción (periods / since)
+"""
+
+import pandas as pd
+import pytest
+
+from agent_processor.etl.extractor import Extractor
+
+pq = pytest.importorskip('pyarrow.parquet')
+
+MOTORES = ['c', 'pyarrow']
+
+
+def completo_filtrado(df, periodos):
+    return df[df['Periodo'].isin(periodos)].reset_index(drop=True)
+
+
+@pytest.mark.parametrize('engine', MOTORES)
+@pytest.mark.parametrize('use_cache', [False, True])
+def test_since_devuelve_las_mismas_filas_que_filtrar_despues(raw_dir, tmp_path, engine, use_cache):
+    extractor = Extractor(raw_dir, {}, engine=engine, use_cache=use_cache, cache_dir=tmp_path / 'cache')
+    completo = extractor.extract_table('6042')
+    filtrado = extractor.extract_table('6042', since='2024T2')
+
+    esperado = completo_filtrado(completo, ['2024T2', '2024T3', '2024T4'])
+    pd.testing.assert_frame_equal(filtrado, esperado, check_categorical=False)
+
+
+@pytest.mark.parametrize('engine', MOTORES)
+def test_periods_y_since_se_combinan(raw_dir, tmp_path, engine):
+    extractor = Extractor(raw_dir, {}, engine=engine, cache_dir=tmp_path / 'cache')
+    filtrado = extractor.extract_table('6042', periods=['2021T1', '2023T4', '2024T1'], since='2022T1')
+    assert sorted(filtrado['Periodo'].astype(str).unique()) == ['2023T4', '2024T1']
+
+
+def test_periodo_inexistente_devuelve_tabla_vacia(raw_dir, tmp_path):
+    extractor = Extractor(raw_dir, {}, cache_dir=tmp_path / 'cache')
+    for _ in range(2):  # sin caché y leyendo la caché recién creada
+        assert extractor.extract_table('6042', periods=['1999T1']).empty
+
+
+def test_filtro_sin_columna_periodo_falla(tmp_path):
+    raw_dir = tmp_path / 'raw'
+    raw_dir.mkdir()
+    (raw_dir / '6042_t.csv').write_text("Sector;Total\nIndustria;1,5\n", encoding='utf-8')
+    extractor = Extractor(raw_dir, {}, use_cache=False)
+    with pytest.raises(ValueError):
+        extractor.extract_table('6042', since='2024T1')
+
+
+def test_cache_ordenada_por_periodo_conserva_el_orden_del_csv(raw_dir, tmp_path):
+    sin_cache = Extractor(raw_dir, {}, use_cache=False).extract_table('6042')
+    extractor = Extractor(raw_dir, {}, cache_dir=tmp_path / 'cache')
+    extractor.extract_table('6042')  # crea la caché
+
+    pd.testing.assert_frame_equal(extractor.extract_table('6042'), sin_cache)
+
+
+def test_cache_permite_saltar_row_groups(raw_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(Extractor, 'CACHE_ROW_GROUP_SIZE', 40)
+    extractor = Extractor(raw_dir, {}, cache_dir=tmp_path / 'cache')
+    extractor.extract_table('6042')
+
+    metadata = pq.ParquetFile(extractor._cache_path('6042')).metadata
+    columna = metadata.schema.to_arrow_schema().get_field_index('Periodo')
+    rangos = [(metadata.row_group(i).column(columna).statistics.min,
+               metadata.row_group(i).column(columna).statistics.max)
+              for i in range(metadata.num_row_groups)]
+
+    # En el CSV cada serie recorre todos los períodos; en la caché solo los
+    # últimos row groups contienen el último período
+    assert metadata.num_row_groups == 8
+    assert sum(1 for _, maximo in rangos if maximo >= '2024T4') == 1
+    assert rangos == sorted(rangos)
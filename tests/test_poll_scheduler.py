@@ -0,0 +1,174 @@
+"""
+Tests del planificador de verificaciones (PollScheduler): ventana de
+publicación esperada, backoff fuera de ella y tras errores, y estado persistido
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from agent_extractor.poll_scheduler import (PollScheduler, next_period, parse_period, period_end,
+                                             period_key)
+
+
+class MetadataFalsa:
+    """Lo que el planificador lee del MetadataManager"""
+
+    def __init__(self, metadata=None, historial=None):
+        self.metadata = metadata or {}
+        self.historial = historial or {}
+
+    def get_table_metadata(self, codigo):
+        return self.metadata.get(codigo)
+
+    def get_version_history(self, codigo):
+        return self.historial.get(codigo, [])
+
+
+@pytest.fixture
+def metadata():
+    # 2024T4 descargado el 2025-03-10 (fuera de la cadencia: retraso de 69 días)
+    return MetadataFalsa({'6042': {'ultimo_periodo': '2024T4', 'fecha_descarga': '2025-03-10T08:00:00'}})
+
+
+@pytest.fixture
+def planificador(tmp_path, metadata):
+    return PollScheduler(tmp_path / 'planificador.json', metadata)
+
+
+def test_periodos():
+    assert next_period('2024T4') == '2025T1'
+    assert next_period('2024M12') == '2025M01'
+    assert next_period('2024M07') == '2024M08'
+    assert next_period('2024') == '2025'
+    assert next_period('no es un período') is None
+    for invalido in ('2024T0', '2024T5', '2024M00', '2024M13'):
+        assert parse_period(invalido) is None
+        assert period_end(invalido) is None and next_period(invalido) is None
+    assert period_end('2025T1') == date(2025, 3, 31)
+    assert period_end('2024M02') == date(2024, 2, 29)
+    assert period_end('2024') == date(2024, 12, 31)
+    assert period_key('2025T1') > period_key('2024T4') > period_key(None)
+
+
+def test_ventana_con_el_retraso_observado(planificador):
+    # Un único retraso observado (69 días): 2025T1 termina el 31/03 -> se espera el 08/06
+    periodo, inicio, fin = planificador.release_window('6042')
+    assert periodo == '2025T1'
+    assert (inicio, fin) == (datetime(2025, 5, 29), datetime(2025, 6, 18))
+
+
+def test_ventana_por_defecto_sin_historial(tmp_path):
+    metadata = MetadataFalsa({'6042': {'ultimo_periodo': '2024T4'}})
+    planificador = PollScheduler(tmp_path / 'p.json', metadata, {'retraso_publicacion_dias': 60,
+                                                                 'margen_ventana_dias': 5})
+    _, inicio, fin = planificador.release_window('6042')
+    assert (inicio, fin) == (datetime(2025, 5, 25), datetime(2025, 6, 4))
+
+
+def test_retraso_aprendido_del_historial(tmp_path):
+    historial = {'6042': [
+        {'periodo': '2024T2', 'fecha': '2024-08-20T09:00:00'},   # 51 días
+        {'periodo': '2024T3', 'fecha': '2024-11-24T09:00:00'},   # 55 días
+        {'periodo': '2023T4', 'fecha': '2024-12-01T09:00:00'},   # primera descarga tardía: no cuenta
+    ]}
+    metadata = MetadataFalsa({'6042': {'ultimo_periodo': '2024T4', 'fecha_descarga': '2025-02-22T09:00:00'}},
+                             historial)  # 2024T4: 53 días
+    planificador = PollScheduler(tmp_path / 'p.json', metadata)
+
+    retraso, dispersion = planificador.publication_lag('6042')
+    assert retraso == timedelta(days=53) and dispersion == timedelta(days=2)
+    _, inicio, fin = planificador.release_window('6042')
+    assert fin - inicio == 2 * timedelta(days=12)
+
+
+def test_antes_de_la_ventana_el_intervalo_se_duplica_hasta_el_inicio(planificador):
+    _, inicio, _ = planificador.release_window('6042')
+    ahora = datetime(2025, 5, 1)
+    intervalos = []
+    for _ in range(5):
+        estado = planificador.record_check('6042', {'periodo_remoto': '2024T4'}, ahora)
+        proxima = datetime.fromisoformat(estado['proxima_verificacion'])
+        intervalos.append(proxima - ahora)
+        ahora = proxima
+
+    horas = [intervalo / timedelta(hours=1) for intervalo in intervalos]
+    # La primera verificación registra el período remoto; después, sin novedad
+    assert horas[:4] == [24, 48, 96, 192]
+    assert horas[4] < 384 and ahora == inicio
+
+
+def test_dentro_de_la_ventana_cada_intervalo_de_ventana(planificador):
+    ahora = datetime(2025, 6, 1, 12)
+    assert planificador.is_due('6042', ahora)  # sin verificaciones previas
+    estado = planificador.record_check('6042', {'periodo_remoto': '2024T4'}, ahora)
+    assert datetime.fromisoformat(estado['proxima_verificacion']) == ahora + timedelta(hours=6)
+
+    assert not planificador.is_due('6042', ahora + timedelta(hours=5))
+    assert planificador.due_tables(['6042'], ahora + timedelta(hours=6)) == ['6042']
+
+
+def test_ventana_superada_espacia_las_consultas(planificador):
+    _, _, fin = planificador.release_window('6042')
+    for dias, esperado in ((1, timedelta(days=1)), (4, timedelta(days=4)), (40, timedelta(days=14))):
+        ahora = fin + timedelta(days=dias)
+        estado = planificador.record_check('6042', {'periodo_remoto': '2024T4'}, ahora)
+        assert datetime.fromisoformat(estado['proxima_verificacion']) - ahora == esperado
+
+
+def test_errores_con_backoff_exponencial_y_reinicio(planificador):
+    ahora = datetime(2025, 6, 1, 12)
+    esperas = []
+    for _ in range(4):
+        estado = planificador.record_check('6042', {'error': 'timeout'}, ahora)
+        esperas.append(datetime.fromisoformat(estado['proxima_verificacion']) - ahora)
+    assert [espera / timedelta(hours=1) for espera in esperas] == [6, 12, 24, 48]
+
+    for _ in range(10):
+        estado = planificador.record_check('6042', {}, ahora)
+    assert datetime.fromisoformat(estado['proxima_verificacion']) - ahora == timedelta(days=14)
+
+    estado = planificador.record_check('6042', {'periodo_remoto': '2024T4'}, ahora)
+    assert estado['fallos_consecutivos'] == 0
+    assert datetime.fromisoformat(estado['proxima_verificacion']) - ahora == timedelta(hours=6)
+
+
+def test_periodo_nuevo_detectado_pasa_a_la_ventana_siguiente(planificador):
+    ahora = datetime(2025, 6, 5)
+    planificador.record_check('6042', {'periodo_remoto': '2025T1', 'necesita_actualizacion': True}, ahora)
+
+    assert planificador.pending_update('6042')
+    assert planificador.release_window('6042')[0] == '2025T2'
+    assert planificador.state['tablas']['6042']['publicaciones'] == {'2025T1': ahora.isoformat()}
+
+
+def test_tabla_sin_periodo_local_siempre_se_verifica(planificador):
+    assert planificador.release_window('9999') is None
+    assert planificador.is_due('9999', datetime(2025, 1, 1))
+    estado = planificador.record_check('9999', {'periodo_remoto': '2024T4'}, datetime(2025, 1, 1))
+    assert datetime.fromisoformat(estado['proxima_verificacion']) == datetime(2025, 1, 2)
+
+
+def test_estado_persistido(tmp_path, metadata, planificador):
+    ahora = datetime(2025, 6, 1, 12)
+    planificador.record_check('6042', {'periodo_remoto': '2024T4'}, ahora)
+    planificador.save()
+
+    recargado = PollScheduler(tmp_path / 'planificador.json', metadata)
+    assert recargado.state == planificador.state
+    plan = recargado.plan(['6042', '9999'], ahora)
+    assert [entrada['codigo'] for entrada in plan] == ['9999', '6042']
+    assert recargado.next_check(['6042'], ahora) == ahora + timedelta(hours=6)
+
+    (tmp_path / 'planificador.json').write_text('{roto', encoding='utf-8')
+    assert PollScheduler(tmp_path / 'planificador.json', metadata).state == {'tablas': {}}
+
+
+def test_periodo_local_invalido_no_bloquea_al_resto(tmp_path, metadata):
+    metadata.metadata['6063'] = {'ultimo_periodo': '2024T5', 'fecha_descarga': '2025-03-10T08:00:00'}
+    planificador = PollScheduler(tmp_path / 'p.json', metadata)
+    ahora = datetime(2025, 6, 1, 12)
+
+    assert planificador.release_window('6063') is None
+    assert planificador.due_tables(['6042', '6063'], ahora) == ['6042', '6063']
+    assert [entrada['codigo'] for entrada in planificador.plan(['6042', '6063'], ahora)] == ['6042', '6063']